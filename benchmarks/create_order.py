@@ -0,0 +1,104 @@
+"""
+create_order latency versus the number of pieces in the order.
+
+Compares the write path of 'sql.crud.create_order' (INSERT ... RETURNING for the order
+and one executemany for its pieces) with the ORM path it replaced (add, flush and
+refresh of the order, one Piece object per piece, flush, commit, refresh).
+
+    python benchmarks/create_order.py [--pieces 1 10 100 1000] [--runs 200]
+"""
+from harness import (
+    prepare,
+    print_table,
+    summary,
+)
+prepare()
+
+from chassis.sql import Base
+from order.global_vars import SQLITE_PRAGMAS
+from order.sql import (
+    configure_sqlite,
+    create_order,
+    Engine,
+    Order,
+    OrderPieceSchema,
+    SessionLocal,
+)
+from order.sql.models import Piece
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import (
+    Awaitable,
+    Callable,
+    List,
+)
+import argparse
+import asyncio
+import time
+
+CreateOrder = Callable[[AsyncSession, List[OrderPieceSchema]], Awaitable[Order]]
+
+async def bulk_path(db: AsyncSession, pieces: List[OrderPieceSchema]) -> Order:
+    return await create_order(
+        db=db,
+        client_id=1,
+        city="Arrasate",
+        street="Loramendi 4",
+        zip="20",
+        total_amount=9.5,
+        pieces=pieces,
+    )
+
+async def orm_path(db: AsyncSession, pieces: List[OrderPieceSchema]) -> Order:
+    db_order = Order(
+        client_id=1,
+        city="Arrasate",
+        street="Loramendi 4",
+        zip="20",
+        status=Order.STATUS_CREATED,
+        total_amount=9.5,
+    )
+    db.add(db_order)
+    await db.flush()
+    await db.refresh(db_order)
+    for piece in pieces:
+        db.add(Piece(order_id=db_order.id, piece_type=piece.type, quantity=piece.quantity))
+    await db.flush()
+    await db.commit()
+    await db.refresh(db_order)
+    return db_order
+
+async def measure(path: CreateOrder, piece_count: int, runs: int) -> List[float]:
+    pieces = [OrderPieceSchema(type="AB"[index % 2], quantity=1) for index in range(piece_count)]
+    seconds: List[float] = []
+    for run in range(runs + runs // 10):
+        async with SessionLocal() as db:
+            started = time.perf_counter()
+            await path(db, pieces)
+            elapsed = time.perf_counter() - started
+        # The first tenth warms up connections and statement caches.
+        if run >= runs // 10:
+            seconds.append(elapsed)
+    return seconds
+
+async def main(piece_counts: List[int], runs: int) -> None:
+    configure_sqlite(Engine, SQLITE_PRAGMAS)
+    async with Engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rows = []
+    for piece_count in piece_counts:
+        path_runs = max(10, runs * 10 // max(piece_count, 10))
+        for name, path in (("orm", orm_path), ("bulk", bulk_path)):
+            stats = summary(await measure(path, piece_count, path_runs))
+            rows.append((piece_count, name, path_runs, stats["median_ms"], stats["p95_ms"], stats["max_ms"]))
+    await Engine.dispose()
+
+    print(f"Database: {Engine.url}")
+    print_table(("pieces", "path", "runs", "median ms", "p95 ms", "max ms"), rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pieces", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--runs", type=int, default=200, help="Runs for up to 10 pieces; fewer for larger orders")
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.pieces, arguments.runs))
@@ -0,0 +1,48 @@
+"""
+Environment shared by the benchmarks: the service runs against a fresh SQLite file with
+the production pragmas, and the stand-in 'chassis' library of the test harness when the
+real one is not installed. Import it before anything from 'order'.
+"""
+from pathlib import Path
+from typing import (
+    Dict,
+    List,
+    Sequence,
+)
+import importlib.util
+import os
+import statistics
+import sys
+import tempfile
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def prepare(database_url: str = "") -> str:
+    """Point the service at 'database_url', a new SQLite file by default; returns the URL."""
+    if not database_url:
+        database_url = f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp(prefix='order-bench-')) / 'order.db'}"
+    os.environ["SQLALCHEMY_DATABASE_URL"] = database_url
+    os.environ.setdefault("DB_SINGLE_WRITER", "false")
+    sys.path.insert(0, str(ROOT / "src"))
+    if importlib.util.find_spec("chassis") is None:
+        sys.path.insert(0, str(ROOT / "tests" / "stand_in"))
+    return database_url
+
+def summary(seconds: Sequence[float]) -> Dict[str, float]:
+    """Median, p95 and max of 'seconds', in milliseconds."""
+    ordered: List[float] = sorted(seconds)
+    return {
+        "median_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+def print_table(header: Sequence[str], rows: Sequence[Sequence[object]]) -> None:
+    cells = [list(map(str, header))] + [
+        [f"{value:.2f}" if isinstance(value, float) else str(value) for value in row] for row in rows
+    ]
+    widths = [max(len(row[column]) for row in cells) for column in range(len(header))]
+    for index, row in enumerate(cells):
+        print(" | ".join(value.rjust(width) for value, width in zip(row, widths)))
+        if index == 0:
+            print("-+-".join("-" * width for width in widths))
@@ -0,0 +1,161 @@
+"""
+Listing orders by client, status and id range on a large table.
+
+Seeds --orders orders (1M by default) with one to three pieces each, then times pages of
+'sql.crud.list_orders' and of GET /order/, with the client and status indexes and
+again without them, to show the full scans they avoid.
+
+    python benchmarks/list_orders.py [--orders 1000000] [--runs 50]
+"""
+from harness import (
+    prepare,
+    print_table,
+    summary,
+)
+prepare()
+
+from chassis.sql import Base
+from order import APP
+from order.global_vars import SQLITE_PRAGMAS
+from order.security import verify_jwt
+from order.sql import (
+    configure_sqlite,
+    Engine,
+    list_orders,
+    Order,
+    SessionLocal,
+)
+from order.sql.models import Piece
+from sqlalchemy import (
+    insert,
+    text,
+)
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+import argparse
+import asyncio
+import httpx
+import random
+import time
+
+CLIENTS = 10_000
+# Most orders are finished; a few are stuck in the states support looks for.
+STATUS_WEIGHTS = {
+    Order.STATUS_DELIVERED: 0.90,
+    Order.STATUS_CANCELLED: 0.07,
+    Order.STATUS_APPROVED: 0.0299,
+    Order.STATUS_CANCELLING: 0.0001,
+}
+CHUNK = 50_000
+
+async def seed(orders: int) -> None:
+    rng = random.Random(42)
+    statuses = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=orders)
+    async with Engine.begin() as conn:
+        for start in range(0, orders, CHUNK):
+            ids = range(start + 1, min(start + CHUNK, orders) + 1)
+            await conn.execute(
+                insert(Order),
+                [
+                    {
+                        "id": order_id,
+                        "client_id": rng.randrange(1, CLIENTS + 1),
+                        "city": "Arrasate",
+                        "street": "Loramendi 4",
+                        "zip": "20",
+                        "status": statuses[order_id - 1],
+                        "total_amount": 9.5,
+                    }
+                    for order_id in ids
+                ],
+            )
+            await conn.execute(
+                insert(Piece),
+                [
+                    {"order_id": order_id, "piece_type": "AB"[piece % 2], "quantity": 1}
+                    for order_id in ids
+                    for piece in range(rng.randint(1, 3))
+                ],
+            )
+
+async def time_runs(query: Callable[[], Awaitable[Any]], runs: int) -> Dict[str, float]:
+    await query()
+    seconds: List[float] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await query()
+        seconds.append(time.perf_counter() - started)
+    return summary(seconds)
+
+def page(**filters: Optional[int | str]) -> Callable[[], Awaitable[Any]]:
+    async def query() -> Any:
+        async with SessionLocal() as db:
+            return await list_orders(
+                db=db,
+                client_id=filters.get("client_id"),
+                status=filters.get("status"),
+                after_id=filters.get("after_id"),
+                before_id=filters.get("before_id"),
+                limit=int(filters.get("limit") or 100),
+            )
+    return query
+
+def endpoint(http: httpx.AsyncClient, params: Dict[str, Any]) -> Callable[[], Awaitable[Any]]:
+    async def query() -> Any:
+        response = await http.get("/order/", params=params)
+        response.raise_for_status()
+        return response
+    return query
+
+async def main(orders: int, runs: int) -> None:
+    configure_sqlite(Engine, SQLITE_PRAGMAS)
+    async with Engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    started = time.perf_counter()
+    await seed(orders)
+    async with Engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+        pieces = (await conn.execute(text("SELECT count(*) FROM o_piece"))).scalar_one()
+    print(f"Seeded {orders} orders and {pieces} pieces in {time.perf_counter() - started:.1f}s ({Engine.url})")
+
+    APP.dependency_overrides[verify_jwt] = lambda: {"sub": "1", "role": "admin"}
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=APP), base_url="http://order")
+    queries: List[Tuple[str, Callable[[], Awaitable[Any]]]] = [
+        ("client, first page", page(client_id=4242)),
+        ("status Cancelling, first page", page(status=Order.STATUS_CANCELLING)),
+        ("status Delivered, page past 90%", page(status=Order.STATUS_DELIVERED, after_id=orders * 9 // 10)),
+        ("client + status", page(client_id=4242, status=Order.STATUS_DELIVERED)),
+        ("id range, last page", page(after_id=orders - 200, before_id=orders - 100)),
+        ("GET /order/?client_id", endpoint(http, {"client_id": 4242})),
+        ("GET /order/?status=Cancelling", endpoint(http, {"status": Order.STATUS_CANCELLING})),
+    ]
+
+    rows = []
+    for name, query in queries:
+        stats = await time_runs(query, runs)
+        rows.append((name, "indexed", stats["median_ms"], stats["p95_ms"]))
+    async with Engine.begin() as conn:
+        for index in ("ix_order_client_id", "ix_order_status", "ix_o_piece_order_id"):
+            await conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+    # Without the indexes every page is a scan; a few runs are enough.
+    for name, query in queries[:4]:
+        stats = await time_runs(query, max(3, runs // 10))
+        rows.append((name, "no index", stats["median_ms"], stats["p95_ms"]))
+
+    await http.aclose()
+    await Engine.dispose()
+    print_table(("query (100 orders per page)", "indexes", "median ms", "p95 ms"), rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=50)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.orders, arguments.runs))
@@ -1,23 +1,41 @@
 from .global_vars import (
-    LISTENING_QUEUES,
+    DB_SINGLE_WRITER,
     RABBITMQ_CONFIG,
+    SQLITE_PRAGMAS,
 )
+from .health import HEALTH_MONITOR
+from .http_client import HTTP_CLIENT
 from .messaging import *
+from .messaging import (
+    AMQP_CONNECTION,
+    OUTBOX_RELAY,
+    PUBLISHER,
+    SAGA_REQUESTS,
+    start_consumers,
+    stop_consumers,
+)
+from .saga import (
+    SAGA_HISTORY,
+    SAGA_RECOVERY,
+    SAGA_RUNNER,
+)
+from .scheduler import SCHEDULER
+from .security import PUBLIC_KEYS
+from .sql import (
+    configure_sqlite,
+    DB_WRITER,
+    Engine,
+)
 from chassis.logging import (
     get_logger,
     setup_rabbitmq_logging,
 )
-from chassis.messaging import start_rabbitmq_listener
-from chassis.sql import (
-    Base, 
-    Engine,
-)
+from chassis.sql import Base
 from chassis.consul import CONSUL_CLIENT 
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from hypercorn.asyncio import serve
 from hypercorn.config import Config
-from threading import Thread
 import asyncio
 import logging.config
 import os
@@ -40,20 +58,31 @@ async def lifespan(__app: FastAPI):
     """Lifespan context manager."""
     try:
         logger.info("[LOG:ORDER] - Starting up")
+        configure_sqlite(Engine, SQLITE_PRAGMAS)
+        HEALTH_MONITOR.start()
         try:
             logger.info("[LOG:ORDER] - Creating database tables")
             async with Engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
+            if DB_SINGLE_WRITER and Engine.dialect.name == "sqlite":
+                DB_WRITER.start()
+            SAGA_HISTORY.start()
+            SCHEDULER.start()
             logger.info("[LOG:ORDER] - Starting RabbitMQ listeners")
             try:
-                for _, queue in LISTENING_QUEUES.items():
-                    Thread(
-                        target=start_rabbitmq_listener,
-                        args=(queue, RABBITMQ_CONFIG),
-                        daemon=True,
-                    ).start()
+                await start_consumers()
             except Exception as e:
                 logger.error(f"[LOG:ORDER] - Could not start the RabbitMQ listeners: Reason={e}", exc_info=True)
+            OUTBOX_RELAY.start()
+            logger.info("[LOG:ORDER] - Starting saga reply consumer")
+            try:
+                await SAGA_REQUESTS.start()
+            except Exception as e:
+                logger.error(f"[LOG:ORDER] - Could not start the saga reply consumer: Reason={e}", exc_info=True)
+            logger.info("[LOG:ORDER] - Starting saga recovery")
+            SAGA_RECOVERY.start()
+            logger.info("[LOG:ORDER] - Loading the auth public key")
+            await PUBLIC_KEYS.warm_up()
             logger.info("[LOG:ORDER] - Registering service to Consul...")
             try:
                 CONSUL_CLIENT.register_service(
@@ -67,6 +96,26 @@ async def lifespan(__app: FastAPI):
             logger.error(f"[LOG:ORDER] - Could not create tables at startup: Reason={e}", exc_info=True)
         yield
     finally:
+        await HEALTH_MONITOR.stop()
+        logger.info("[LOG:ORDER] - Stopping RabbitMQ listeners")
+        await stop_consumers()
+        logger.info("[LOG:ORDER] - Stopping transition scheduler")
+        await SCHEDULER.stop()
+        logger.info("[LOG:ORDER] - Stopping saga recovery")
+        await SAGA_RECOVERY.stop()
+        logger.info("[LOG:ORDER] - Waiting for background sagas")
+        await SAGA_RUNNER.shutdown()
+        logger.info("[LOG:ORDER] - Flushing saga history")
+        await SAGA_HISTORY.stop()
+        await DB_WRITER.stop()
+        logger.info("[LOG:ORDER] - Stopping saga reply consumer")
+        await SAGA_REQUESTS.stop()
+        logger.info("[LOG:ORDER] - Stopping outbox relay")
+        await OUTBOX_RELAY.stop()
+        logger.info("[LOG:ORDER] - Closing RabbitMQ publisher")
+        await PUBLISHER.close()
+        await AMQP_CONNECTION.close()
+        await HTTP_CLIENT.aclose()
         logger.info("[LOG:ORDER] - Shutting down database")
         await Engine.dispose()
         CONSUL_CLIENT.deregister_service()
@@ -2,11 +2,13 @@ from chassis.messaging import RabbitMQConfig
 from pathlib import Path
 from typing import (
     Dict,
+    List,
     LiteralString,
-    Optional,
+    Tuple,
 )
 import os
 import socket
+import uuid
 
 # RabbitMQ Configuration ###########################################################################
 RABBITMQ_CONFIG: RabbitMQConfig = {
@@ -20,10 +22,104 @@ RABBITMQ_CONFIG: RabbitMQConfig = {
     "client_key": Path(client_key_path) if (client_key_path := os.getenv("RABBITMQ_CLIENT_KEY_PATH", None)) is not None else None,
     "prefetch_count": int(os.getenv("RABBITMQ_PREFETCH_COUNT", 10))
 }
+PUBLISHER_CONFIRM_WINDOW: int = int(os.getenv("PUBLISHER_CONFIRM_WINDOW", "256"))
+PUBLISHER_MAX_RETRIES: int = int(os.getenv("PUBLISHER_MAX_RETRIES", "3"))
 LISTENING_QUEUES: Dict[LiteralString, str] = {
-    "order_status_update": f"order.status.update",
     "public_key": f"client.public_key.order.{socket.gethostname()}",
 }
 
+# Order status updates #############################################################################
+STATUS_UPDATE_QUEUE: str = "order.status.update"
+STATUS_UPDATE_BATCH_SIZE: int = int(os.getenv("STATUS_UPDATE_BATCH_SIZE", "50"))
+STATUS_UPDATE_BATCH_WAIT: float = float(os.getenv("STATUS_UPDATE_BATCH_WAIT", "0.05"))
+
+# Saga request/reply ##############################################################################
+SAGA_REPLY_INSTANCE_ID: str = os.getenv("SAGA_REPLY_INSTANCE_ID", f"{socket.gethostname()}-{os.getpid()}")
+SAGA_REPLY_QUEUE_EXPIRES_MS: int = int(os.getenv("SAGA_REPLY_QUEUE_EXPIRES_MS", "3600000"))
+SAGA_REPLY_EXCHANGES: Tuple[str, ...] = (
+    "payment_sagas",
+    "warehouse_sagas",
+    "delivery_sagas",
+)
+
+# Saga deadlines (seconds) #########################################################################
+SAGA_TIMEOUT: float = float(os.getenv("SAGA_TIMEOUT", "30"))
+SAGA_STEP_TIMEOUTS: Dict[str, float] = {
+    "payment.reserve": float(os.getenv("SAGA_PAYMENT_TIMEOUT", "10")),
+    "warehouse.reserve": float(os.getenv("SAGA_WAREHOUSE_TIMEOUT", "10")),
+    "delivery.cancel": float(os.getenv("SAGA_DELIVERY_TIMEOUT", "10")),
+}
+SAGA_RUNNER_CONCURRENCY: int = int(os.getenv("SAGA_RUNNER_CONCURRENCY", "100"))
+
+# Saga recovery ####################################################################################
+# Owner of the sagas this process runs; the prefix identifies its earlier incarnations.
+SAGA_OWNER: str = f"{SAGA_REPLY_INSTANCE_ID}/{uuid.uuid4().hex}"
+SAGA_RECOVERY_BATCH_SIZE: int = int(os.getenv("SAGA_RECOVERY_BATCH_SIZE", "100"))
+SAGA_RECOVERY_INTERVAL: float = float(os.getenv("SAGA_RECOVERY_INTERVAL", "30"))
+SAGA_RECOVERY_GRACE: float = float(os.getenv("SAGA_RECOVERY_GRACE", "30"))
+
+# Saga history #####################################################################################
+SAGA_HISTORY_FLUSH_SIZE: int = int(os.getenv("SAGA_HISTORY_FLUSH_SIZE", "100"))
+SAGA_HISTORY_FLUSH_INTERVAL: float = float(os.getenv("SAGA_HISTORY_FLUSH_INTERVAL", "1"))
+SAGA_HISTORY_BUFFER_SIZE: int = int(os.getenv("SAGA_HISTORY_BUFFER_SIZE", "10000"))
+SAGA_HISTORY_CACHE_SIZE: int = int(os.getenv("SAGA_HISTORY_CACHE_SIZE", "10000"))
+SAGA_HISTORY_CACHE_TTL: float = float(os.getenv("SAGA_HISTORY_CACHE_TTL", "600"))
+
+# Scheduled transitions ############################################################################
+SCHEDULER_POLL_INTERVAL: float = float(os.getenv("SCHEDULER_POLL_INTERVAL", "1"))
+SCHEDULER_BATCH_SIZE: int = int(os.getenv("SCHEDULER_BATCH_SIZE", "100"))
+PACKAGING_DELAY: Tuple[int, int] = (
+    int(os.getenv("PACKAGING_DELAY_MIN", "5")),
+    int(os.getenv("PACKAGING_DELAY_MAX", "10")),
+)
+
+# Database #########################################################################################
+DATABASE_URL: str = os.getenv("SQLALCHEMY_DATABASE_URL", "sqlite+aiosqlite:///./order.db")
+DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+
+# Order cache ######################################################################################
+ORDER_CACHE_SIZE: int = int(os.getenv("ORDER_CACHE_SIZE", "10000"))
+ORDER_CACHE_TTL: float = float(os.getenv("ORDER_CACHE_TTL", "30"))
+
+# Outbox relay #####################################################################################
+OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_INTERVAL: float = float(os.getenv("OUTBOX_POLL_INTERVAL", "0.5"))
+OUTBOX_LEASE: float = float(os.getenv("OUTBOX_LEASE", "30"))
+OUTBOX_RETRY_BACKOFF: float = float(os.getenv("OUTBOX_RETRY_BACKOFF", "1"))
+OUTBOX_RETRY_BACKOFF_MAX: float = float(os.getenv("OUTBOX_RETRY_BACKOFF_MAX", "300"))
+
+# Idempotency keys #################################################################################
+IDEMPOTENCY_KEY_TTL: float = float(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+
+# SQLite profile ###################################################################################
+SQLITE_PRAGMAS: Dict[str, str] = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", "268435456"),
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+}
+DB_SINGLE_WRITER: bool = os.getenv("DB_SINGLE_WRITER", "true").lower() == "true"
+DB_WRITER_BATCH_SIZE: int = int(os.getenv("DB_WRITER_BATCH_SIZE", "100"))
+
+# Health monitor ###################################################################################
+HEALTH_CHECK_INTERVAL: float = float(os.getenv("HEALTH_CHECK_INTERVAL", "5"))
+HEALTH_CHECK_TIMEOUT: float = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+
+# HTTP client ######################################################################################
+HTTP_CLIENT_TIMEOUT: float = float(os.getenv("HTTP_CLIENT_TIMEOUT", "5"))
+# Hosts order callbacks may go to; if empty, any host whose addresses are all public.
+CALLBACK_ALLOWED_HOSTS: Tuple[str, ...] = tuple(
+    host.strip().lower() for host in os.getenv("CALLBACK_ALLOWED_HOSTS", "").split(",") if host.strip()
+)
+
 # JWT Public Key #######################################################################
-PUBLIC_KEY: Dict[str, Optional[str]] = {"key": None}
\ No newline at end of file
+JWT_ALGORITHMS: List[str] = os.getenv("JWT_ALGORITHMS", "RS256").split(",")
+PUBLIC_KEY_ROTATION_OVERLAP: float = float(os.getenv("PUBLIC_KEY_ROTATION_OVERLAP", "300"))
+PUBLIC_KEY_MIN_REFRESH_INTERVAL: float = float(os.getenv("PUBLIC_KEY_MIN_REFRESH_INTERVAL", "30"))
+PUBLIC_KEY_WARMUP_ATTEMPTS: int = int(os.getenv("PUBLIC_KEY_WARMUP_ATTEMPTS", "5"))
+JWT_CACHE_SIZE: int = int(os.getenv("JWT_CACHE_SIZE", "10000"))
\ No newline at end of file
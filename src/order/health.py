@@ -0,0 +1,110 @@
+from .global_vars import (
+    HEALTH_CHECK_INTERVAL,
+    HEALTH_CHECK_TIMEOUT,
+)
+from .messaging import (
+    AMQP_CONNECTION,
+    CONSUMERS,
+    SAGA_REQUESTS,
+)
+from .sql import Engine
+from chassis.routers import get_system_metrics
+from datetime import (
+    datetime,
+    timezone,
+)
+from sqlalchemy import text
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class HealthMonitor:
+    """
+    Periodically checks the service dependencies and keeps the result as a snapshot.
+
+    Probes read the snapshot instead of checking on every request: the broker state
+    comes from the shared connection, the database is pinged through the pool and the
+    consumers report whether their channel is open.
+    """
+
+    def __init__(self, interval: float, timeout: float) -> None:
+        self._interval = interval
+        self._timeout = timeout
+        self._snapshot: Dict[str, Any] = {
+            "ready": False,
+            "checked_at": None,
+            "checks": {},
+            "database_pool": None,
+            "system_metrics": {},
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> Dict[str, Any]:
+        return self._snapshot
+
+    @property
+    def is_alive(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _database_healthy(self) -> bool:
+        try:
+            async with asyncio.timeout(self._timeout):
+                async with Engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.warning(f"[LOG:HEALTH] - Database check failed: Reason={e}")
+            return False
+
+    async def check(self) -> Dict[str, Any]:
+        checks: Dict[str, bool] = {
+            "broker": AMQP_CONNECTION.is_connected,
+            "database": await self._database_healthy(),
+            "saga_replies": SAGA_REQUESTS.is_running,
+        }
+        for consumer in CONSUMERS:
+            checks[f"consumer:{consumer.queue}"] = consumer.is_running
+        if self._snapshot["ready"] and not all(checks.values()):
+            failed = [name for name, healthy in checks.items() if not healthy]
+            logger.warning(f"[LOG:HEALTH] - Service not ready: failed={failed}")
+        self._snapshot = {
+            "ready": all(checks.values()),
+            "checked_at": datetime.now(timezone.utc),
+            "checks": checks,
+            "database_pool": Engine.sync_engine.pool.status(),
+            "system_metrics": await asyncio.to_thread(get_system_metrics),
+        }
+        return self._snapshot
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"[LOG:HEALTH] - Health check failed: Reason={e}", exc_info=True)
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="health-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+HEALTH_MONITOR = HealthMonitor(
+    interval=HEALTH_CHECK_INTERVAL,
+    timeout=HEALTH_CHECK_TIMEOUT,
+)
@@ -0,0 +1,59 @@
+from .global_vars import (
+    CALLBACK_ALLOWED_HOSTS,
+    HTTP_CLIENT_TIMEOUT,
+)
+from typing import Optional
+from urllib.parse import urlsplit
+import asyncio
+import httpx
+import ipaddress
+import socket
+
+# Shared, connection-pooled HTTP client for outgoing calls (webhooks, other services).
+# Redirects are not followed, so a callback cannot be bounced to another host.
+HTTP_CLIENT = httpx.AsyncClient(timeout=HTTP_CLIENT_TIMEOUT)
+
+def _literal_address(host: str) -> Optional[ipaddress.IPv4Address | ipaddress.IPv6Address]:
+    try:
+        return ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return None
+
+def check_callback_url(url: str) -> str:
+    """
+    Reject callback URLs that are not https, or whose host is not allowed: outside
+    CALLBACK_ALLOWED_HOSTS if set, otherwise a private, loopback or reserved address.
+    Raises ValueError; returns the url.
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "https":
+        raise ValueError("Callback URL must use https.")
+    if not (host := (parts.hostname or "").lower()):
+        raise ValueError("Callback URL must have a host.")
+    if CALLBACK_ALLOWED_HOSTS:
+        if host not in CALLBACK_ALLOWED_HOSTS:
+            raise ValueError(f"Callback host '{host}' is not allowed.")
+    elif (address := _literal_address(host)) is not None and not address.is_global:
+        raise ValueError(f"Callback address '{host}' is not public.")
+    return url
+
+async def check_callback_address(url: str) -> None:
+    """
+    Check a callback URL right before it is called: unless its host is allow-listed,
+    every address the host resolves to must be public. Raises ValueError.
+    """
+    check_callback_url(url)
+    parts = urlsplit(url)
+    if CALLBACK_ALLOWED_HOSTS:
+        return
+    try:
+        addresses = await asyncio.get_running_loop().getaddrinfo(
+            parts.hostname,
+            parts.port or 443,
+            type=socket.SOCK_STREAM,
+        )
+    except socket.gaierror as e:
+        raise ValueError(f"Callback host '{parts.hostname}' does not resolve: {e}") from e
+    for *_, sockaddr in addresses:
+        if not ipaddress.ip_address(sockaddr[0]).is_global:
+            raise ValueError(f"Callback host '{parts.hostname}' resolves to non-public address {sockaddr[0]}.")
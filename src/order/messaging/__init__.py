@@ -1,9 +1,49 @@
 from . import events
+from .batch_consumer import BatchConsumer
+from .connection import AMQP_CONNECTION
+from .consumer import (
+    CONSUMERS,
+    QueueConsumer,
+    register_consumer,
+    register_queue_handler,
+    start_consumers,
+    stop_consumers,
+)
+from .events import STATUS_UPDATE_CONSUMER
+from .outbox import (
+    OUTBOX_RELAY,
+    OutboxRelay,
+)
+from .publisher import (
+    ConfirmingPublisher,
+    MessageNotPublished,
+    PUBLISHER,
+)
+from .rpc import (
+    SAGA_REQUESTS,
+    SagaRequestClient,
+)
 from typing import (
     List,
     LiteralString,
 )
 
 __all__: List[LiteralString] = [
+    "AMQP_CONNECTION",
+    "BatchConsumer",
+    "ConfirmingPublisher",
+    "CONSUMERS",
     "events",
+    "MessageNotPublished",
+    "OUTBOX_RELAY",
+    "OutboxRelay",
+    "PUBLISHER",
+    "QueueConsumer",
+    "register_consumer",
+    "register_queue_handler",
+    "SAGA_REQUESTS",
+    "SagaRequestClient",
+    "start_consumers",
+    "STATUS_UPDATE_CONSUMER",
+    "stop_consumers",
 ]
\ No newline at end of file
@@ -0,0 +1,178 @@
+from .connection import (
+    declare_queue,
+    SharedConnection,
+)
+from aio_pika.abc import (
+    AbstractChannel,
+    AbstractIncomingMessage,
+)
+from chassis.messaging import MessageType
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[List[MessageType]], Awaitable[None]]
+
+class BatchConsumer:
+    """
+    Consumes a queue in batches on the event loop.
+
+    Messages are collected until 'batch_size' of them arrived or 'max_wait' seconds
+    passed since the first one, handed to the handler together and acknowledged with a
+    single frame. Undecodable messages are rejected on their own. If the handler fails
+    with one of 'retry_on', errors that may clear on their own, the whole batch is
+    requeued; any other failure is retried message by message, so only the messages
+    that fail alone are rejected and a poison message cannot block the queue.
+    """
+
+    def __init__(
+        self,
+        connection: SharedConnection,
+        queue: str,
+        handler: BatchHandler,
+        batch_size: int,
+        max_wait: float,
+        retry_on: Tuple[Type[BaseException], ...] = (ConnectionError, TimeoutError),
+    ) -> None:
+        self._connection = connection
+        self._queue = queue
+        self._handler = handler
+        self._batch_size = batch_size
+        self._max_wait = max_wait
+        self._retry_on = retry_on
+        self._channel: Optional[AbstractChannel] = None
+        self._pending: List[AbstractIncomingMessage] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._started_at = time.monotonic()
+        self._messages = 0
+        self._batches = 0
+        self._failed_batches = 0
+        self._last_batch_size = 0
+        self._last_batch_seconds = 0.0
+
+    @property
+    def queue(self) -> str:
+        return self._queue
+
+    @property
+    def is_running(self) -> bool:
+        return self._channel is not None and not self._channel.is_closed
+
+    async def start(self) -> None:
+        self._channel = await self._connection.channel(prefetch_count=self._batch_size)
+        queue = await declare_queue(self._channel, self._queue)
+        self._started_at = time.monotonic()
+        await queue.consume(self._on_message)
+        logger.info(f"[LOG:CONSUMER] - Batch consumer started: queue={self._queue}, batch_size={self._batch_size}")
+
+    async def stop(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self._flush()
+        if self._channel is not None:
+            await self._channel.close()
+            self._channel = None
+
+    async def _on_message(self, message: AbstractIncomingMessage) -> None:
+        self._pending.append(message)
+        if len(self._pending) >= self._batch_size:
+            await self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._max_wait)
+        self._timer = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        async with self._lock:
+            started = time.monotonic()
+            decoded: List[Tuple[AbstractIncomingMessage, MessageType]] = []
+            for message in batch:
+                try:
+                    decoded.append((message, json.loads(message.body)))
+                except ValueError:
+                    logger.warning(f"[LOG:CONSUMER] - Rejecting undecodable message: queue={self._queue}")
+                    await message.reject(requeue=False)
+            if not decoded:
+                return
+            payloads = [payload for _, payload in decoded]
+            accepted = decoded[-1][0]
+            try:
+                await self._handler(payloads)
+            except self._retry_on as e:
+                self._failed_batches += 1
+                logger.error(
+                    f"[LOG:CONSUMER] - Batch failed, requeueing: queue={self._queue}, size={len(batch)}, Reason={e}",
+                    exc_info=True,
+                )
+                await accepted.nack(multiple=True, requeue=True)
+                return
+            except Exception as e:
+                self._failed_batches += 1
+                logger.error(
+                    f"[LOG:CONSUMER] - Batch failed, handling its messages one by one: "
+                    f"queue={self._queue}, size={len(batch)}, Reason={e}",
+                    exc_info=True,
+                )
+                await self._handle_each(decoded)
+            else:
+                # Acknowledging the last accepted delivery with 'multiple' settles the whole batch.
+                await accepted.ack(multiple=True)
+
+            self._messages += len(payloads)
+            self._batches += 1
+            self._last_batch_size = len(payloads)
+            self._last_batch_seconds = time.monotonic() - started
+
+    async def _handle_each(self, decoded: List[Tuple[AbstractIncomingMessage, MessageType]]) -> None:
+        for message, payload in decoded:
+            try:
+                await self._handler([payload])
+            except self._retry_on as e:
+                logger.error(f"[LOG:CONSUMER] - Message failed, requeueing: queue={self._queue}, Reason={e}")
+                await message.nack(requeue=True)
+            except Exception as e:
+                logger.error(
+                    f"[LOG:CONSUMER] - Rejecting message that fails on its own: queue={self._queue}, Reason={e}",
+                    exc_info=True,
+                )
+                await message.reject(requeue=False)
+            else:
+                await message.ack()
+
+    def metrics(self) -> Dict[str, Any]:
+        uptime = time.monotonic() - self._started_at
+        return {
+            "queue": self._queue,
+            "messages": self._messages,
+            "batches": self._batches,
+            "failed_batches": self._failed_batches,
+            "messages_per_second": self._messages / uptime if uptime > 0 else 0.0,
+            "average_batch_size": self._messages / self._batches if self._batches else 0.0,
+            "last_batch_size": self._last_batch_size,
+            "last_batch_seconds": self._last_batch_seconds,
+        }
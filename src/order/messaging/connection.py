@@ -0,0 +1,103 @@
+from ..global_vars import RABBITMQ_CONFIG
+from aio_pika.abc import (
+    AbstractChannel,
+    AbstractExchange,
+    AbstractQueue,
+    AbstractRobustConnection,
+)
+from aiormq.exceptions import ChannelPreconditionFailed
+from chassis.messaging import RabbitMQConfig
+from typing import Optional
+import aio_pika
+import asyncio
+import ssl
+
+
+def build_ssl_context(rabbitmq_config: RabbitMQConfig) -> Optional[ssl.SSLContext]:
+    """Build the TLS context described by the chassis RabbitMQ configuration, if any."""
+    if not rabbitmq_config["use_tls"]:
+        return None
+    context = ssl.create_default_context(
+        cafile=str(rabbitmq_config["ca_cert"]) if rabbitmq_config["ca_cert"] is not None else None,
+    )
+    if rabbitmq_config["client_cert"] is not None and rabbitmq_config["client_key"] is not None:
+        context.load_cert_chain(
+            certfile=str(rabbitmq_config["client_cert"]),
+            keyfile=str(rabbitmq_config["client_key"]),
+        )
+    return context
+
+
+class SharedConnection:
+    """
+    Single asyncio RabbitMQ connection shared by every consumer of the process.
+
+    It is opened lazily on the running event loop and reconnects transparently; each
+    consumer gets its own channel on it.
+    """
+
+    def __init__(self, rabbitmq_config: RabbitMQConfig) -> None:
+        self._rabbitmq_config = rabbitmq_config
+        self._connection: Optional[AbstractRobustConnection] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed
+
+    async def _connect(self) -> AbstractRobustConnection:
+        async with self._lock:
+            if self._connection is None:
+                ssl_context = build_ssl_context(self._rabbitmq_config)
+                self._connection = await aio_pika.connect_robust(
+                    host=self._rabbitmq_config["host"],
+                    port=self._rabbitmq_config["port"],
+                    login=self._rabbitmq_config["username"],
+                    password=self._rabbitmq_config["password"],
+                    ssl=ssl_context is not None,
+                    ssl_context=ssl_context,
+                )
+            return self._connection
+
+    async def channel(self, prefetch_count: Optional[int] = None) -> AbstractChannel:
+        channel = await (await self._connect()).channel()
+        await channel.set_qos(
+            prefetch_count=prefetch_count if prefetch_count is not None else self._rabbitmq_config["prefetch_count"],
+        )
+        return channel
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+
+async def declare_exchange(
+    channel: AbstractChannel,
+    name: str,
+    exchange_type: str,
+) -> AbstractExchange:
+    """
+    Declare a durable exchange, falling back to the existing one when its owner
+    already declared it with different arguments.
+    """
+    try:
+        return await channel.declare_exchange(name, aio_pika.ExchangeType(exchange_type), durable=True)
+    except ChannelPreconditionFailed:
+        await channel.reopen()
+        return await channel.get_exchange(name, ensure=True)
+
+
+async def declare_queue(channel: AbstractChannel, name: str) -> AbstractQueue:
+    """
+    Declare a durable queue, falling back to the existing one when it was already
+    declared with different arguments.
+    """
+    try:
+        return await channel.declare_queue(name, durable=True)
+    except ChannelPreconditionFailed:
+        await channel.reopen()
+        return await channel.get_queue(name, ensure=True)
+
+
+AMQP_CONNECTION = SharedConnection(RABBITMQ_CONFIG)
@@ -0,0 +1,136 @@
+from .connection import (
+    AMQP_CONNECTION,
+    declare_exchange,
+    declare_queue,
+    SharedConnection,
+)
+from aio_pika.abc import (
+    AbstractChannel,
+    AbstractIncomingMessage,
+)
+from chassis.messaging import MessageType
+from typing import (
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Protocol,
+    TypeVar,
+    Union,
+)
+import asyncio
+import inspect
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[MessageType], Union[None, Awaitable[None]]]
+
+class Consumer(Protocol):
+    @property
+    def queue(self) -> str: ...
+    @property
+    def is_running(self) -> bool: ...
+    async def start(self) -> None: ...
+    async def stop(self) -> None: ...
+
+ConsumerT = TypeVar("ConsumerT", bound=Consumer)
+
+class QueueConsumer:
+    """
+    Consumes a queue one message at a time on the service's event loop.
+
+    Coroutine handlers run directly on the loop; plain functions are run in a worker
+    thread so they cannot stall it. A message is acknowledged once its handler returns
+    and rejected (not requeued) if the handler raises.
+    """
+
+    def __init__(
+        self,
+        connection: SharedConnection,
+        queue: str,
+        handler: MessageHandler,
+        exchange: Optional[str] = None,
+        exchange_type: str = "direct",
+        routing_key: Optional[str] = None,
+    ) -> None:
+        self._connection = connection
+        self._queue = queue
+        self._handler = handler
+        self._exchange = exchange
+        self._exchange_type = exchange_type
+        self._routing_key = routing_key
+        self._channel: Optional[AbstractChannel] = None
+
+    @property
+    def queue(self) -> str:
+        return self._queue
+
+    @property
+    def is_running(self) -> bool:
+        return self._channel is not None and not self._channel.is_closed
+
+    async def start(self) -> None:
+        self._channel = await self._connection.channel()
+        queue = await declare_queue(self._channel, self._queue)
+        if self._exchange is not None:
+            exchange = await declare_exchange(self._channel, self._exchange, self._exchange_type)
+            await queue.bind(exchange, routing_key=self._routing_key if self._routing_key is not None else self._queue)
+        await queue.consume(self._on_message)
+        logger.info(f"[LOG:CONSUMER] - Consumer started: queue={self._queue}")
+
+    async def stop(self) -> None:
+        if self._channel is not None:
+            await self._channel.close()
+            self._channel = None
+
+    async def _on_message(self, message: AbstractIncomingMessage) -> None:
+        try:
+            payload: MessageType = json.loads(message.body)
+            if inspect.iscoroutinefunction(self._handler):
+                await self._handler(payload)
+            else:
+                await asyncio.to_thread(self._handler, payload)
+        except Exception as e:
+            logger.error(f"[LOG:CONSUMER] - Message handling failed: queue={self._queue}, Reason={e}", exc_info=True)
+            await message.reject(requeue=False)
+            return
+        await message.ack()
+
+
+CONSUMERS: List[Consumer] = []
+
+def register_consumer(consumer: ConsumerT) -> ConsumerT:
+    """Add a consumer to the ones started and stopped with the application."""
+    CONSUMERS.append(consumer)
+    return consumer
+
+def register_queue_handler(
+    queue: str,
+    exchange: Optional[str] = None,
+    exchange_type: str = "direct",
+    routing_key: Optional[str] = None,
+) -> Callable[[MessageHandler], MessageHandler]:
+    """Consume 'queue' with the decorated function on the shared connection."""
+    def decorator(handler: MessageHandler) -> MessageHandler:
+        register_consumer(
+            QueueConsumer(
+                connection=AMQP_CONNECTION,
+                queue=queue,
+                handler=handler,
+                exchange=exchange,
+                exchange_type=exchange_type,
+                routing_key=routing_key,
+            )
+        )
+        return handler
+    return decorator
+
+async def start_consumers() -> None:
+    for consumer in CONSUMERS:
+        await consumer.start()
+
+async def stop_consumers() -> None:
+    for consumer in CONSUMERS:
+        await consumer.stop()
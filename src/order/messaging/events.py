@@ -1,84 +1,116 @@
 from ..global_vars import (
     LISTENING_QUEUES,
-    PUBLIC_KEY,
-    RABBITMQ_CONFIG,
+    PACKAGING_DELAY,
+    STATUS_UPDATE_BATCH_SIZE,
+    STATUS_UPDATE_BATCH_WAIT,
+    STATUS_UPDATE_QUEUE,
 )
+from ..scheduler import SCHEDULER
+from ..security import PUBLIC_KEYS
 from ..sql import (
+    apply_order_status_updates,
     Order,
-    update_order_status,
+    outbox_message,
+    SessionLocal,
 )
-from chassis.consul import CONSUL_CLIENT
-from chassis.messaging import (
-    MessageType,
-    RabbitMQPublisher,
+from .batch_consumer import BatchConsumer
+from .connection import AMQP_CONNECTION
+from .consumer import (
+    register_consumer,
     register_queue_handler,
 )
-from chassis.sql import SessionLocal
+from chassis.messaging import MessageType
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
 from random import randint
-import asyncio
+from sqlalchemy.exc import (
+    InterfaceError,
+    OperationalError,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
 import logging
-import requests
 
 logger = logging.getLogger(__name__)
 
-@register_queue_handler(LISTENING_QUEUES["order_status_update"])
-async def order_status_update(message: MessageType) -> None:
-    assert (order_id := message.get("order_id")) is not None, "'order_id' should exist."
-    assert (status := message.get("status")) is not None, "'status' should exist."
+def _schedule_packaging(order_id: int, status: str) -> Optional[Tuple[str, datetime]]:
+    # Simulated packaging time; the transition fires later without holding the consumer.
+    if status != Order.STATUS_PROCESSED:
+        return None
+    return Order.STATUS_PACKAGED, datetime.now(timezone.utc) + timedelta(seconds=randint(*PACKAGING_DELAY))
 
-    order_id = int(order_id)
-    status = str(status)
+async def order_status_update(messages: List[MessageType]) -> None:
+    updates: Dict[int, str] = {}
+    for message in messages:
+        # Malformed messages are skipped here, so they never fail the valid ones of the batch.
+        try:
+            order_id, status = int(message["order_id"]), message["status"]
+        except (KeyError, TypeError, ValueError):
+            order_id, status = None, None
+        if order_id is None or not isinstance(status, str):
+            logger.warning(f"[EVENT:STATUS_UPDATE:INVALID] - Ignoring malformed message: message={message}")
+            continue
+        # Last write wins within a batch.
+        updates[order_id] = status
 
-    if status == Order.STATUS_PROCESSED:
-        await asyncio.sleep(randint(5, 10))
-        status = Order.STATUS_PACKAGED
-        with RabbitMQPublisher(
-            queue="delivery.start",
-            rabbitmq_config=RABBITMQ_CONFIG,
-        ) as publisher:
-            publisher.publish({
-                "order_id": order_id,
-            })
+    if not updates:
+        return
 
     async with SessionLocal() as db:
-        await update_order_status(
-            db=db, 
-            order_id=order_id, 
-            status=status,
+        applied = await apply_order_status_updates(
+            db=db,
+            updates=updates,
+            follow_up=_schedule_packaging,
         )
 
+    for order_id, status in updates.items():
+        if applied.get(order_id) != status:
+            logger.warning(
+                "[EVENT:STATUS_UPDATE:CONFLICT] - Order status not updated: "
+                f"order_id={order_id}, "
+                f"status={status}"
+            )
+
     logger.info(
-        "[EVENT:STATUS_UPDATE:SUCCESS] - Order status updated: "
-        f"order_id={order_id}, "
-        f"status={status}"
+        "[EVENT:STATUS_UPDATE:SUCCESS] - Order statuses updated: "
+        f"received={len(messages)}, "
+        f"applied={len(applied)}"
+    )
+
+STATUS_UPDATE_CONSUMER = register_consumer(
+    BatchConsumer(
+        connection=AMQP_CONNECTION,
+        queue=STATUS_UPDATE_QUEUE,
+        handler=order_status_update,
+        batch_size=STATUS_UPDATE_BATCH_SIZE,
+        max_wait=STATUS_UPDATE_BATCH_WAIT,
+        # Only database and connection errors requeue the batch; they may clear on their own.
+        retry_on=(ConnectionError, TimeoutError, OperationalError, InterfaceError),
     )
+)
+
+@SCHEDULER.on_transition(Order.STATUS_PACKAGED)
+def order_packaged(db_order: Order) -> Tuple[Dict[str, Any], ...]:
+    # Committed with the transition; the outbox relay publishes it on its next poll.
+    return (outbox_message({"order_id": db_order.id}, queue="delivery.start"),)
 
 @register_queue_handler(
     queue=LISTENING_QUEUES["public_key"],
     exchange="public_key",
     exchange_type="fanout"
 )
-def public_key(message: MessageType) -> None:
-    global PUBLIC_KEY
-    assert (auth_base_url := CONSUL_CLIENT.discover_service("auth")) is not None, (
-        "The 'auth' service should be accesible"
-    )
+async def public_key(message: MessageType) -> None:
     assert "public_key" in message, "'public_key' field should be present."
     assert message["public_key"] == "AVAILABLE", (
         f"'public_key' value is '{message['public_key']}', expected 'AVAILABLE'"
     )
-    address, port = auth_base_url
-    response = requests.get(f"{address}:{port}/auth/key", timeout=5)
-    assert response.status_code == 200, (
-        f"Public key request returned '{response.status_code}', should return '200'"
-    )
-    data: dict = response.json()
-    new_key = data.get("public_key")
-    assert new_key is not None, (
-        "Auth response did not contain expected 'public_key' field."
-    )
-    PUBLIC_KEY["key"] = str(new_key)
-    logger.info(
-        "[EVENT:PUBLIC_KEY:UPDATED] - Public key updated: "
-        f"key={PUBLIC_KEY["key"]}"
-    )
\ No newline at end of file
+    if await PUBLIC_KEYS.refresh():
+        logger.info("[EVENT:PUBLIC_KEY:UPDATED] - Public key updated")
@@ -0,0 +1,155 @@
+from ..global_vars import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_LEASE,
+    OUTBOX_POLL_INTERVAL,
+    OUTBOX_RETRY_BACKOFF,
+    OUTBOX_RETRY_BACKOFF_MAX,
+)
+from ..sql import (
+    claim_outbox_batch,
+    delete_outbox_messages,
+    OutboxMessage,
+    retry_outbox_messages,
+    SessionLocal,
+)
+from .publisher import (
+    ConfirmingPublisher,
+    PUBLISHER,
+)
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class OutboxRelay:
+    """
+    Publishes the messages written to the 'outbox' table together with the state change
+    they announce.
+
+    Batches are claimed for 'lease' seconds, so concurrent relays publish disjoint rows,
+    and handed to the confirming publisher all at once. A row is deleted only after the
+    broker confirmed it; a failed one is retried after an exponential backoff, while the
+    rows behind it go on. Delivery is at least once: a crash between confirm and delete
+    republishes a batch once its lease expires.
+    """
+
+    def __init__(
+        self,
+        publisher: ConfirmingPublisher,
+        batch_size: int,
+        poll_interval: float,
+        lease: float,
+        retry_backoff: float,
+        retry_backoff_max: float,
+    ) -> None:
+        self._publisher = publisher
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._lease = lease
+        self._retry_backoff = retry_backoff
+        self._retry_backoff_max = retry_backoff_max
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._published = 0
+        self._failed = 0
+
+    def notify(self) -> None:
+        """Wake the relay up after writing outbox rows instead of waiting for the next poll."""
+        self._wakeup.set()
+
+    async def _publish(self, row: OutboxMessage) -> None:
+        await self._publisher.publish_body(
+            row.payload.encode(),
+            queue=row.queue,
+            exchange=row.exchange,
+            exchange_type=row.exchange_type,
+            routing_key=row.routing_key,
+        )
+
+    async def relay(self) -> int:
+        """Publish one batch; returns how many messages were claimed."""
+        now = datetime.now(timezone.utc)
+        async with SessionLocal() as db:
+            rows = await claim_outbox_batch(
+                db=db,
+                now=now,
+                lease_until=now + timedelta(seconds=self._lease),
+                limit=self._batch_size,
+            )
+        if not rows:
+            return 0
+        results = await asyncio.gather(*(self._publish(row) for row in rows), return_exceptions=True)
+        confirmed: List[int] = []
+        retries: Dict[int, datetime] = {}
+        for row, result in zip(rows, results):
+            if isinstance(result, BaseException):
+                self._failed += 1
+                backoff = min(self._retry_backoff * 2 ** (row.attempts - 1), self._retry_backoff_max)
+                retries[row.id] = datetime.now(timezone.utc) + timedelta(seconds=backoff)
+                logger.warning(
+                    "[LOG:OUTBOX] - Publish not confirmed, retrying later: "
+                    f"id={row.id}, routing_key={row.routing_key}, attempts={row.attempts}, "
+                    f"retry_in={backoff}s, Reason={result}"
+                )
+            else:
+                confirmed.append(row.id)
+        async with SessionLocal() as db:
+            if confirmed:
+                await delete_outbox_messages(db, confirmed)
+            if retries:
+                await retry_outbox_messages(db, retries)
+        self._published += len(confirmed)
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                # Keep draining while full batches come back.
+                while await self.relay() == self._batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"[LOG:OUTBOX] - Could not relay outbox messages: Reason={e}", exc_info=True)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+            except TimeoutError:
+                pass
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="outbox-relay")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "published": self._published,
+            "failed": self._failed,
+        }
+
+
+OUTBOX_RELAY = OutboxRelay(
+    publisher=PUBLISHER,
+    batch_size=OUTBOX_BATCH_SIZE,
+    poll_interval=OUTBOX_POLL_INTERVAL,
+    lease=OUTBOX_LEASE,
+    retry_backoff=OUTBOX_RETRY_BACKOFF,
+    retry_backoff_max=OUTBOX_RETRY_BACKOFF_MAX,
+)
@@ -0,0 +1,166 @@
+from ..global_vars import (
+    PUBLISHER_CONFIRM_WINDOW,
+    PUBLISHER_MAX_RETRIES,
+)
+from .connection import (
+    AMQP_CONNECTION,
+    declare_exchange,
+    declare_queue,
+    SharedConnection,
+)
+from aio_pika.abc import (
+    AbstractChannel,
+    AbstractExchange,
+)
+from aio_pika.exceptions import DeliveryError
+from chassis.messaging import MessageType
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Set,
+)
+import aio_pika
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MessageNotPublished(ConnectionError):
+    """A publish failed and none of its attempts can have reached a queue."""
+
+
+class ConfirmingPublisher:
+    """
+    Process-wide RabbitMQ publisher with asynchronous publisher confirms.
+
+    Every caller publishes on one confirm-mode channel and awaits its own confirm, so
+    up to 'window' messages are in flight at once and the broker acknowledges them in
+    batches. Nacked or failed publishes are retried; exchanges and queues are declared
+    once per channel. When every attempt failed before the message was sent, or was
+    nacked or returned by the broker, the publish raises MessageNotPublished; otherwise
+    the message may have been enqueued and the last error is raised.
+    """
+
+    def __init__(self, connection: SharedConnection, window: int, max_retries: int) -> None:
+        self._connection = connection
+        self._window = asyncio.Semaphore(window)
+        self._max_retries = max_retries
+        self._channel: Optional[AbstractChannel] = None
+        self._channel_lock = asyncio.Lock()
+        self._exchanges: Dict[str, AbstractExchange] = {}
+        self._queues: Set[str] = set()
+        self._in_flight = 0
+        self._confirmed = 0
+        self._retries = 0
+        self._failed = 0
+        self._confirm_seconds = 0.0
+        self._max_confirm_seconds = 0.0
+
+    async def _open_channel(self) -> AbstractChannel:
+        async with self._channel_lock:
+            if self._channel is None or self._channel.is_closed:
+                self._channel = await self._connection.channel()
+                self._exchanges.clear()
+                self._queues.clear()
+            return self._channel
+
+    async def _exchange(self, queue: str, exchange: str, exchange_type: str) -> AbstractExchange:
+        channel = await self._open_channel()
+        if queue and queue not in self._queues:
+            await declare_queue(channel, queue)
+            self._queues.add(queue)
+        if not exchange:
+            return channel.default_exchange
+        if (declared := self._exchanges.get(exchange)) is None:
+            declared = await declare_exchange(channel, exchange, exchange_type)
+            self._exchanges[exchange] = declared
+        return declared
+
+    async def publish_body(
+        self,
+        body: bytes,
+        queue: str = "",
+        exchange: str = "",
+        exchange_type: str = "direct",
+        routing_key: Optional[str] = None,
+    ) -> None:
+        """Publish an already encoded JSON body and wait until the broker confirms it."""
+        routing_key = routing_key if routing_key is not None else queue
+        async with self._window:
+            self._in_flight += 1
+            try:
+                maybe_sent = False
+                for attempt in range(self._max_retries + 1):
+                    started = time.monotonic()
+                    sending = False
+                    try:
+                        declared = await self._exchange(queue, exchange, exchange_type)
+                        sending = True
+                        await declared.publish(
+                            aio_pika.Message(
+                                body=body,
+                                content_type="application/json",
+                                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                            ),
+                            routing_key=routing_key,
+                        )
+                        break
+                    except Exception as e:
+                        # A nacked or returned message was not enqueued; one whose confirm was lost may have been.
+                        maybe_sent = maybe_sent or (sending and not isinstance(e, DeliveryError))
+                        if attempt == self._max_retries:
+                            self._failed += 1
+                            if not maybe_sent:
+                                raise MessageNotPublished(
+                                    f"Message not published: exchange={exchange}, routing_key={routing_key}, Reason={e}"
+                                ) from e
+                            raise
+                        self._retries += 1
+                        logger.warning(
+                            "[LOG:PUBLISHER] - Publish not confirmed, retrying: "
+                            f"exchange={exchange}, routing_key={routing_key}, Reason={e}"
+                        )
+                        await asyncio.sleep(0.1 * 2 ** attempt)
+            finally:
+                self._in_flight -= 1
+        elapsed = time.monotonic() - started
+        self._confirmed += 1
+        self._confirm_seconds += elapsed
+        self._max_confirm_seconds = max(self._max_confirm_seconds, elapsed)
+
+    async def publish(
+        self,
+        message: MessageType,
+        queue: str = "",
+        exchange: str = "",
+        exchange_type: str = "direct",
+        routing_key: Optional[str] = None,
+    ) -> None:
+        """Publish a message to a queue (default exchange) or to a named exchange."""
+        await self.publish_body(json.dumps(message).encode(), queue, exchange, exchange_type, routing_key)
+
+    async def close(self) -> None:
+        if self._channel is not None:
+            await self._channel.close()
+            self._channel = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "confirmed": self._confirmed,
+            "retries": self._retries,
+            "failed": self._failed,
+            "average_confirm_seconds": self._confirm_seconds / self._confirmed if self._confirmed else 0.0,
+            "max_confirm_seconds": self._max_confirm_seconds,
+        }
+
+
+PUBLISHER = ConfirmingPublisher(
+    connection=AMQP_CONNECTION,
+    window=PUBLISHER_CONFIRM_WINDOW,
+    max_retries=PUBLISHER_MAX_RETRIES,
+)
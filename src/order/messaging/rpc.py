@@ -0,0 +1,146 @@
+from ..global_vars import (
+    SAGA_REPLY_EXCHANGES,
+    SAGA_REPLY_INSTANCE_ID,
+    SAGA_REPLY_QUEUE_EXPIRES_MS,
+)
+from .connection import (
+    AMQP_CONNECTION,
+    declare_exchange,
+    SharedConnection,
+)
+from .publisher import (
+    MessageNotPublished,
+    PUBLISHER,
+)
+from aio_pika.abc import (
+    AbstractChannel,
+    AbstractIncomingMessage,
+)
+from chassis.messaging import MessageType
+from typing import (
+    Dict,
+    Iterable,
+    Optional,
+)
+from uuid import uuid4
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SagaRequestClient:
+    """
+    Awaitable request/reply client for saga commands.
+
+    Commands are published with a reply address whose routing key carries a correlation
+    id. Every reply exchange is bound to one durable per-instance reply queue, and its
+    single consumer resolves the future waiting for that correlation id, so saga steps
+    await replies without blocking the event loop and without per-saga queues.
+    """
+
+    def __init__(
+        self,
+        connection: SharedConnection,
+        instance_id: str,
+        reply_exchanges: Iterable[str],
+        queue_expires_ms: int,
+    ) -> None:
+        self._connection = connection
+        self._instance_id = instance_id
+        self._reply_exchanges = tuple(reply_exchanges)
+        self._queue_expires_ms = queue_expires_ms
+        self._channel: Optional[AbstractChannel] = None
+        self._pending: Dict[str, asyncio.Future[MessageType]] = {}
+
+    @property
+    def is_running(self) -> bool:
+        return self._channel is not None and not self._channel.is_closed
+
+    async def start(self) -> None:
+        self._channel = channel = await self._connection.channel()
+        # Survives reconnections; the broker drops it once this instance is gone for good.
+        queue = await channel.declare_queue(
+            f"order.saga.replies.{self._instance_id}",
+            durable=True,
+            arguments={"x-expires": self._queue_expires_ms},
+        )
+        for exchange_name in self._reply_exchanges:
+            exchange = await declare_exchange(channel, exchange_name, "topic")
+            await queue.bind(exchange, routing_key=f"{self._instance_id}.#")
+        await queue.consume(self._on_reply)
+        logger.info(f"[LOG:RPC] - Saga reply consumer started: queue={queue.name}")
+
+    async def stop(self) -> None:
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        if self._channel is not None:
+            await self._channel.close()
+            self._channel = None
+
+    async def _on_reply(self, message: AbstractIncomingMessage) -> None:
+        async with message.process():
+            correlation_id = message.correlation_id or (message.routing_key or "").rsplit(".", 1)[-1]
+            future = self._pending.pop(correlation_id, None)
+            if future is None or future.done():
+                logger.warning(
+                    "[LOG:RPC] - Discarding reply without a waiting request: "
+                    f"correlation_id={correlation_id}"
+                )
+                return
+            future.set_result(json.loads(message.body))
+
+    async def request(
+        self,
+        message: MessageType,
+        routing_key: str,
+        reply_exchange: str,
+        timeout: Optional[float] = None,
+        exchange: str = "cmd",
+        exchange_type: str = "topic",
+    ) -> MessageType:
+        """
+        Publish a command and wait for the reply addressed to it.
+
+        Raises TimeoutError if the command is not confirmed and answered within 'timeout'
+        seconds, or if publishing it failed after it may have reached the broker: either
+        way it may still take effect. A late reply is discarded by the consumer.
+        Raises MessageNotPublished if the command certainly was not sent.
+        """
+        assert reply_exchange in self._reply_exchanges, f"'{reply_exchange}' is not a reply exchange."
+        correlation_id = uuid4().hex
+        future: asyncio.Future[MessageType] = asyncio.get_running_loop().create_future()
+        self._pending[correlation_id] = future
+        try:
+            async with asyncio.timeout(timeout):
+                try:
+                    await PUBLISHER.publish(
+                        {
+                            **message,
+                            "response_exchange": reply_exchange,
+                            "response_exchange_type": "topic",
+                            "response_routing_key": f"{self._instance_id}.{correlation_id}",
+                            "correlation_id": correlation_id,
+                        },
+                        exchange=exchange,
+                        exchange_type=exchange_type,
+                        routing_key=routing_key,
+                    )
+                except MessageNotPublished:
+                    raise
+                except Exception as e:
+                    raise TimeoutError(f"Command '{routing_key}' not confirmed: {e}") from e
+                return await future
+        finally:
+            # Also when publishing failed or the caller was cancelled.
+            self._pending.pop(correlation_id, None)
+
+
+SAGA_REQUESTS = SagaRequestClient(
+    connection=AMQP_CONNECTION,
+    instance_id=SAGA_REPLY_INSTANCE_ID,
+    reply_exchanges=SAGA_REPLY_EXCHANGES,
+    queue_expires_ms=SAGA_REPLY_QUEUE_EXPIRES_MS,
+)
@@ -1,42 +1,84 @@
 from ..global_vars import (
-    PUBLIC_KEY,
-    RABBITMQ_CONFIG,
+    IDEMPOTENCY_KEY_TTL,
+    SAGA_TIMEOUT,
+)
+from ..health import HEALTH_MONITOR
+from ..http_client import (
+    check_callback_address,
+    HTTP_CLIENT,
+)
+from ..messaging import (
+    OUTBOX_RELAY,
+    PUBLISHER,
+    STATUS_UPDATE_CONSUMER,
 )
 from ..saga import (
+    SAGA_HISTORY,
+    SAGA_RECOVERY,
+    SAGA_RUNNER,
+    SAGA_STEP_METRICS,
     StateContext,
     OrderCancellationSaga,
     OrderCreationSaga,
 )
+from ..security import (
+    TOKEN_CACHE,
+    verify_jwt,
+)
 from ..sql import (
+    claim_idempotency_key,
+    complete_idempotency_key,
     create_order,
+    DB_WRITER,
+    get_db,
+    get_idempotency_record,
+    get_order,
+    HealthStatus,
+    list_orders,
     Message,
     Order,
+    ORDER_CACHE,
     OrderCancellationRequest,
     OrderCancellationResponse,
     OrderCreationRequest,
     OrderCreationResponse,
-    update_order_status,
+    OrderDetail,
+    OrderPage,
+    OrderPieceSchema,
+    OrderStatusResponse,
+    release_idempotency_key,
+    SagaHistoryItem,
+    SagaHistoryPage,
+    SessionLocal,
 )
 from chassis.routers import (
     get_system_metrics,
     raise_and_log_error,
 )
-from chassis.messaging import (
-    is_rabbitmq_healthy,
-    RabbitMQPublisher
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
 )
-from chassis.security import create_jwt_verifier
-from chassis.sql import get_db
 from fastapi import (
     APIRouter, 
     Depends, 
+    Header,
+    Response,
     status,
     Query
 )
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, List, Optional
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import hashlib
+import httpx
+import json
 import logging 
 import socket
+import time
+import uuid
 
 PIECE_PRICE: Dict[str, float] = {
     "A": 4.75,
@@ -56,27 +98,56 @@ Router = APIRouter(prefix="/order", tags=["Order"])
     response_model=Message,
 )
 async def health_check():
-    if not is_rabbitmq_healthy(RABBITMQ_CONFIG):
+    snapshot = HEALTH_MONITOR.snapshot
+    if not snapshot["ready"]:
         raise_and_log_error(
             logger=logger,
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            message="[LOG:REST] - RabbitMQ not reachable"
+            message=f"[LOG:REST] - Service not ready: checks={snapshot['checks']}"
         )
 
     container_id = socket.gethostname()
     logger.debug(f"[LOG:REST] - GET '/health' served by {container_id}")
     return {
         "detail": f"OK - Served by {container_id}",
-        "system_metrics": get_system_metrics()
+        "system_metrics": snapshot["system_metrics"]
+    }
+
+@Router.get(
+    "/health/live",
+    summary="Liveness probe",
+    response_model=Message,
+)
+async def liveness_check():
+    if not HEALTH_MONITOR.is_alive:
+        raise_and_log_error(
+            logger=logger,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            message="[LOG:REST] - Health monitor is not running"
+        )
+    return {
+        "detail": f"OK - Served by {socket.gethostname()}",
+        "system_metrics": {},
     }
 
+@Router.get(
+    "/health/ready",
+    summary="Readiness probe with the state of every dependency",
+    response_model=HealthStatus,
+)
+async def readiness_check(response: Response):
+    snapshot = HEALTH_MONITOR.snapshot
+    if not snapshot["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return snapshot
+
 @Router.get(
     "/health/auth",
     summary="Health check endpoint (JWT protected)",
     response_model=Message
 )
 async def health_check_auth(
-    token_data: dict = Depends(create_jwt_verifier(lambda: PUBLIC_KEY["key"], logger))
+    token_data: dict = Depends(verify_jwt)
 ):
     logger.debug("[LOG:REST] - GET '/health/auth' endpoint called.")
 
@@ -90,18 +161,111 @@ async def health_check_auth(
         "system_metrics": get_system_metrics()
     }
 
+@Router.get(
+    "/metrics",
+    summary="Runtime metrics of the service components (admin only)",
+    response_model=Dict[str, Dict[str, Any]],
+)
+async def service_metrics(
+    token_data: dict = Depends(verify_jwt),
+):
+    logger.debug("[LOG:REST] - GET '/metrics' endpoint called.")
+
+    user_role = token_data.get("role")
+    if user_role != "admin":
+        raise_and_log_error(
+            logger, 
+            status.HTTP_401_UNAUTHORIZED, 
+            f"Access denied: user_role={user_role} (admin required)",
+        )
+
+    return {
+        "status_update_consumer": STATUS_UPDATE_CONSUMER.metrics(),
+        "jwt_cache": TOKEN_CACHE.metrics(),
+        "db_writer": DB_WRITER.metrics(),
+        "order_cache": ORDER_CACHE.metrics(),
+        "outbox": OUTBOX_RELAY.metrics(),
+        "publisher": PUBLISHER.metrics(),
+        "saga_steps": SAGA_STEP_METRICS.metrics(),
+        "saga_history": SAGA_HISTORY.metrics(),
+        "saga_recovery": SAGA_RECOVERY.metrics(),
+    }
+
 # ----------------------------------------------------------------------
 # Create Order
 # ----------------------------------------------------------------------
+async def _complete_order_creation(
+    db: AsyncSession,
+    saga: OrderCreationSaga,
+    order_id: int,
+) -> Optional[Order]:
+    """
+    Run the creation saga for a persisted order. The saga approves the order and hands it
+    over to warehouse and delivery, or cancels it.
+    """
+    if await saga.process() == False:
+        return None
+
+    db_order = await get_order(db, order_id)
+    logger.info(f"[LOG:REST] - Order created: order_id={order_id}")
+    return db_order
+
+async def _complete_order_creation_in_background(
+    saga: OrderCreationSaga,
+    context: StateContext,
+    callback_url: Optional[str],
+) -> None:
+    async with SessionLocal() as db:
+        db_order = await _complete_order_creation(db, saga, context.order_id)
+
+    if db_order is None:
+        logger.warning(
+            "[LOG:REST] - Creation Saga failed: "
+            f"client_id={context.client_id}, order_id={context.order_id}"
+        )
+
+    if callback_url is not None:
+        order_status = db_order.status if db_order is not None else Order.STATUS_CANCELLED
+        try:
+            await check_callback_address(callback_url)
+            response = await HTTP_CLIENT.post(
+                callback_url,
+                json=OrderStatusResponse(order_id=context.order_id, status=order_status).model_dump(),
+            )
+            response.raise_for_status()
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(
+                "[LOG:REST] - Order callback failed: "
+                f"order_id={context.order_id}, url={callback_url}, Reason={e}"
+            )
+
 @Router.post(
     "/create",
     response_model=OrderCreationResponse,
     summary="Create a new order",
     status_code=status.HTTP_201_CREATED,
+    responses={
+        status.HTTP_202_ACCEPTED: {
+            "model": OrderCreationResponse,
+            "description": "Order accepted, the creation saga runs in the background",
+        },
+    },
 )
 async def order_creation(
     order_data: OrderCreationRequest,
-    token_data: dict = Depends(create_jwt_verifier(lambda: PUBLIC_KEY["key"], logger)),
+    response: Response,
+    async_mode: bool = Query(
+        False,
+        alias="async",
+        description="Return 202 right after persisting the order and run the saga in the background",
+    ),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Retries with the same key get the stored result instead of a new order",
+    ),
+    token_data: dict = Depends(verify_jwt),
     db: AsyncSession = Depends(get_db),
 ):
     client_id = int(token_data["sub"])
@@ -109,11 +273,154 @@ async def order_creation(
 
     logger.debug(
         "[LOG:REST] - POST '/order/create' called: "
-        f"client_id={client_id}, piece_amount={len(order_data.pieces)})"
+        f"client_id={client_id}, piece_amount={len(order_data.pieces)}, async={async_mode})"
     )
 
+    if idempotency_key is None:
+        status_code, result = await _order_creation(db, order_data, async_mode, client_id, user_role)
+    else:
+        request_hash = hashlib.sha256(
+            json.dumps(
+                {"order": order_data.model_dump(mode="json"), "async": async_mode},
+                sort_keys=True,
+            ).encode()
+        ).hexdigest()
+        if (replay := await _idempotent_replay(db, client_id, idempotency_key, request_hash)) is not None:
+            return replay
+        try:
+            status_code, result = await _order_creation(
+                db, order_data, async_mode, client_id, user_role, idempotency_key,
+            )
+        except StarletteHTTPException as e:
+            # Rejections are final too: a retry must not create another order.
+            await complete_idempotency_key(
+                db=db,
+                client_id=client_id,
+                key=idempotency_key,
+                status_code=e.status_code,
+                response=json.dumps({"detail": e.detail}),
+            )
+            raise
+        except BaseException:
+            # Unfinished (errors, cancelled requests).
+            await _abandon_idempotency_key(db, client_id, idempotency_key, order_data)
+            raise
+        await complete_idempotency_key(
+            db=db,
+            client_id=client_id,
+            key=idempotency_key,
+            status_code=status_code,
+            response=result.model_dump_json(),
+        )
+
+    response.status_code = status_code
+    if status_code == status.HTTP_202_ACCEPTED:
+        response.headers["Location"] = f"{Router.prefix}/{result.id}/status"
+    return result
+
+async def _idempotent_replay(
+    db: AsyncSession,
+    client_id: int,
+    idempotency_key: str,
+    request_hash: str,
+) -> Optional[Response]:
+    """
+    Stored response for a retried request, or None once the key is claimed for a new one.
+    """
+    now = datetime.now(timezone.utc)
+    not_before = now - timedelta(seconds=IDEMPOTENCY_KEY_TTL)
+    record = await get_idempotency_record(db, client_id, idempotency_key, not_before)
+    if record is None:
+        if await claim_idempotency_key(
+            db=db,
+            client_id=client_id,
+            key=idempotency_key,
+            request_hash=request_hash,
+            now=now,
+            not_before=not_before,
+        ):
+            return None
+    elif record.request_hash != request_hash:
+        raise_and_log_error(
+            logger=logger,
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            message=f"[LOG:REST] - Idempotency key reused with a different request: key={idempotency_key}",
+        )
+    elif record.status_code is not None and record.response is not None:
+        logger.info(f"[LOG:REST] - Idempotent replay: client_id={client_id}, key={idempotency_key}")
+        headers = {"Idempotent-Replayed": "true"}
+        if record.status_code == status.HTTP_202_ACCEPTED:
+            headers["Location"] = f"{Router.prefix}/{json.loads(record.response)['id']}/status"
+        return Response(
+            content=record.response,
+            status_code=record.status_code,
+            media_type="application/json",
+            headers=headers,
+        )
+    raise_and_log_error(
+        logger=logger,
+        status_code=status.HTTP_409_CONFLICT,
+        message=(
+            "[LOG:REST] - Request with the same idempotency key in progress: "
+            f"key={idempotency_key}, order_id={record.order_id if record is not None else None}"
+        ),
+    )
+
+async def _abandon_idempotency_key(
+    db: AsyncSession,
+    client_id: int,
+    idempotency_key: str,
+    order_data: OrderCreationRequest,
+) -> None:
+    """
+    Settle the key of a request that ended without a response. If no order was persisted
+    a retry may start over; otherwise it must not create another one, so it gets the
+    order's status URL, as if the order had been accepted to be created in the background.
+    """
+    # The error may have left the session in a failed transaction.
+    await db.rollback()
+    not_before = datetime.now(timezone.utc) - timedelta(seconds=IDEMPOTENCY_KEY_TTL)
+    record = await get_idempotency_record(db, client_id, idempotency_key, not_before)
+    if record is None or record.order_id is None:
+        await release_idempotency_key(db=db, client_id=client_id, key=idempotency_key)
+        return
+    await complete_idempotency_key(
+        db=db,
+        client_id=client_id,
+        key=idempotency_key,
+        status_code=status.HTTP_202_ACCEPTED,
+        response=OrderCreationResponse(
+            id=record.order_id,
+            pieces=order_data.pieces,
+            status=Order.STATUS_CREATED,
+            client_id=client_id,
+        ).model_dump_json(),
+    )
+
+async def _order_creation(
+    db: AsyncSession,
+    order_data: OrderCreationRequest,
+    async_mode: bool,
+    client_id: int,
+    user_role: Optional[str],
+    idempotency_key: Optional[str] = None,
+) -> Tuple[int, OrderCreationResponse]:
     total_amount = sum(piece.quantity * PIECE_PRICE[piece.type] for piece in order_data.pieces)
+    saga_id = uuid.uuid4().hex
+    deadline = time.time() + SAGA_TIMEOUT
 
+    def creation_context(db_order: Order) -> StateContext:
+        return StateContext(
+            order_id=db_order.id,
+            client_id=db_order.client_id,
+            admin=user_role == "admin",
+            total_amount=total_amount,
+            zipcode=db_order.zip,
+            deadline=deadline,
+            pieces=[piece.model_dump(mode="json") for piece in order_data.pieces],
+        )
+
+    # The saga instance is persisted with the order, so a crash cannot strand it in 'Created'.
     db_order = await create_order(
         db=db, 
         client_id=client_id, 
@@ -122,61 +429,123 @@ async def order_creation(
         zip=order_data.zip,
         total_amount=total_amount,
         pieces=order_data.pieces,
+        saga=lambda db_order: OrderCreationSaga.instance(saga_id, creation_context(db_order)),
+        idempotency_key=idempotency_key,
     )
 
-    saga = OrderCreationSaga(
-        StateContext(
-            order_id=db_order.id,
+    context = creation_context(db_order)
+    saga = OrderCreationSaga(context, instance_id=saga_id)
+
+    if async_mode or order_data.callback_url is not None:
+        SAGA_RUNNER.submit(
+            name=f"order-creation-{db_order.id}",
+            job=lambda: _complete_order_creation_in_background(
+                saga=saga,
+                context=context,
+                callback_url=str(order_data.callback_url) if order_data.callback_url is not None else None,
+            ),
+        )
+        logger.info(f"[LOG:REST] - Order accepted: order_id={db_order.id}")
+        return status.HTTP_202_ACCEPTED, OrderCreationResponse(
+            id=db_order.id,
+            pieces=order_data.pieces,
+            status=db_order.status,
             client_id=db_order.client_id,
-            admin=user_role == "admin",
-            total_amount=total_amount,
-            zipcode=db_order.zip,
         )
-    )
 
-    if await saga.process() == False:
-        await update_order_status(
-            db=db,
-            order_id=db_order.id,
-            status=Order.STATUS_CANCELLED,
-        )
+    if (approved_order := await _complete_order_creation(db, saga, db_order.id)) is None:
         raise_and_log_error(
             logger=logger, 
             status_code=status.HTTP_403_FORBIDDEN, 
             message=f"[LOG:REST] - Creation Saga failed: " 
                     f"client_id={db_order.client_id}, order_id={db_order.id}"
         )
+    assert approved_order is not None
 
-    assert (db_order := await update_order_status(db, db_order.id, Order.STATUS_APPROVED)), "Order should update correctly."
-
-    with RabbitMQPublisher(
-        queue="order.piece.request",
-        rabbitmq_config=RABBITMQ_CONFIG
-    ) as publisher:
-        publisher.publish({
-            "order_id": db_order.id,
-            "pieces": [piece.model_dump(mode="json") for piece in order_data.pieces],
-        })
-
-    with RabbitMQPublisher(
-        queue="delivery.create",
-        rabbitmq_config=RABBITMQ_CONFIG
-    ) as publisher:
-        publisher.publish({
-            "order_id": db_order.id,
-            "city": db_order.city,
-            "street": db_order.street,
-            "zip": db_order.zip,
-            "client_id": db_order.client_id,
-        })
-
-    logger.info(f"[LOG:REST] - Order created: order_id={db_order.id}")
-
-    return OrderCreationResponse(
-        id=db_order.id,
+    return status.HTTP_201_CREATED, OrderCreationResponse(
+        id=approved_order.id,
         pieces=order_data.pieces,
+        status=approved_order.status,
+        client_id=approved_order.client_id,
+    )
+
+@Router.get(
+    "/{order_id}/status",
+    response_model=OrderStatusResponse,
+    summary="Get the status of an order",
+)
+async def order_status(
+    order_id: int,
+    token_data: dict = Depends(verify_jwt),
+    db: AsyncSession = Depends(get_db),
+):
+    logger.debug(f"[LOG:REST] - GET '/order/{order_id}/status' called.")
+
+    db_order = await get_order(db, order_id)
+    if db_order is None or (token_data.get("role") != "admin" and db_order.client_id != int(token_data["sub"])):
+        raise_and_log_error(
+            logger=logger,
+            status_code=status.HTTP_404_NOT_FOUND,
+            message=f"[LOG:REST] - Order not found: order_id={order_id}",
+        )
+    assert db_order is not None
+
+    return OrderStatusResponse(
+        order_id=db_order.id,
         status=db_order.status,
-        client_id=db_order.client_id,
+    )
+
+@Router.get(
+    "/",
+    response_model=OrderPage,
+    summary="List orders by client, status and id range",
+)
+async def order_list(
+    client_id: Optional[int] = Query(None, description="Only orders of this client"),
+    order_status: Optional[str] = Query(None, alias="status", description="Only orders in this status"),
+    cursor: Optional[int] = Query(None, description="'next_cursor' of the previous page"),
+    before_id: Optional[int] = Query(None, description="Only orders with a lower id"),
+    limit: int = Query(100, ge=1, le=1000, description="Orders per page"),
+    token_data: dict = Depends(verify_jwt),
+    db: AsyncSession = Depends(get_db),
+):
+    logger.debug(f"[LOG:REST] - GET '/order/' called. client_id={client_id}, status={order_status}, cursor={cursor}")
+
+    if token_data.get("role") != "admin":
+        if client_id is not None and client_id != int(token_data["sub"]):
+            raise_and_log_error(
+                logger,
+                status.HTTP_401_UNAUTHORIZED,
+                f"Access denied: client_id={client_id} (admin required)",
+            )
+        client_id = int(token_data["sub"])
+
+    db_orders = await list_orders(
+        db=db,
+        client_id=client_id,
+        status=order_status,
+        after_id=cursor,
+        before_id=before_id,
+        limit=limit,
+    )
+    return OrderPage(
+        items=[
+            OrderDetail(
+                id=db_order.id,
+                client_id=db_order.client_id,
+                city=db_order.city,
+                street=db_order.street,
+                zip=db_order.zip,
+                status=db_order.status,
+                total_amount=db_order.total_amount,
+                pieces=[
+                    OrderPieceSchema(type=piece.piece_type, quantity=piece.quantity)
+                    for piece in db_order.pieces
+                ],
+            )
+            for db_order in db_orders
+        ],
+        next_cursor=db_orders[-1].id if len(db_orders) == limit else None,
     )
     
 @Router.post(
@@ -188,7 +557,7 @@ async def order_creation(
 async def order_cancelation(
     request: OrderCancellationRequest,
     db: AsyncSession = Depends(get_db),
-    token_data: dict = Depends(create_jwt_verifier(lambda: PUBLIC_KEY["key"], logger)),
+    token_data: dict = Depends(verify_jwt),
 ):
     order_id = request.order_id
     user_role = token_data.get("role")
@@ -223,16 +592,47 @@ async def order_cancelation(
 # ------------------------------------------------------------------------------------
 # Saga history
 # ------------------------------------------------------------------------------------
+SAGA_TYPES: Tuple[str, ...] = (
+    OrderCreationSaga.SAGA_TYPE,
+    OrderCancellationSaga.SAGA_TYPE,
+)
+
+def _to_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return value.astimezone(timezone.utc) if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+def _saga_history_item(saga_type: str, order_id: int, transitions: List[Tuple[str, datetime]]) -> SagaHistoryItem:
+    return SagaHistoryItem(
+        saga_type=saga_type,
+        order_id=order_id,
+        states=[state for state, _ in transitions],
+        updated_at=transitions[-1][1],
+    )
+
 @Router.get(
     "/saga/history",
     summary="Get saga state history",
-    response_model=Dict[int, List[str]],
+    response_model=SagaHistoryPage,
+    responses={
+        status.HTTP_200_OK: {
+            "content": {"application/x-ndjson": {}},
+            "description": "One saga per line when 'stream' is set",
+        },
+    },
 )
 async def get_saga_history(
     order_id: Optional[int] = Query(None, description="Order id"),
-    token_data: dict = Depends(create_jwt_verifier(lambda: PUBLIC_KEY["key"], logger)),
+    saga_type: Optional[str] = Query(None, description="'creation' or 'cancellation'; both if omitted"),
+    terminal_state: Optional[str] = Query(None, description="Last state reached by the saga"),
+    since: Optional[datetime] = Query(None, description="Last transition at or after this time"),
+    until: Optional[datetime] = Query(None, description="Last transition before this time"),
+    cursor: Optional[str] = Query(None, description="'next_cursor' of the previous page"),
+    limit: int = Query(100, ge=1, le=1000, description="Sagas per page"),
+    stream: bool = Query(False, description="Stream every matching saga as NDJSON"),
+    token_data: dict = Depends(verify_jwt),
 ):
-    logger.debug(f"[LOG:REST] - GET '/saga/history' called. order_id={order_id}")
+    logger.debug(f"[LOG:REST] - GET '/saga/history' called. order_id={order_id}, saga_type={saga_type}, cursor={cursor}")
     
     user_role = token_data.get("role")
     if user_role != "admin":
@@ -242,15 +642,72 @@ async def get_saga_history(
             f"Access denied: user_role={user_role} (admin required)",
         )
 
+    if saga_type is not None and saga_type not in SAGA_TYPES:
+        raise_and_log_error(
+            logger=logger,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message=f"Unknown saga type '{saga_type}'",
+        )
+    saga_types = [saga_type] if saga_type is not None else list(SAGA_TYPES)
+    since, until = _to_utc(since), _to_utc(until)
+
     if order_id is not None:
-        if order_id in OrderCreationSaga.SAGA_HISTORY:
-            return {order_id: OrderCreationSaga.SAGA_HISTORY[order_id]}
-        else:
+        items: List[SagaHistoryItem] = []
+        for current_type in saga_types:
+            if not (transitions := await SAGA_HISTORY.get(current_type, order_id)):
+                continue
+            item = _saga_history_item(current_type, order_id, transitions)
+            if (
+                (terminal_state is None or item.states[-1] == terminal_state)
+                and (since is None or item.updated_at >= since)
+                and (until is None or item.updated_at < until)
+            ):
+                items.append(item)
+        if not items:
             raise_and_log_error(
                 logger=logger,
                 status_code=status.HTTP_404_NOT_FOUND,
                 message=f"Saga history not found for order {order_id}"
             )
-            
-    return OrderCreationSaga.SAGA_HISTORY
+        return SagaHistoryPage(items=items, next_cursor=None)
 
+    after: Optional[Tuple[str, int]] = None
+    if cursor is not None:
+        try:
+            cursor_saga_type, cursor_order_id = cursor.split(":", 1)
+            after = (cursor_saga_type, int(cursor_order_id))
+        except ValueError:
+            raise_and_log_error(
+                logger=logger,
+                status_code=status.HTTP_400_BAD_REQUEST,
+                message=f"Invalid cursor '{cursor}'",
+            )
+
+    async def read_page(after: Optional[Tuple[str, int]]) -> List[SagaHistoryItem]:
+        return [
+            _saga_history_item(*saga)
+            for saga in await SAGA_HISTORY.page(
+                saga_types=saga_types,
+                terminal_state=terminal_state,
+                since=since,
+                until=until,
+                after=after,
+                limit=limit,
+            )
+        ]
+
+    if stream:
+        async def export() -> AsyncIterator[str]:
+            page_after = after
+            while (items := await read_page(page_after)):
+                for item in items:
+                    yield item.model_dump_json() + "\n"
+                page_after = (items[-1].saga_type, items[-1].order_id)
+
+        return StreamingResponse(export(), media_type="application/x-ndjson")
+
+    items = await read_page(after)
+    return SagaHistoryPage(
+        items=items,
+        next_cursor=f"{items[-1].saga_type}:{items[-1].order_id}" if len(items) == limit else None,
+    )
@@ -1,9 +1,51 @@
-from .base_state import StateContext
+from .base_saga import (
+    BaseSaga,
+    SAGAS,
+)
+from .base_state import (
+    Outcome,
+    StateContext,
+)
+from .engine import (
+    Branch,
+    Parallel,
+    SAGA_STEP_METRICS,
+    SagaStepMetrics,
+    Step,
+    TransitionTable,
+)
+from .history import (
+    SAGA_HISTORY,
+    SagaHistoryStore,
+)
 from .order_cancellation.saga import OrderCancellationSaga
 from .order_creation.saga import OrderCreationSaga
+from .recovery import (
+    SAGA_RECOVERY,
+    SagaRecovery,
+)
+from .runner import (
+    SAGA_RUNNER,
+    SagaRunner,
+)
 
 __all__: list[str] = [
+    "BaseSaga",
+    "Branch",
+    "Outcome",
+    "Parallel",
+    "SAGA_HISTORY",
+    "SAGA_RECOVERY",
+    "SAGA_STEP_METRICS",
+    "SagaHistoryStore",
+    "SagaRecovery",
+    "SAGAS",
+    "SagaStepMetrics",
     "StateContext",
+    "Step",
+    "TransitionTable",
     "OrderCancellationSaga",
     "OrderCreationSaga",
+    "SAGA_RUNNER",
+    "SagaRunner",
 ]
\ No newline at end of file
@@ -1,24 +1,272 @@
-from .base_state import State
-from abc import (
-    ABC,
-    abstractmethod,
+from ..global_vars import (
+    SAGA_OWNER,
+    SAGA_TIMEOUT,
 )
+from ..sql import (
+    add_saga_instance,
+    delete_saga_instance,
+    SagaInstance,
+    SessionLocal,
+    update_saga_instance,
+)
+from .base_state import (
+    Outcome,
+    State,
+    StateContext,
+)
+from .engine import (
+    Branch,
+    Parallel,
+    SAGA_STEP_METRICS,
+    TransitionTable,
+)
+from .history import SAGA_HISTORY
+from abc import ABC
+from contextlib import contextmanager
+from dataclasses import asdict
+from enum import StrEnum
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Type,
+)
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Saga classes by SAGA_TYPE, to restore persisted instances.
+SAGAS: Dict[str, Type["BaseSaga"]] = {}
+# Ids of the saga instances executing in this process, which recovery must not claim.
+RUNNING: Set[str] = set()
 
 class BaseSaga(ABC):
-    @abstractmethod
-    async def _on_event(self, event: State) -> None:
+    """
+    Generic saga executor driven by the TRANSITIONS table of the subclass.
+
+    Each step runs its State, or its parallel States joined into one outcome, and looks
+    the next one up by outcome until a terminal step gives the result. Every state reached
+    is recorded in the saga history.
+
+    The saga instance (state, context and deadline) is persisted in the 'saga_instance'
+    table while it runs, so SAGA_RECOVERY can resume it after a crash. Its writes are
+    fenced by the owner, and a saga taken over by another instance stops.
+    """
+    SAGA_TYPE: str
+    TRANSITIONS: TransitionTable
+    # The order is created together with the saga, so it cannot have history yet.
+    NEW_ORDER: bool = False
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        SAGAS[cls.SAGA_TYPE] = cls
+
+    def __init__(
+        self,
+        context: StateContext,
+        instance_id: Optional[str] = None,
+        state: Optional[str] = None,
+        branches: Optional[Dict[str, str]] = None,
+    ) -> None:
         """
-        State change
+        'instance_id' names a saga instance row that is already persisted (see 'instance');
+        'state' resumes that instance from a recovered state instead of starting over, and
+        'branches' holds the outcomes its parallel branches reported there.
         """
-        pass
+        self._context = context
+        if self._context.deadline is None:
+            self._context.deadline = time.time() + SAGA_TIMEOUT
+        self._instance_id = instance_id if instance_id is not None else uuid.uuid4().hex
+        self._context.instance_id = self._instance_id
+        self._persisted = instance_id is not None
+        self._branches: Dict[str, Outcome] = {
+            name: Outcome(outcome) for name, outcome in (branches or {}).items()
+        }
+        self._progress = asyncio.Lock()
+        if state is None:
+            self._state: StrEnum = self.TRANSITIONS.initial
+            SAGA_HISTORY.append(self.SAGA_TYPE, self._context.order_id, str(self._state), new=self.NEW_ORDER)
+        else:
+            self._state = type(self.TRANSITIONS.initial)(state)
+
+    @classmethod
+    def instance(cls, instance_id: str, context: StateContext) -> Dict[str, Any]:
+        """Saga instance row for a new saga, to persist it before it is constructed."""
+        if context.deadline is None:
+            context.deadline = time.time() + SAGA_TIMEOUT
+        context.instance_id = instance_id
+        return {
+            "id": instance_id,
+            "saga_type": cls.SAGA_TYPE,
+            "order_id": context.order_id,
+            "state": str(cls.TRANSITIONS.initial),
+            "context": json.dumps(asdict(context)),
+            "deadline": context.deadline,
+            "owner": SAGA_OWNER,
+        }
+
+    @staticmethod
+    def restore(instance: SagaInstance) -> "BaseSaga":
+        """Saga of a persisted instance, positioned at its last recorded state."""
+        return SAGAS[instance.saga_type](
+            StateContext(**json.loads(instance.context)),
+            instance_id=instance.id,
+            state=instance.state,
+            branches=json.loads(instance.branches) if instance.branches is not None else None,
+        )
 
-    @abstractmethod
     async def process(self) -> bool:
         """
         Process SAGA
         """
-        pass
+        logger.info(f"[LOG:SAGA] - Processing Order {self._context.order_id}")
+        if not self._persisted:
+            async with SessionLocal() as db:
+                await add_saga_instance(db, self.instance(self._instance_id, self._context))
+            self._persisted = True
+        with self._running():
+            return await self._execute()
+
+    async def resume(self) -> bool:
+        """
+        Continue a recovered saga. Local steps are run again; a step waiting for a reply
+        is handled as timed out, since the reply went to the instance that stopped. Of a
+        parallel step, the branches whose outcome was recorded keep it; the others are
+        handled as timed out, and compensated.
+        """
+        logger.info(
+            f"[LOG:SAGA] - Resuming {self.SAGA_TYPE} saga: "
+            f"order_id={self._context.order_id}, state={self._state}"
+        )
+        with self._running():
+            step = self.TRANSITIONS[self._state]
+            if Outcome.TIMEOUT in step.next:
+                if isinstance(step.state, Parallel):
+                    outcome = await self._settle(
+                        step.state,
+                        [self._branches.get(branch.state.__name__, Outcome.TIMEOUT) for branch in step.state.branches],
+                    )
+                else:
+                    outcome = Outcome.TIMEOUT
+                if not await self._advance(step.next[outcome]):
+                    return False
+            return await self._execute()
+
+    @contextmanager
+    def _running(self) -> Iterator[None]:
+        RUNNING.add(self._instance_id)
+        try:
+            yield
+        finally:
+            RUNNING.discard(self._instance_id)
+
+    async def _execute(self) -> bool:
+        while True:
+            step = self.TRANSITIONS[self._state]
+            logger.info(f"[LOG:SAGA] - State: {self._state}")
+            started = time.monotonic()
+            try:
+                if Outcome.TIMEOUT in step.next and time.time() >= self._context.deadline:
+                    # Past the deadline nothing is sent anymore, so there is nothing to compensate.
+                    outcome = Outcome.FAILED
+                elif isinstance(step.state, Parallel):
+                    outcome = await self._join(step.state)
+                else:
+                    outcome = await step.state(self._context).run()
+            finally:
+                SAGA_STEP_METRICS.observe(self.SAGA_TYPE, str(self._state), time.monotonic() - started)
+
+            if step.result is not None:
+                async with SessionLocal() as db:
+                    await delete_saga_instance(db, self._instance_id, SAGA_OWNER)
+                result = step.result and outcome == Outcome.OK
+                logger.info(
+                    f"[LOG:SAGA] - {self.SAGA_TYPE.capitalize()} saga finished: "
+                    f"order_id={self._context.order_id}, state={self._state}, result={result}"
+                )
+                return result
+
+            if not await self._advance(step.next[outcome]):
+                return False
+
+    async def _advance(self, state: StrEnum) -> bool:
+        self._state = state
+        self._branches = {}
+        SAGA_HISTORY.append(self.SAGA_TYPE, self._context.order_id, str(self._state))
+        return await self._save()
+
+    async def _save(self) -> bool:
+        async with SessionLocal() as db:
+            if await update_saga_instance(
+                db=db,
+                instance_id=self._instance_id,
+                owner=SAGA_OWNER,
+                state=str(self._state),
+                context=json.dumps(asdict(self._context)),
+                branches=json.dumps(self._branches) if self._branches else None,
+            ):
+                return True
+        logger.warning(
+            "[LOG:SAGA] - Saga taken over by another instance: "
+            f"saga_type={self.SAGA_TYPE}, order_id={self._context.order_id}"
+        )
+        return False
+
+    async def _run_branch(self, state: Type[State]) -> Outcome:
+        started = time.monotonic()
+        try:
+            return await state(self._context).run()
+        finally:
+            SAGA_STEP_METRICS.observe(self.SAGA_TYPE, state.__name__, time.monotonic() - started)
+
+    async def _record_branch(self, state: Type[State]) -> Outcome:
+        outcome = await self._run_branch(state)
+        # Persisted as it arrives, so a resumed saga knows which branches took effect.
+        async with self._progress:
+            self._branches[state.__name__] = outcome
+            await self._save()
+        return outcome
+
+    async def _join(self, parallel: Parallel) -> Outcome:
+        results = await asyncio.gather(
+            *(self._record_branch(branch.state) for branch in parallel.branches),
+            return_exceptions=True,
+        )
+        # A branch that raised is handled like one that timed out.
+        outcome = await self._settle(
+            parallel,
+            [Outcome.TIMEOUT if isinstance(result, BaseException) else result for result in results],
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return outcome
+
+    async def _settle(self, parallel: Parallel, outcomes: List[Outcome]) -> Outcome:
+        """Joined outcome of the branches; unless it is OK, the branches that did not fail are undone."""
+        if all(outcome == Outcome.OK for outcome in outcomes):
+            return Outcome.OK
+
+        await self._compensate(
+            branch
+            for branch, outcome in zip(parallel.branches, outcomes)
+            if outcome != Outcome.FAILED
+        )
+        return Outcome.FAILED if Outcome.FAILED in outcomes else Outcome.TIMEOUT
+
+    async def _compensate(self, branches: Iterable[Branch]) -> None:
+        compensations = [branch.compensation for branch in branches if branch.compensation is not None]
+        for compensation in compensations:
+            SAGA_HISTORY.append(self.SAGA_TYPE, self._context.order_id, compensation.__name__)
+        await asyncio.gather(*(self._run_branch(compensation) for compensation in compensations))
 
-    @abstractmethod
     def get_state(self) -> str:
-        pass
\ No newline at end of file
+        return str(self._state)
@@ -3,7 +3,14 @@ from abc import (
     abstractmethod,
 )
 from dataclasses import dataclass
-from typing import Optional
+from enum import StrEnum
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+import time
 
 @dataclass
 class StateContext:
@@ -13,6 +20,31 @@ class StateContext:
     admin: Optional[bool]
     total_amount: Optional[float]
     zipcode: Optional[str]
+    deadline: Optional[float] = None
+    pieces: Optional[List[Dict[str, Any]]] = None
+    # Set once this saga moved the order to 'Cancelling'; only then may it roll it back.
+    cancelling: bool = False
+    # Set once this saga approved the order; a resumed saga must not approve it again.
+    approved: bool = False
+    # Saga instance row of this context, for steps that record progress with their writes.
+    instance_id: Optional[str] = None
+
+    def step_timeout(self, timeout: float) -> float:
+        """
+        Time a step may wait: its own timeout, capped by what is left of the saga deadline.
+        Raises TimeoutError once the saga deadline has passed.
+        """
+        if self.deadline is None:
+            return timeout
+        if (remaining := self.deadline - time.time()) <= 0:
+            raise TimeoutError("Saga deadline exceeded.")
+        return min(timeout, remaining)
+
+class Outcome(StrEnum):
+    """Result of a step; the saga's transition table maps it to the next state."""
+    OK = "ok"
+    FAILED = "failed"
+    TIMEOUT = "timeout"
 
 class State(ABC):
     """
@@ -24,9 +56,9 @@ class State(ABC):
         self._context = context
 
     @abstractmethod
-    async def on_event(self, event: 'State') -> 'State':
+    async def run(self) -> Outcome:
         """
-        Handle events that are delegated to this State.
+        Execute the step of this State.
         """
         pass
 
@@ -40,4 +72,4 @@ class State(ABC):
         """
         Returns the name of the State.
         """
-        return self.__class__.__name__
\ No newline at end of file
+        return self.__class__.__name__
@@ -0,0 +1,102 @@
+from .base_state import (
+    Outcome,
+    State,
+)
+from dataclasses import (
+    dataclass,
+    field,
+)
+from enum import StrEnum
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+@dataclass(frozen=True)
+class Branch:
+    """One State of a parallel step, with the State that undoes it if the join fails."""
+    state: Type[State]
+    compensation: Optional[Type[State]] = None
+
+@dataclass(frozen=True)
+class Parallel:
+    """
+    States that run concurrently as a single step. The step is OK when every branch
+    is; otherwise it is FAILED if any branch failed, or TIMEOUT, and each branch that
+    did not fail is compensated. A branch without a reply may still take effect after
+    the saga gave up, so it is compensated like one that reported OK; compensations
+    must therefore be idempotent on the peer side. A branch whose effect cannot be
+    undone does not belong in a parallel step.
+    """
+    branches: Tuple[Branch, ...]
+
+    def __init__(self, *branches: Branch) -> None:
+        object.__setattr__(self, "branches", branches)
+
+@dataclass(frozen=True)
+class Step:
+    """
+    Entry of a transition table: the State (or parallel States) that runs, and where each
+    of its outcomes leads. Terminal steps have no transitions and carry the result of the
+    saga instead, which turns False if their State does not succeed.
+    """
+    state: Union[Type[State], Parallel]
+    next: Mapping[Outcome, StrEnum] = field(default_factory=dict)
+    result: Optional[bool] = None
+
+class TransitionTable:
+    """
+    Declarative description of a saga, checked once when the saga class is defined.
+
+    Compensations are ordinary steps that failure outcomes lead to. Every target must be
+    a step of the table, and every step is either terminal or has transitions.
+    """
+
+    def __init__(self, initial: StrEnum, steps: Mapping[StrEnum, Step]) -> None:
+        for name, step in steps.items():
+            if (step.result is None) == (not step.next):
+                raise ValueError(f"Step {name} must either be terminal or have transitions.")
+            for target in step.next.values():
+                if target not in steps:
+                    raise ValueError(f"Step {name} leads to unknown step {target}.")
+        if initial not in steps:
+            raise ValueError(f"Unknown initial step {initial}.")
+        self.initial = initial
+        self._steps: Dict[StrEnum, Step] = dict(steps)
+
+    def __getitem__(self, name: StrEnum) -> Step:
+        return self._steps[name]
+
+
+class SagaStepMetrics:
+    """Count and latency of every step run, per saga type and state."""
+
+    def __init__(self) -> None:
+        self._steps: Dict[Tuple[str, str], List[float]] = {}
+
+    def observe(self, saga_type: str, state: str, seconds: float) -> None:
+        if (entry := self._steps.get((saga_type, state))) is None:
+            self._steps[(saga_type, state)] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            f"{saga_type}.{state}": {
+                "count": count,
+                "average_seconds": total / count,
+                "max_seconds": longest,
+            }
+            for (saga_type, state), (count, total, longest) in self._steps.items()
+        }
+
+
+SAGA_STEP_METRICS = SagaStepMetrics()
@@ -0,0 +1,205 @@
+from ..global_vars import (
+    SAGA_HISTORY_BUFFER_SIZE,
+    SAGA_HISTORY_CACHE_SIZE,
+    SAGA_HISTORY_CACHE_TTL,
+    SAGA_HISTORY_FLUSH_INTERVAL,
+    SAGA_HISTORY_FLUSH_SIZE,
+)
+from ..sql import (
+    add_saga_history_entries,
+    get_saga_history_page,
+    get_saga_history_transitions,
+    SessionLocal,
+)
+from collections import OrderedDict
+from datetime import (
+    datetime,
+    timezone,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+SagaKey = Tuple[str, int]
+Transition = Tuple[str, datetime]
+
+class SagaHistoryStore:
+    """
+    Append-only saga history persisted in the database.
+
+    Transitions are buffered and written in batches by a background task. While the
+    database is unavailable the buffer keeps at most 'buffer_size' entries, dropping
+    the oldest ones and counting them in the metrics. Recently touched sagas are kept
+    in a size- and age-bounded LRU cache so reads of live sagas do not hit the
+    database, and memory stays bounded regardless of uptime.
+    """
+
+    def __init__(
+        self,
+        flush_size: int,
+        flush_interval: float,
+        buffer_size: int,
+        cache_size: int,
+        cache_ttl: float,
+    ) -> None:
+        self._flush_size = flush_size
+        self._flush_interval = flush_interval
+        self._buffer_size = buffer_size
+        self._dropped = 0
+        self._cache_size = cache_size
+        self._cache_ttl = cache_ttl
+        self._buffer: List[Dict[str, Any]] = []
+        self._cache: OrderedDict[SagaKey, Tuple[float, List[Transition]]] = OrderedDict()
+        self._flush_requested = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def append(self, saga_type: str, order_id: int, state: str, new: bool = False) -> None:
+        """
+        Record a transition. 'new' marks the first entry of a saga that cannot have
+        history yet, so it can be cached without reading the database.
+        """
+        created_at = datetime.now(timezone.utc)
+        self._buffer.append({
+            "saga_type": saga_type,
+            "order_id": order_id,
+            "state": state,
+            "created_at": created_at,
+        })
+        self._trim()
+        key = (saga_type, order_id)
+        if new:
+            self._cache_put(key, [(state, created_at)])
+        elif (cached := self._cache_get(key)) is not None:
+            cached.append((state, created_at))
+        if len(self._buffer) >= self._flush_size:
+            self._flush_requested.set()
+
+    async def get(self, saga_type: str, order_id: int) -> List[Transition]:
+        key = (saga_type, order_id)
+        if (cached := self._cache_get(key)) is not None:
+            return list(cached)
+        # Holding the lock keeps flushes out, so every entry is either read from the
+        # database or still buffered, never both or neither.
+        async with self._lock:
+            async with SessionLocal() as db:
+                transitions = await get_saga_history_transitions(db, saga_type, order_id)
+            transitions.extend(
+                (entry["state"], entry["created_at"])
+                for entry in self._buffer
+                if entry["saga_type"] == saga_type and entry["order_id"] == order_id
+            )
+        if transitions:
+            self._cache_put(key, list(transitions))
+        return transitions
+
+    async def page(
+        self,
+        saga_types: Sequence[str],
+        terminal_state: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+        after: Optional[Tuple[str, int]],
+        limit: int,
+    ) -> List[Tuple[str, int, List[Transition]]]:
+        """Keyset page over the whole history; pending entries are written first."""
+        await self.flush()
+        async with SessionLocal() as db:
+            return await get_saga_history_page(
+                db=db,
+                saga_types=saga_types,
+                terminal_state=terminal_state,
+                since=since,
+                until=until,
+                after=after,
+                limit=limit,
+            )
+
+    def _cache_get(self, key: SagaKey) -> Optional[List[Transition]]:
+        if (item := self._cache.get(key)) is None:
+            return None
+        stored_at, transitions = item
+        if time.monotonic() - stored_at > self._cache_ttl:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return transitions
+
+    def _cache_put(self, key: SagaKey, transitions: List[Transition]) -> None:
+        self._cache[key] = (time.monotonic(), transitions)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._buffer:
+                return
+            entries, self._buffer = self._buffer, []
+            try:
+                async with SessionLocal() as db:
+                    await add_saga_history_entries(db, entries)
+            except Exception:
+                # Keep the entries so the next flush retries them, as many as fit.
+                self._buffer[:0] = entries
+                if (dropped := self._trim()):
+                    logger.warning(f"[LOG:SAGA] - Saga history buffer full, dropped {dropped} oldest entries")
+                raise
+
+    def _trim(self) -> int:
+        if (excess := len(self._buffer) - self._buffer_size) <= 0:
+            return 0
+        del self._buffer[:excess]
+        self._dropped += excess
+        return excess
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self._flush_interval)
+            except TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"[LOG:SAGA] - Could not persist saga history: Reason={e}", exc_info=True)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="saga-history-writer")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self._buffer),
+            "dropped": self._dropped,
+            "cached_sagas": len(self._cache),
+        }
+
+
+SAGA_HISTORY = SagaHistoryStore(
+    flush_size=SAGA_HISTORY_FLUSH_SIZE,
+    flush_interval=SAGA_HISTORY_FLUSH_INTERVAL,
+    buffer_size=SAGA_HISTORY_BUFFER_SIZE,
+    cache_size=SAGA_HISTORY_CACHE_SIZE,
+    cache_ttl=SAGA_HISTORY_CACHE_TTL,
+)
@@ -1,43 +1,55 @@
-from ...global_vars import RABBITMQ_CONFIG
+from ...messaging import OUTBOX_RELAY
 from ...sql import (
     Order,
+    outbox_message,
+    SessionLocal,
     update_order_status,
 )
-from ..base_state import State
-from chassis.messaging import RabbitMQPublisher
-from chassis.sql import SessionLocal
+from ..base_state import (
+    Outcome,
+    State,
+)
+from typing import (
+    Any,
+    Dict,
+)
+import logging
+
+logger = logging.getLogger(__name__)
 
 class ApproveCancellation(State):
     @staticmethod
-    def _notify_cancellation_approved(order_id: int, client_id: int, total_amount: float) -> None:
-        with RabbitMQPublisher(
-            queue="",
-            rabbitmq_config=RABBITMQ_CONFIG,
-            exchange="cancellation-approved",
-            exchange_type="fanout",
-        ) as publisher:
-            publisher.publish({
+    def _cancellation_approved_message(order_id: int, client_id: int, total_amount: float) -> Dict[str, Any]:
+        return outbox_message(
+            {
                 "order_id": order_id,
                 "client_id": client_id,
                 "total_amount": total_amount
-            })
-
-    async def on_event(self, event: State) -> State:
-        if str(event) != str(self):
-            return self
+            },
+            exchange="cancellation-approved",
+            exchange_type="fanout",
+        )
 
+    async def run(self) -> Outcome:
         assert self._context.total_amount is not None, "'total_amount' should be known at this point."        
+        total_amount = self._context.total_amount
         async with SessionLocal() as db:
-            await update_order_status(
+            # The notification is committed with the status change and sent by the outbox relay.
+            db_order = await update_order_status(
                 db=db,
                 order_id=self._context.order_id,
                 status=Order.STATUS_CANCELLED,
+                from_statuses=(Order.STATUS_CANCELLING,),
+                messages=lambda db_order: (
+                    ApproveCancellation._cancellation_approved_message(
+                        order_id=db_order.id,
+                        client_id=self._context.client_id,
+                        total_amount=total_amount,
+                    ),
+                ),
             )
-
-        ApproveCancellation._notify_cancellation_approved(
-            order_id=self._context.order_id,
-            client_id=self._context.client_id,
-            total_amount=self._context.total_amount,
-        )
-
-        return self
+        if db_order is None:
+            logger.warning(f"[LOG:SAGA] - Order changed status during its cancellation saga: order_id={self._context.order_id}")
+            return Outcome.FAILED
+        OUTBOX_RELAY.notify()
+        return Outcome.OK
@@ -1,24 +1,48 @@
+from ...global_vars import SAGA_OWNER
 from ...sql import (
-    get_order,
     Order,
+    SessionLocal,
     update_order_status,
 )
-from ..base_state import State
-from .check_warehouse_space_state import CheckWarehouseSpaceState
-from .reject_cancellation_state import RejectCancellationState
-from chassis.sql import SessionLocal
-from typing import Optional
+from ..base_state import (
+    Outcome,
+    State,
+)
+from dataclasses import (
+    asdict,
+    replace,
+)
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+import json
 
 class CheckOrderExistsState(State):
-    async def on_event(self, event: State) -> State:
-        if str(event) != str(self):
-            return self
+    def _cancelling_context(self, db_order: Order) -> Dict[str, Any]:
+        context = replace(self._context, total_amount=db_order.total_amount, cancelling=True)
+        return {"context": json.dumps(asdict(context))}
+
+    async def run(self) -> Outcome:
+        if self._context.cancelling:
+            # Resumed after this saga already moved the order to 'Cancelling'.
+            return Outcome.OK
 
         async with SessionLocal() as db:
-            order: Optional[Order] = await get_order(db, self._context.order_id)
+            # The context is recorded with the status change, so a crash before the next
+            # state is saved cannot leave the order in 'Cancelling' without its saga.
+            order: Optional[Order] = await update_order_status(
+                db=db,
+                order_id=self._context.order_id,
+                status=Order.STATUS_CANCELLING,
+                from_statuses=(Order.STATUS_APPROVED,),
+                saga_instance=(self._context.instance_id, SAGA_OWNER),
+                saga_values=self._cancelling_context,
+            )
 
-        if order is not None and order.status == Order.STATUS_APPROVED:
+        if order is not None:
             self._context.total_amount = order.total_amount
-            await update_order_status(db, order.id, Order.STATUS_CANCELLING)
-            return CheckWarehouseSpaceState(self._context)
-        return RejectCancellationState(self._context)
\ No newline at end of file
+            self._context.cancelling = True
+            return Outcome.OK
+        return Outcome.FAILED
@@ -0,0 +1,18 @@
+from ..base_state import (
+    Outcome,
+    State,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+class OrderNotCancellableState(State):
+    """Terminal state - the order does not exist or is not Approved, nothing to undo"""
+
+    async def run(self) -> Outcome:
+        # The order may be in 'Cancelling' because of another saga; it must not be touched.
+        logger.info(
+            "[LOG:SAGA] - Order cannot be cancelled: "
+            f"order_id={self._context.order_id}"
+        )
+        return Outcome.OK
@@ -1,14 +1,25 @@
 from ...sql import (
     update_order_status,
-    Order
+    Order,
+    SessionLocal,
+)
+from ..base_state import (
+    Outcome,
+    State,
 )
-from ..base_state import State
-from chassis.sql import SessionLocal
 
 class RejectCancellationState(State):
     """Terminal state - order cancellation rejected"""
-    async def on_event(self, event: State) -> State:
+    async def run(self) -> Outcome:
+        # Only roll back a cancellation this saga started.
+        if not self._context.cancelling:
+            return Outcome.OK
         async with SessionLocal() as db:
-            await update_order_status(db, self._context.order_id, Order.STATUS_APPROVED)
-        return self
+            await update_order_status(
+                db=db,
+                order_id=self._context.order_id,
+                status=Order.STATUS_APPROVED,
+                from_statuses=(Order.STATUS_CANCELLING,),
+            )
+        return Outcome.OK
 
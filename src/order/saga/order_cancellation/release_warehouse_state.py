@@ -1,29 +1,23 @@
-from ...global_vars import RABBITMQ_CONFIG
-from ..base_state import State
-from .reject_cancellation_state import RejectCancellationState
-from chassis.messaging import RabbitMQPublisher
+from ...messaging import PUBLISHER
+from ..base_state import (
+    Outcome,
+    State,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
 class ReleaseWarehouse(State):
-    async def on_event(self, event: State) -> State:
-        if str(event) != str(self):
-            return self
-        
-        with RabbitMQPublisher(
-            queue="",
-            rabbitmq_config=RABBITMQ_CONFIG,
+    async def run(self) -> Outcome:
+        await PUBLISHER.publish(
+            {"order_id": str(self._context.order_id)},
             exchange="cmd",
             exchange_type="topic",
             routing_key="warehouse.release",
-        ) as publisher:
-            publisher.publish({
-                "order_id": str(self._context.order_id),
-            })
-            logger.info(
-                "[CMD:WAREHOUSE_RELEASE:SENT] - Sent release command: "
-                f"order_id={self._context.order_id}, "
-            )
-        return RejectCancellationState(self._context)
+        )
+        logger.info(
+            "[CMD:WAREHOUSE_RELEASE:SENT] - Sent release command: "
+            f"order_id={self._context.order_id}, "
+        )
+        return Outcome.OK
 
@@ -1,69 +1,67 @@
 from ..base_saga import BaseSaga
-from ..base_state import (
-    State, 
-    StateContext,
+from ..base_state import Outcome
+from ..engine import (
+    Step,
+    TransitionTable,
 )
 from .aprove_cancellation_state import ApproveCancellation
-from .initial_state import InitialState
+from .check_delivery_status_state import CheckDeliveryStatus
+from .check_order_exists_state import CheckOrderExistsState
+from .check_warehouse_space_state import CheckWarehouseSpaceState
+from .order_not_cancellable_state import OrderNotCancellableState
 from .reject_cancellation_state import RejectCancellationState
 from .release_warehouse_state import ReleaseWarehouse
-from collections import defaultdict
-import logging
+from enum import StrEnum
 
-logger = logging.getLogger(__name__)
+class CancellationState(StrEnum):
+    CHECK_ORDER_EXISTS = "CheckOrderExistsState"
+    CHECK_WAREHOUSE_SPACE = "CheckWarehouseSpaceState"
+    CHECK_DELIVERY_STATUS = "CheckDeliveryStatus"
+    RELEASE_WAREHOUSE = "ReleaseWarehouse"
+    APPROVE_CANCELLATION = "ApproveCancellation"
+    REJECT_CANCELLATION = "RejectCancellationState"
+    ORDER_NOT_CANCELLABLE = "OrderNotCancellableState"
 
 class OrderCancellationSaga(BaseSaga):
-    SAGA_HISTORY: dict[int, list[str]] = defaultdict(list)
-
-    def __init__(self, context: StateContext) -> None:
-        self._context = context
-        self._state = InitialState(self._context)
-
-    async def _on_event(self, event: State) -> None:
-        self._state = await self._state.on_event(event)
-        OrderCancellationSaga.SAGA_HISTORY[self._context.order_id].append(str(self._state))
-
-    async def process(self) -> bool:
-        logger.info(f"[LOG:SAGA] - Processing Order {self._context.order_id}")
-
-        # Start the saga
-        logger.info(f"[LOG:SAGA] - State: {self.get_state()}")
-        await self._on_event(self._state)
-        
-        # Check order exists
-        logger.info(f"[LOG:SAGA] - State: {self.get_state()}")
-        await self._on_event(self._state)
-
-        # If not exist, exit
-        if isinstance(self._state, RejectCancellationState):
-            logger.warning("[LOG:SAGA] - Order cancellation rejected, does not exist.")
-            return False
-
-        # Check warehouse space
-        logger.info(f"[LOG:SAGA] - State: {self.get_state()}")
-        await self._on_event(self._state)
-
-        # If not enough space
-        if isinstance(self._state, RejectCancellationState):
-            logger.warning("[LOG:SAGA] - Order cancellation rejected, not enough space in warehouse.")
-            return False
-
-        # Check delivery status
-        logger.info(f"[LOG:SAGA] - State: {self.get_state()}")
-        await self._on_event(self._state)
-
-        if isinstance(self._state, ReleaseWarehouse):
-            logger.warning("[LOG:SAGA] - Order cancellation rejected, delivery already in process.")
-            await self._on_event(self._state)
-            return False
-        
-        if isinstance(self._state, ApproveCancellation):
-            logger.info("[LOG:SAGA] - Order cancellation approved.")
-            await self._on_event(self._state)
-            return True
-
-        return False
-
-    def get_state(self) -> str:
-        return str(self._state)
-
+    SAGA_TYPE = "cancellation"
+    TRANSITIONS = TransitionTable(
+        initial=CancellationState.CHECK_ORDER_EXISTS,
+        steps={
+            CancellationState.CHECK_ORDER_EXISTS: Step(
+                CheckOrderExistsState,
+                next={
+                    Outcome.OK: CancellationState.CHECK_WAREHOUSE_SPACE,
+                    # Nothing was changed, and the order may be another saga's to roll back.
+                    Outcome.FAILED: CancellationState.ORDER_NOT_CANCELLABLE,
+                },
+            ),
+            CancellationState.CHECK_WAREHOUSE_SPACE: Step(
+                CheckWarehouseSpaceState,
+                next={
+                    Outcome.OK: CancellationState.CHECK_DELIVERY_STATUS,
+                    Outcome.FAILED: CancellationState.REJECT_CANCELLATION,
+                    # The reservation may still happen after we gave up, so compensate.
+                    Outcome.TIMEOUT: CancellationState.RELEASE_WAREHOUSE,
+                },
+            ),
+            # delivery.cancel cannot be undone, so it is asked last, once the warehouse
+            # space is reserved, and never together with a step that may still fail.
+            CancellationState.CHECK_DELIVERY_STATUS: Step(
+                CheckDeliveryStatus,
+                next={
+                    Outcome.OK: CancellationState.APPROVE_CANCELLATION,
+                    Outcome.FAILED: CancellationState.RELEASE_WAREHOUSE,
+                    # The cancellation may still happen, so ask again until delivery answers;
+                    # past the saga deadline the step fails and the reservation is released.
+                    Outcome.TIMEOUT: CancellationState.CHECK_DELIVERY_STATUS,
+                },
+            ),
+            CancellationState.RELEASE_WAREHOUSE: Step(
+                ReleaseWarehouse,
+                next={Outcome.OK: CancellationState.REJECT_CANCELLATION},
+            ),
+            CancellationState.APPROVE_CANCELLATION: Step(ApproveCancellation, result=True),
+            CancellationState.REJECT_CANCELLATION: Step(RejectCancellationState, result=False),
+            CancellationState.ORDER_NOT_CANCELLABLE: Step(OrderNotCancellableState, result=False),
+        },
+    )
@@ -0,0 +1,80 @@
+from ...global_vars import SAGA_OWNER
+from ...messaging import OUTBOX_RELAY
+from ...sql import (
+    Order,
+    outbox_message,
+    SessionLocal,
+    update_order_status,
+)
+from ..base_state import (
+    Outcome,
+    State,
+)
+from dataclasses import (
+    asdict,
+    replace,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+)
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ApproveOrderState(State):
+    """Approve the order and hand it over to production and delivery"""
+
+    @staticmethod
+    def _hand_over_messages(db_order: Order, pieces: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], ...]:
+        return (
+            outbox_message(
+                {
+                    "order_id": db_order.id,
+                    "pieces": pieces,
+                },
+                queue="order.piece.request",
+            ),
+            outbox_message(
+                {
+                    "order_id": db_order.id,
+                    "city": db_order.city,
+                    "street": db_order.street,
+                    "zip": db_order.zip,
+                    "client_id": db_order.client_id,
+                },
+                queue="delivery.create",
+            ),
+        )
+
+    def _approved_context(self, db_order: Order) -> Dict[str, Any]:
+        return {"context": json.dumps(asdict(replace(self._context, approved=True)))}
+
+    async def run(self) -> Outcome:
+        if self._context.approved:
+            # Resumed after this saga already approved the order.
+            return Outcome.OK
+
+        assert self._context.pieces is not None, "'pieces' should be known at this point."
+        pieces = self._context.pieces
+        async with SessionLocal() as db:
+            # The hand-over messages are committed with the approval and published by the outbox relay;
+            # the saga context is recorded with it too, so a resumed saga knows the order is approved.
+            db_order = await update_order_status(
+                db=db,
+                order_id=self._context.order_id,
+                status=Order.STATUS_APPROVED,
+                from_statuses=(Order.STATUS_CREATED,),
+                messages=lambda db_order: ApproveOrderState._hand_over_messages(db_order, pieces),
+                saga_instance=(self._context.instance_id, SAGA_OWNER),
+                saga_values=self._approved_context,
+            )
+        if db_order is None:
+            logger.warning(f"[LOG:SAGA] - Order changed status during its creation saga: order_id={self._context.order_id}")
+            return Outcome.FAILED
+        self._context.approved = True
+        OUTBOX_RELAY.notify()
+        return Outcome.OK
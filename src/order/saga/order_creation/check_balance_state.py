@@ -1,12 +1,11 @@
-from ...global_vars import RABBITMQ_CONFIG
-from ..base_state import State
-from .check_delivery_state import CheckDeliveryState
-from .order_cancelled_state import OrderCancelledState
-from chassis.messaging import (
-    MessageType,
-    RabbitMQPublisher,
-    register_queue_handler,
-    start_rabbitmq_listener,
+from ...global_vars import SAGA_STEP_TIMEOUTS
+from ...messaging import (
+    MessageNotPublished,
+    SAGA_REQUESTS,
+)
+from ..base_state import (
+    Outcome,
+    State,
 )
 import logging
 
@@ -15,70 +14,52 @@ logger = logging.getLogger(__name__)
 class CheckBalanceState(State):
     """Check if customer has sufficient credit"""
 
-    async def on_event(self, event: State) -> State:
-        if str(event) != str(self):
-            return self
+    async def run(self) -> Outcome:
+        try:
+            balance_ok = await self._ask_balance()
+        except TimeoutError:
+            logger.warning(
+                "[EVENT:PAYMENT_RESERVE:TIMEOUT] - No payment reply in time: "
+                f"order_id={self._context.order_id}"
+            )
+            return Outcome.TIMEOUT
+        except MessageNotPublished:
+            # Never reached the payment service, so there is nothing to compensate.
+            logger.warning(
+                "[CMD:PAYMENT_RESERVE:NOT_SENT] - Command could not be published: "
+                f"order_id={self._context.order_id}"
+            )
+            return Outcome.FAILED
 
-        if self._ask_balance() == True:
-            return CheckDeliveryState(self._context)
-        else:
-            return OrderCancelledState(self._context)
+        return Outcome.OK if balance_ok == True else Outcome.FAILED
     
-    def _ask_balance(self) -> bool:
-        response_queue = f"sagas-payment-{self._context.client_id}-{self._context.order_id}"
-        response_exchange = "payment_sagas"
-        response_exchange_type = "topic"
-        response_routing_key = f"{self._context.client_id}.{self._context.order_id}"
-
-        payment_ok = False
-
-        @register_queue_handler(
-            queue=response_queue,
-            exchange=response_exchange,
-            exchange_type=response_exchange_type,
-            routing_key=response_routing_key,
+    async def _ask_balance(self) -> bool:
+        logger.info(
+            "[CMD:PAYMENT_RESERVE:SENT] - Sent reserve command: "
+            f"order_id={self._context.order_id}, "
+            f"client_id={self._context.client_id}, "
+            f"amount={self._context.total_amount}"
         )
-        def payment_response(message: MessageType) -> None:
-            nonlocal payment_ok
-            assert (status := message.get("status")) is not None, "'status' field should be present."
-            if (payment_ok := (status == "OK")):
-                logger.info(
-                    "[EVENT:PAYMENT_RESERVE:SUCCESS] - Payment reserved successfully: "
-                    f"order_id={self._context.order_id}"
-                )
-            else:
-                logger.info(
-                    "[EVENT:PAYMENT_RESERVE:FAILED] - Payment reserve failed: "
-                    f"order_id={self._context.order_id}, "
-                    f"status='{status}'"
-                )
-
-
-        with RabbitMQPublisher(
-            queue="",
-            rabbitmq_config=RABBITMQ_CONFIG,
-            exchange="cmd",
-            exchange_type="topic",
-            routing_key="payment.reserve",
-        ) as publisher:
-            publisher.publish({
+        response = await SAGA_REQUESTS.request(
+            {
                 "client_id": str(self._context.client_id),
                 "total_amount": str(self._context.total_amount),
-                "response_exchange": response_exchange,
-                "response_exchange_type": response_exchange_type,
-                "response_routing_key": response_routing_key
-            })
+            },
+            routing_key="payment.reserve",
+            reply_exchange="payment_sagas",
+            timeout=self._context.step_timeout(SAGA_STEP_TIMEOUTS["payment.reserve"]),
+        )
+
+        assert (status := response.get("status")) is not None, "'status' field should be present."
+        if (payment_ok := (status == "OK")):
             logger.info(
-                "[CMD:PAYMENT_RESERVE:SENT] - Sent reserve command: "
+                "[EVENT:PAYMENT_RESERVE:SUCCESS] - Payment reserved successfully: "
+                f"order_id={self._context.order_id}"
+            )
+        else:
+            logger.info(
+                "[EVENT:PAYMENT_RESERVE:FAILED] - Payment reserve failed: "
                 f"order_id={self._context.order_id}, "
-                f"client_id={self._context.client_id}, "
-                f"amount={self._context.total_amount}"
+                f"status='{status}'"
             )
-
-        start_rabbitmq_listener(
-            queue=response_queue,
-            config=RABBITMQ_CONFIG,
-            one_use=True,
-        )
-
-        return payment_ok
\ No newline at end of file
+        return payment_ok
@@ -1,7 +1,22 @@
-from ..base_state import State
+from ...sql import (
+    Order,
+    SessionLocal,
+    update_order_status,
+)
+from ..base_state import (
+    Outcome,
+    State,
+)
 
 class OrderCancelledState(State):
     """Terminal state - order cancelled"""
 
-    async def on_event(self, event: State) -> State:
-        return self
\ No newline at end of file
+    async def run(self) -> Outcome:
+        async with SessionLocal() as db:
+            await update_order_status(
+                db=db,
+                order_id=self._context.order_id,
+                status=Order.STATUS_CANCELLED,
+                from_statuses=(Order.STATUS_CREATED,),
+            )
+        return Outcome.OK
@@ -1,7 +1,17 @@
-from ..base_state import State
+from ..base_state import (
+    Outcome,
+    State,
+)
+import logging
+
+logger = logging.getLogger(__name__)
 
 class ProcessApprovedState(State):
     """Terminal state - order successfully processed"""
 
-    async def on_event(self, event: State) -> State:
-        return self
+    async def run(self) -> Outcome:
+        logger.info(
+            "[LOG:SAGA] - Order approved: "
+            f"order_id={self._context.order_id}"
+        )
+        return Outcome.OK
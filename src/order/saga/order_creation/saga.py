@@ -1,59 +1,61 @@
 from ..base_saga import BaseSaga
-from ..base_state import (
-    StateContext,
-    State,
+from ..base_state import Outcome
+from ..engine import (
+    Step,
+    TransitionTable,
 )
-from .initial_state import InitialState
+from .approve_order_state import ApproveOrderState
+from .check_balance_state import CheckBalanceState
+from .check_delivery_state import CheckDeliveryState
 from .order_cancelled_state import OrderCancelledState
 from .process_approved_state import ProcessApprovedState
 from .release_client_balance_state import ReleaseClientBalanceState
-from typing import Dict, List
-import logging
+from enum import StrEnum
 
-logger = logging.getLogger(__name__)
+class CreationState(StrEnum):
+    CHECK_DELIVERY = "CheckDeliveryState"
+    CHECK_BALANCE = "CheckBalanceState"
+    APPROVE_ORDER = "ApproveOrderState"
+    RELEASE_CLIENT_BALANCE = "ReleaseClientBalanceState"
+    ORDER_CANCELLED = "OrderCancelledState"
+    PROCESS_APPROVED = "ProcessApprovedState"
 
 class OrderCreationSaga(BaseSaga):
-    SAGA_HISTORY: Dict[int, List[str]] = {}
-
-    def __init__(self, context: StateContext):
-        self._context = context
-        self._state = InitialState(context)
-        OrderCreationSaga.SAGA_HISTORY[self._context.order_id] = [str(self._state)]
-    
-    async def _on_event(self, event: State) -> None:
-        self._state = await self._state.on_event(event)
-        OrderCreationSaga.SAGA_HISTORY[self._context.order_id].append(str(self._state))
-    
-    async def process(self) -> bool:
-        logger.info(f"[LOG:SAGA] - Processing Order {self._context.order_id}")
-        
-        # Start the saga
-        logger.info(f"[LOG:SAGA] - State: {self.get_state()}")
-        await self._on_event(self._state)
-        
-        # Check credit
-        logger.info(f"[LOG:SAGA] - State: {self.get_state()}")
-        await self._on_event(self._state)
-        
-        # If cancelled, exit
-        if isinstance(self._state, OrderCancelledState):
-            logger.warning("[LOG:SAGA] - Order cancelled, no funds.")
-            return False
-        
-        # Check delivery
-        logger.info(f"[LOG:SAGA] - State: {self.get_state()}")
-        await self._on_event(self._state)
-        
-        if isinstance(self._state, ReleaseClientBalanceState):
-            logger.info("[LOG:SAGA] - Order cancelled, incorrect zip code")
-            await self._on_event(self._state)
-            return False
-        
-        if isinstance(self._state, ProcessApprovedState):
-            logger.info("[LOG:SAGA] - Order approved")
-            return True
-        
-        return False
-    
-    def get_state(self) -> str:
-        return str(self._state)
\ No newline at end of file
+    SAGA_TYPE = "creation"
+    NEW_ORDER = True
+    TRANSITIONS = TransitionTable(
+        initial=CreationState.CHECK_DELIVERY,
+        steps={
+            # The zipcode is checked locally first, so invalid ones never reach payment.
+            CreationState.CHECK_DELIVERY: Step(
+                CheckDeliveryState,
+                next={
+                    Outcome.OK: CreationState.CHECK_BALANCE,
+                    Outcome.FAILED: CreationState.ORDER_CANCELLED,
+                },
+            ),
+            CreationState.CHECK_BALANCE: Step(
+                CheckBalanceState,
+                next={
+                    Outcome.OK: CreationState.APPROVE_ORDER,
+                    Outcome.FAILED: CreationState.ORDER_CANCELLED,
+                    # The reservation may still happen after we gave up, so compensate.
+                    Outcome.TIMEOUT: CreationState.RELEASE_CLIENT_BALANCE,
+                },
+            ),
+            CreationState.APPROVE_ORDER: Step(
+                ApproveOrderState,
+                next={
+                    Outcome.OK: CreationState.PROCESS_APPROVED,
+                    # The order left 'Created' meanwhile: the reserved balance is given back.
+                    Outcome.FAILED: CreationState.RELEASE_CLIENT_BALANCE,
+                },
+            ),
+            CreationState.RELEASE_CLIENT_BALANCE: Step(
+                ReleaseClientBalanceState,
+                next={Outcome.OK: CreationState.ORDER_CANCELLED},
+            ),
+            CreationState.ORDER_CANCELLED: Step(OrderCancelledState, result=False),
+            CreationState.PROCESS_APPROVED: Step(ProcessApprovedState, result=True),
+        },
+    )
@@ -0,0 +1,112 @@
+from ..global_vars import (
+    SAGA_OWNER,
+    SAGA_RECOVERY_BATCH_SIZE,
+    SAGA_RECOVERY_GRACE,
+    SAGA_RECOVERY_INTERVAL,
+    SAGA_REPLY_INSTANCE_ID,
+    SAGA_TIMEOUT,
+)
+from ..sql import (
+    claim_saga_instances,
+    SessionLocal,
+)
+from .base_saga import (
+    BaseSaga,
+    RUNNING,
+)
+from .runner import (
+    SAGA_RUNNER,
+    SagaRunner,
+)
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class SagaRecovery:
+    """
+    Resumes sagas that were left unfinished by a crash or restart.
+
+    It claims the sagas of earlier incarnations of this instance, found at startup, and
+    periodically those of any instance whose deadline passed more than 'grace' seconds
+    ago, since a live instance would have finished them by then. That includes sagas of
+    this instance that stopped on an error, but never one still executing here. Claimed
+    sagas are resumed in batches on the saga runner; their own deadline is kept, so a
+    saga that ran out of time goes straight to its compensation.
+    """
+
+    def __init__(
+        self,
+        runner: SagaRunner,
+        batch_size: int,
+        interval: float,
+        grace: float,
+    ) -> None:
+        self._runner = runner
+        self._batch_size = batch_size
+        self._interval = interval
+        self._grace = grace
+        self._task: Optional[asyncio.Task] = None
+        self._recovered = 0
+
+    async def recover(self) -> int:
+        """Claim and resume one batch; returns how many sagas were claimed."""
+        now = time.time()
+        async with SessionLocal() as db:
+            instances = await claim_saga_instances(
+                db=db,
+                owner=SAGA_OWNER,
+                previous_owners=f"{SAGA_REPLY_INSTANCE_ID}/",
+                stale_before=now - self._grace,
+                lease_until=now + SAGA_TIMEOUT,
+                limit=self._batch_size,
+                running=tuple(RUNNING),
+            )
+        for instance in instances:
+            saga = BaseSaga.restore(instance)
+            self._runner.submit(name=f"saga-recovery-{instance.id}", job=saga.resume)
+        if instances:
+            logger.info(f"[LOG:SAGA] - Recovering {len(instances)} unfinished sagas")
+        self._recovered += len(instances)
+        return len(instances)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                while await self.recover() == self._batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"[LOG:SAGA] - Could not recover sagas: Reason={e}", exc_info=True)
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="saga-recovery")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "recovered": self._recovered,
+            "in_flight": self._runner.in_flight,
+        }
+
+
+SAGA_RECOVERY = SagaRecovery(
+    runner=SAGA_RUNNER,
+    batch_size=SAGA_RECOVERY_BATCH_SIZE,
+    interval=SAGA_RECOVERY_INTERVAL,
+    grace=SAGA_RECOVERY_GRACE,
+)
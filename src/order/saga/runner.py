@@ -0,0 +1,46 @@
+from ..global_vars import SAGA_RUNNER_CONCURRENCY
+from typing import (
+    Awaitable,
+    Callable,
+    Set,
+)
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SagaRunner:
+    """
+    Runs sagas in the background on the service's event loop.
+
+    At most 'concurrency' sagas execute at once; the rest wait for a slot. Running tasks
+    are kept referenced until they finish and are awaited on shutdown.
+    """
+
+    def __init__(self, concurrency: int) -> None:
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def submit(self, name: str, job: Callable[[], Awaitable[None]]) -> None:
+        task = asyncio.create_task(self._run(name, job), name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, name: str, job: Callable[[], Awaitable[None]]) -> None:
+        async with self._semaphore:
+            try:
+                await job()
+            except Exception as e:
+                logger.error(f"[LOG:SAGA] - Background saga failed: name={name}, Reason={e}", exc_info=True)
+
+    async def shutdown(self) -> None:
+        if self._tasks:
+            logger.info(f"[LOG:SAGA] - Waiting for {len(self._tasks)} background sagas")
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+SAGA_RUNNER = SagaRunner(SAGA_RUNNER_CONCURRENCY)
@@ -0,0 +1,99 @@
+from .global_vars import (
+    SCHEDULER_BATCH_SIZE,
+    SCHEDULER_POLL_INTERVAL,
+)
+from .sql import (
+    apply_due_order_transitions,
+    Order,
+    SessionLocal,
+)
+from datetime import (
+    datetime,
+    timezone,
+)
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+)
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+TransitionMessages = Callable[[Order], Iterable[Dict[str, Any]]]
+
+class TransitionScheduler:
+    """
+    Delayed order status transitions backed by the 'scheduled_transition' table.
+
+    Writers insert due transitions and return at once; a background task applies them
+    in batches, writing the outbox messages registered for the new status in the same
+    transaction, so they are published by the outbox relay exactly when it commits.
+    """
+
+    def __init__(self, poll_interval: float, batch_size: int) -> None:
+        self._poll_interval = poll_interval
+        self._batch_size = batch_size
+        self._messages: Dict[str, TransitionMessages] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def on_transition(self, status: str) -> Callable[[TransitionMessages], TransitionMessages]:
+        """
+        Register the function returning the outbox rows (see 'outbox_message') to write
+        when an order reaches 'status' through the scheduler.
+        """
+        def decorator(messages: TransitionMessages) -> TransitionMessages:
+            self._messages[status] = messages
+            return messages
+        return decorator
+
+    def _transition_messages(self, db_order: Order) -> Iterable[Dict[str, Any]]:
+        if (messages := self._messages.get(db_order.status)) is None:
+            return ()
+        return messages(db_order)
+
+    async def run_due(self) -> int:
+        async with SessionLocal() as db:
+            applied = await apply_due_order_transitions(
+                db=db,
+                now=datetime.now(timezone.utc),
+                limit=self._batch_size,
+                messages=self._transition_messages,
+            )
+        for db_order in applied:
+            logger.info(
+                "[LOG:SCHEDULER] - Scheduled transition applied: "
+                f"order_id={db_order.id}, status={db_order.status}"
+            )
+        return len(applied)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # Keep draining while full batches come back.
+                while await self.run_due() == self._batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"[LOG:SCHEDULER] - Could not apply scheduled transitions: Reason={e}", exc_info=True)
+            await asyncio.sleep(self._poll_interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="transition-scheduler")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+SCHEDULER = TransitionScheduler(
+    poll_interval=SCHEDULER_POLL_INTERVAL,
+    batch_size=SCHEDULER_BATCH_SIZE,
+)
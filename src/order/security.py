@@ -0,0 +1,249 @@
+from .global_vars import (
+    JWT_ALGORITHMS,
+    JWT_CACHE_SIZE,
+    PUBLIC_KEY_MIN_REFRESH_INTERVAL,
+    PUBLIC_KEY_ROTATION_OVERLAP,
+    PUBLIC_KEY_WARMUP_ATTEMPTS,
+)
+from .http_client import HTTP_CLIENT
+from chassis.consul import CONSUL_CLIENT
+from chassis.routers import raise_and_log_error
+from collections import OrderedDict
+from cryptography.hazmat.primitives.asymmetric.types import PublicKeyTypes
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+from fastapi import (
+    Depends,
+    status,
+)
+from fastapi.security import (
+    HTTPAuthorizationCredentials,
+    HTTPBearer,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+import asyncio
+import hashlib
+import httpx
+import jwt
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class PublicKeyManager:
+    """
+    Auth service public keys used to verify JWTs.
+
+    Keys are fetched asynchronously through the shared HTTP client and kept parsed. On
+    rotation the previous key stays valid for 'rotation_overlap' seconds so tokens
+    signed just before the switch keep verifying. Concurrent refreshes share a single
+    request, and refreshes triggered by unknown signatures are rate limited.
+    """
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        rotation_overlap: float,
+        min_refresh_interval: float,
+        warmup_attempts: int,
+    ) -> None:
+        self._http_client = http_client
+        self._rotation_overlap = rotation_overlap
+        self._min_refresh_interval = min_refresh_interval
+        self._warmup_attempts = warmup_attempts
+        self._current: Optional[Tuple[str, PublicKeyTypes]] = None
+        self._previous: Optional[Tuple[PublicKeyTypes, float]] = None
+        self._last_refresh = float("-inf")
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.generation = 0
+
+    def keys(self) -> List[PublicKeyTypes]:
+        """Keys currently accepted, newest first."""
+        keys: List[PublicKeyTypes] = []
+        if self._current is not None:
+            keys.append(self._current[1])
+        if self._previous is not None:
+            key, valid_until = self._previous
+            if time.monotonic() < valid_until:
+                keys.append(key)
+            else:
+                self._previous = None
+                self.generation += 1
+        return keys
+
+    def install(self, pem: str) -> bool:
+        """Parse and activate 'pem'. Returns False if it already was the current key."""
+        if self._current is not None and self._current[0] == pem:
+            return False
+        key = load_pem_public_key(pem.encode())
+        if self._current is not None:
+            self._previous = (self._current[1], time.monotonic() + self._rotation_overlap)
+        self._current = (pem, key)
+        self.generation += 1
+        logger.info("[LOG:SECURITY] - Public key installed")
+        return True
+
+    async def _fetch(self) -> str:
+        assert (auth_base_url := await asyncio.to_thread(CONSUL_CLIENT.discover_service, "auth")) is not None, (
+            "The 'auth' service should be accesible"
+        )
+        address, port = auth_base_url
+        response = await self._http_client.get(f"{address}:{port}/auth/key")
+        assert response.status_code == 200, (
+            f"Public key request returned '{response.status_code}', should return '200'"
+        )
+        new_key = response.json().get("public_key")
+        assert new_key is not None, (
+            "Auth response did not contain expected 'public_key' field."
+        )
+        return str(new_key)
+
+    async def _refresh(self) -> bool:
+        try:
+            return self.install(await self._fetch())
+        finally:
+            self._last_refresh = time.monotonic()
+
+    async def refresh(self, force: bool = True) -> bool:
+        """
+        Fetch the current key from the auth service. Without 'force' the call is skipped
+        when the last refresh is more recent than 'min_refresh_interval'.
+        """
+        if self._refresh_task is None:
+            if not force and time.monotonic() - self._last_refresh < self._min_refresh_interval:
+                return False
+            self._refresh_task = asyncio.create_task(self._refresh())
+            self._refresh_task.add_done_callback(self._refresh_done)
+        return await asyncio.shield(self._refresh_task)
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._refresh_task = None
+        if not task.cancelled() and (e := task.exception()) is not None:
+            logger.warning(f"[LOG:SECURITY] - Public key refresh failed: Reason={e}")
+
+    async def warm_up(self) -> None:
+        """Load the key before serving, retrying with exponential backoff."""
+        for attempt in range(self._warmup_attempts):
+            try:
+                await self.refresh()
+                return
+            except Exception:
+                if attempt + 1 < self._warmup_attempts:
+                    await asyncio.sleep(2 ** attempt)
+        logger.error("[LOG:SECURITY] - Public key not available after warm-up; it will be fetched on demand")
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified tokens, keyed by the SHA-256 of the raw token.
+
+    An entry is served until the token's 'exp' and only while the set of accepted
+    public keys is the one it was verified against; tokens without 'exp' are never
+    cached.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._entries: OrderedDict[bytes, Tuple[Dict[str, Any], float, int]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, digest: bytes, generation: int) -> Optional[Dict[str, Any]]:
+        if (entry := self._entries.get(digest)) is not None:
+            claims, expires_at, entry_generation = entry
+            if entry_generation == generation and time.time() < expires_at:
+                self._entries.move_to_end(digest)
+                self._hits += 1
+                return dict(claims)
+            del self._entries[digest]
+        self._misses += 1
+        return None
+
+    def put(self, digest: bytes, claims: Dict[str, Any], generation: int) -> None:
+        if not isinstance(expires_at := claims.get("exp"), (int, float)):
+            return
+        self._entries[digest] = (dict(claims), float(expires_at), generation)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self._size:
+            self._entries.popitem(last=False)
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+        }
+
+
+PUBLIC_KEYS = PublicKeyManager(
+    http_client=HTTP_CLIENT,
+    rotation_overlap=PUBLIC_KEY_ROTATION_OVERLAP,
+    min_refresh_interval=PUBLIC_KEY_MIN_REFRESH_INTERVAL,
+    warmup_attempts=PUBLIC_KEY_WARMUP_ATTEMPTS,
+)
+TOKEN_CACHE = TokenCache(size=JWT_CACHE_SIZE)
+
+def _decode(token: str, keys: List[PublicKeyTypes]) -> Optional[Dict[str, Any]]:
+    """Decode 'token' with the first key whose signature matches, if any."""
+    for key in keys:
+        try:
+            return jwt.decode(token, key, algorithms=JWT_ALGORITHMS)
+        except jwt.InvalidSignatureError:
+            continue
+    return None
+
+def _decode_cached(token: str, digest: bytes, keys: List[PublicKeyTypes]) -> Optional[Dict[str, Any]]:
+    if (payload := _decode(token, keys)) is not None:
+        TOKEN_CACHE.put(digest, payload, PUBLIC_KEYS.generation)
+    return payload
+
+async def verify_jwt(
+    credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
+) -> Dict[str, Any]:
+    """FastAPI dependency returning the claims of a valid bearer token."""
+    token = credentials.credentials
+    digest = hashlib.sha256(token.encode()).digest()
+    # keys() first: it retires an expired rotation overlap and bumps the generation.
+    keys = PUBLIC_KEYS.keys()
+    if (payload := TOKEN_CACHE.get(digest, PUBLIC_KEYS.generation)) is not None:
+        return payload
+    try:
+        if keys and (payload := _decode_cached(token, digest, keys)) is not None:
+            return payload
+        # Unknown signer: the key may have rotated before its event reached us.
+        try:
+            await PUBLIC_KEYS.refresh(force=False)
+        except Exception:
+            pass
+        if not (keys := PUBLIC_KEYS.keys()):
+            raise_and_log_error(
+                logger,
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                "[LOG:SECURITY] - Public key not available",
+            )
+        if (payload := _decode_cached(token, digest, keys)) is not None:
+            return payload
+        raise_and_log_error(
+            logger,
+            status.HTTP_401_UNAUTHORIZED,
+            "[LOG:SECURITY] - Invalid token signature",
+        )
+    except jwt.ExpiredSignatureError:
+        raise_and_log_error(
+            logger,
+            status.HTTP_401_UNAUTHORIZED,
+            "[LOG:SECURITY] - Token expired",
+        )
+    except jwt.InvalidTokenError as e:
+        raise_and_log_error(
+            logger,
+            status.HTTP_401_UNAUTHORIZED,
+            f"[LOG:SECURITY] - Invalid token: Reason={e}",
+        )
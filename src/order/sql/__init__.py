@@ -1,15 +1,66 @@
+from .cache import (
+    CacheBackend,
+    MemoryCacheBackend,
+    ORDER_CACHE,
+    OrderCache,
+)
 from .crud import (
+    add_saga_history_entries,
+    add_saga_instance,
+    apply_due_order_transitions,
+    apply_order_status_updates,
+    claim_idempotency_key,
+    claim_outbox_batch,
+    claim_saga_instances,
+    complete_idempotency_key,
     create_order,
+    delete_outbox_messages,
+    delete_saga_instance,
+    get_idempotency_record,
     get_order,
+    get_saga_history_page,
+    get_saga_history_transitions,
+    list_orders,
+    outbox_message,
+    release_idempotency_key,
+    retry_outbox_messages,
     update_order_status,
+    update_saga_instance,
+)
+from .database import (
+    build_engine,
+    dialect_insert,
+    Engine,
+    get_db,
+    SessionLocal,
+)
+from .models import (
+    IdempotencyRecord,
+    Order,
+    OutboxMessage,
+    SagaHistoryEntry,
+    SagaInstance,
+    ScheduledTransition,
 )
-from .models import Order
 from .schemas import (
+    HealthStatus,
     Message,
     OrderCancellationResponse,
     OrderCreationRequest,
     OrderCancellationRequest,
     OrderCreationResponse,
+    OrderDetail,
+    OrderPage,
+    OrderPieceSchema,
+    OrderStatusResponse,
+    SagaHistoryItem,
+    SagaHistoryPage,
+)
+from .sqlite import configure_sqlite
+from .writer import (
+    DB_WRITER,
+    serialized_write,
+    WriteQueue,
 )
 from typing import (
     List,
@@ -17,13 +68,56 @@ from typing import (
 )
 
 __all__: List[LiteralString] = [
+    "add_saga_history_entries",
+    "add_saga_instance",
+    "apply_due_order_transitions",
+    "apply_order_status_updates",
+    "build_engine",
+    "CacheBackend",
+    "claim_idempotency_key",
+    "claim_outbox_batch",
+    "claim_saga_instances",
+    "complete_idempotency_key",
+    "configure_sqlite",
     "create_order",
+    "DB_WRITER",
+    "delete_outbox_messages",
+    "delete_saga_instance",
+    "dialect_insert",
+    "Engine",
+    "get_db",
+    "get_idempotency_record",
     "get_order",
+    "get_saga_history_page",
+    "get_saga_history_transitions",
+    "HealthStatus",
+    "IdempotencyRecord",
+    "list_orders",
+    "MemoryCacheBackend",
     "Message",
     "Order",
+    "ORDER_CACHE",
+    "OrderCache",
     "OrderCancellationResponse",
     "OrderCreationRequest",
     "OrderCancellationRequest",
     "OrderCreationResponse",
+    "OrderDetail",
+    "OrderPage",
+    "OrderPieceSchema",
+    "OrderStatusResponse",
+    "outbox_message",
+    "OutboxMessage",
+    "release_idempotency_key",
+    "retry_outbox_messages",
+    "SagaHistoryEntry",
+    "SagaHistoryItem",
+    "SagaHistoryPage",
+    "SagaInstance",
+    "ScheduledTransition",
+    "SessionLocal",
+    "serialized_write",
     "update_order_status",
+    "update_saga_instance",
+    "WriteQueue",
 ]
\ No newline at end of file
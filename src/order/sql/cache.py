@@ -0,0 +1,100 @@
+from ..global_vars import (
+    ORDER_CACHE_SIZE,
+    ORDER_CACHE_TTL,
+)
+from .models import Order
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Protocol,
+    Tuple,
+)
+import time
+
+OrderValues = Dict[str, Any]
+
+class CacheBackend(Protocol):
+    """Storage of the order cache; a shared backend lets several instances use one cache."""
+    async def get(self, order_id: int) -> Optional[OrderValues]: ...
+    async def set(self, order_id: int, values: OrderValues) -> None: ...
+    async def delete(self, order_id: int) -> None: ...
+    def __len__(self) -> int: ...
+
+class MemoryCacheBackend:
+    """In-process LRU store whose entries expire 'ttl' seconds after being written."""
+
+    def __init__(self, size: int, ttl: float) -> None:
+        self._size = size
+        self._ttl = ttl
+        self._entries: OrderedDict[int, Tuple[float, OrderValues]] = OrderedDict()
+
+    async def get(self, order_id: int) -> Optional[OrderValues]:
+        if (entry := self._entries.get(order_id)) is None:
+            return None
+        stored_at, values = entry
+        if time.monotonic() - stored_at > self._ttl:
+            del self._entries[order_id]
+            return None
+        self._entries.move_to_end(order_id)
+        return values
+
+    async def set(self, order_id: int, values: OrderValues) -> None:
+        self._entries[order_id] = (time.monotonic(), values)
+        self._entries.move_to_end(order_id)
+        while len(self._entries) > self._size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, order_id: int) -> None:
+        self._entries.pop(order_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class OrderCache:
+    """
+    Read-through cache of order rows.
+
+    Entries hold the column values, not session-bound objects; reads return a detached
+    Order built from them. Writers keep it current through 'put', 'set_status' and
+    'invalidate' once their transaction committed.
+    """
+
+    def __init__(self, backend: CacheBackend) -> None:
+        self._backend = backend
+        self._hits = 0
+        self._misses = 0
+
+    async def get(self, order_id: int) -> Optional[Order]:
+        if (values := await self._backend.get(order_id)) is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return Order(**values)
+
+    async def put(self, db_order: Order) -> None:
+        await self._backend.set(
+            db_order.id,
+            {column.key: getattr(db_order, column.key) for column in Order.__table__.columns},
+        )
+
+    async def set_status(self, order_id: int, status: str) -> None:
+        if (values := await self._backend.get(order_id)) is not None:
+            await self._backend.set(order_id, {**values, "status": status})
+
+    async def invalidate(self, order_id: int) -> None:
+        await self._backend.delete(order_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._backend),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+        }
+
+
+ORDER_CACHE = OrderCache(MemoryCacheBackend(size=ORDER_CACHE_SIZE, ttl=ORDER_CACHE_TTL))
@@ -1,12 +1,47 @@
+from .cache import ORDER_CACHE
+from .database import dialect_insert
 from .models import (
+    IdempotencyRecord,
     Order, 
+    OutboxMessage,
     Piece,
+    SagaHistoryEntry,
+    SagaInstance,
+    ScheduledTransition,
 )
 from .schemas import OrderPieceSchema
-from chassis.sql import update_elements_statement_result
-from sqlalchemy import update
+from .writer import serialized_write
+from datetime import (
+    datetime,
+    timezone,
+)
+from sqlalchemy import (
+    and_,
+    delete,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from sqlalchemy.orm import (
+    aliased,
+    joinedload,
+)
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+import json
 
 async def create_order(
     db: AsyncSession, 
@@ -15,50 +50,650 @@ async def create_order(
     street: str,
     zip: str,
     total_amount: float,
-    pieces: list[OrderPieceSchema]
+    pieces: list[OrderPieceSchema],
+    saga: Optional[Callable[[Order], Dict[str, Any]]] = None,
+    idempotency_key: Optional[str] = None,
 ) -> Order:
-    db_order = Order(
-        client_id=client_id,
-        city=city,
-        street=street,
-        zip=zip,
-        status=Order.STATUS_CREATED,
-        total_amount=total_amount,
-    )
-    db.add(db_order)
-    await db.flush()
-    await db.refresh(db_order)
-
-    for piece in pieces:
-        db.add(
-            Piece(
-                order_id=db_order.id,
-                piece_type=piece.type,
-                quantity=piece.quantity,
-            )
+    """
+    'saga' may return the saga instance row that processes the new order; it is written
+    in the same transaction, so the order is never left without a saga to recover.
+    The claimed 'idempotency_key' of the request, if any, is bound to the new order in
+    that transaction too.
+    """
+    db_order = await _insert_order(db, client_id, city, street, zip, total_amount, pieces, saga, idempotency_key)
+    await ORDER_CACHE.put(db_order)
+    return db_order
+
+@serialized_write
+async def _insert_order(
+    db: AsyncSession, 
+    client_id: int, 
+    city: str,
+    street: str,
+    zip: str,
+    total_amount: float,
+    pieces: list[OrderPieceSchema],
+    saga: Optional[Callable[[Order], Dict[str, Any]]],
+    idempotency_key: Optional[str],
+) -> Order:
+    db_order = (
+        await db.execute(
+            insert(Order)
+                .values(
+                    client_id=client_id,
+                    city=city,
+                    street=street,
+                    zip=zip,
+                    status=Order.STATUS_CREATED,
+                    total_amount=total_amount,
+                )
+                .returning(Order)
+        )
+    ).scalar_one()
+
+    if pieces:
+        await db.execute(
+            insert(Piece),
+            [
+                {
+                    "order_id": db_order.id,
+                    "piece_type": piece.type,
+                    "quantity": piece.quantity,
+                }
+                for piece in pieces
+            ],
+        )
+
+    if saga is not None:
+        await db.execute(insert(SagaInstance).values(**saga(db_order)))
+
+    if idempotency_key is not None:
+        await db.execute(
+            update(IdempotencyRecord)
+                .where(IdempotencyRecord.client_id == client_id, IdempotencyRecord.key == idempotency_key)
+                .values(order_id=db_order.id)
         )
-    await db.flush()
-    await db.commit()
-    await db.refresh(db_order)
+
+    # Detach it so the commit does not expire the row RETURNING already loaded.
+    db.expunge(db_order)
     return db_order
 
 async def get_order(
     db: AsyncSession,
     order_id: int,
+    use_cache: bool = True,
 ) -> Optional[Order]:
-    return await db.get(Order, order_id)
+    """Read an order through ORDER_CACHE; 'use_cache=False' always reads the database."""
+    if use_cache and (db_order := await ORDER_CACHE.get(order_id)) is not None:
+        return db_order
+    if (db_order := await db.get(Order, order_id)) is not None:
+        await ORDER_CACHE.put(db_order)
+    return db_order
+
+async def list_orders(
+    db: AsyncSession,
+    client_id: Optional[int],
+    status: Optional[str],
+    after_id: Optional[int],
+    before_id: Optional[int],
+    limit: int,
+) -> List[Order]:
+    """
+    Keyset page of orders by id, with their pieces loaded in the same query. 'after_id'
+    is the last id of the previous page; filters are served by the client and status indexes.
+    """
+    stmt = (
+        select(Order)
+            .options(joinedload(Order.pieces))
+            .order_by(Order.id)
+            .limit(limit)
+    )
+    if client_id is not None:
+        stmt = stmt.where(Order.client_id == client_id)
+    if status is not None:
+        stmt = stmt.where(Order.status == status)
+    if after_id is not None:
+        stmt = stmt.where(Order.id > after_id)
+    if before_id is not None:
+        stmt = stmt.where(Order.id < before_id)
+    return list((await db.execute(stmt)).unique().scalars().all())
+
+def outbox_message(
+    message: Dict[str, Any],
+    queue: str = "",
+    exchange: str = "",
+    exchange_type: str = "direct",
+    routing_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Outbox row for a message, with the same arguments as PUBLISHER.publish."""
+    return {
+        "exchange": exchange,
+        "exchange_type": exchange_type,
+        "routing_key": routing_key if routing_key is not None else queue,
+        "queue": queue,
+        "payload": json.dumps(message),
+    }
 
 async def update_order_status(
     db: AsyncSession,
     order_id: int,
     status: str,
+    from_statuses: Optional[Iterable[str]] = None,
+    messages: Optional[Callable[[Order], Iterable[Dict[str, Any]]]] = None,
+    saga_instance: Optional[Tuple[str, str]] = None,
+    saga_values: Optional[Callable[[Order], Dict[str, Any]]] = None,
+) -> Optional[Order]:
+    """
+    Set the status of an order in a single round trip and return the updated row.
+
+    When 'from_statuses' is given the update only applies if the current status is one
+    of them; None is returned if the order does not exist or the transition conflicts.
+    'messages' may return outbox rows (see 'outbox_message') for the updated order;
+    they are written in the same transaction and published by the outbox relay.
+
+    'saga_instance' is the (id, owner) of the saga making the change: the update only
+    applies while that owner holds the instance, and 'saga_values' may return columns
+    of the instance to record in the same transaction, so a resumed saga knows it
+    already made the change.
+    """
+    db_order = await _update_order_status(db, order_id, status, from_statuses, messages, saga_instance, saga_values)
+    if db_order is not None:
+        await ORDER_CACHE.put(db_order)
+    else:
+        # A conflict means the cached status, if any, is not the current one.
+        await ORDER_CACHE.invalidate(order_id)
+    return db_order
+
+@serialized_write
+async def _update_order_status(
+    db: AsyncSession,
+    order_id: int,
+    status: str,
+    from_statuses: Optional[Iterable[str]],
+    messages: Optional[Callable[[Order], Iterable[Dict[str, Any]]]],
+    saga_instance: Optional[Tuple[str, str]],
+    saga_values: Optional[Callable[[Order], Dict[str, Any]]],
+) -> Optional[Order]:
+    db_order = await _set_order_status(db, order_id, status, from_statuses, saga_instance)
+    if db_order is None:
+        return None
+    if messages is not None:
+        await _insert_outbox_messages(db, messages(db_order))
+    if saga_instance is not None and saga_values is not None:
+        instance_id, owner = saga_instance
+        await db.execute(
+            update(SagaInstance)
+                .where(SagaInstance.id == instance_id, SagaInstance.owner == owner)
+                .values(**saga_values(db_order))
+                .execution_options(synchronize_session=False)
+        )
+    return db_order
+
+async def _insert_outbox_messages(
+    db: AsyncSession,
+    messages: Iterable[Dict[str, Any]],
+) -> None:
+    created_at = datetime.now(timezone.utc)
+    if rows := [{**row, "created_at": created_at, "next_attempt_at": created_at} for row in messages]:
+        await db.execute(insert(OutboxMessage), rows)
+
+async def _set_order_status(
+    db: AsyncSession,
+    order_id: int,
+    status: str,
+    from_statuses: Optional[Iterable[str]],
+    saga_instance: Optional[Tuple[str, str]] = None,
 ) -> Optional[Order]:
-    await update_elements_statement_result(
-        db=db,
-        stmt=(
-            update(Order)
-                .where(Order.id == order_id)
+    stmt = update(Order).where(Order.id == order_id)
+    if from_statuses is not None:
+        stmt = stmt.where(Order.status.in_(tuple(from_statuses)))
+    if saga_instance is not None:
+        instance_id, owner = saga_instance
+        stmt = stmt.where(exists().where(SagaInstance.id == instance_id, SagaInstance.owner == owner))
+    db_order = (
+        await db.execute(
+            stmt
+                .values(status=status)
+                .returning(Order)
+                .execution_options(populate_existing=True, synchronize_session=False)
+        )
+    ).scalar_one_or_none()
+    if db_order is not None:
+        db.expunge(db_order)
+    return db_order
+
+async def apply_order_status_updates(
+    db: AsyncSession,
+    updates: Dict[int, str],
+    follow_up: Optional[Callable[[int, str], Optional[Tuple[str, datetime]]]] = None,
+) -> Dict[int, str]:
+    """
+    Apply many status updates in one transaction with one guarded UPDATE ... RETURNING
+    per target status. 'follow_up' may return a (status, due_at) transition to schedule
+    for an applied update; those are inserted in the same transaction.
+    Returns the updates that were applied.
+    """
+    applied = await _apply_order_status_updates(db, updates, follow_up)
+    for order_id in updates:
+        if (status := applied.get(order_id)) is not None:
+            await ORDER_CACHE.set_status(order_id, status)
+        else:
+            await ORDER_CACHE.invalidate(order_id)
+    return applied
+
+@serialized_write
+async def _apply_order_status_updates(
+    db: AsyncSession,
+    updates: Dict[int, str],
+    follow_up: Optional[Callable[[int, str], Optional[Tuple[str, datetime]]]],
+) -> Dict[int, str]:
+    by_status: Dict[str, List[int]] = {}
+    for order_id, status in updates.items():
+        by_status.setdefault(status, []).append(order_id)
+
+    applied: Dict[int, str] = {}
+    for status, order_ids in by_status.items():
+        stmt = update(Order).where(Order.id.in_(order_ids))
+        if (from_statuses := Order.ALLOWED_TRANSITIONS.get(status)) is not None:
+            stmt = stmt.where(Order.status.in_(from_statuses))
+        result = await db.execute(
+            stmt
                 .values(status=status)
+                .returning(Order.id)
+                .execution_options(synchronize_session=False)
+        )
+        applied.update((order_id, status) for order_id in result.scalars())
+
+    if follow_up is not None:
+        scheduled: List[Dict[str, Any]] = []
+        for order_id, status in applied.items():
+            if (transition := follow_up(order_id, status)) is not None:
+                next_status, due_at = transition
+                scheduled.append({"order_id": order_id, "status": next_status, "due_at": due_at})
+        if scheduled:
+            await db.execute(insert(ScheduledTransition), scheduled)
+
+    return applied
+
+async def apply_due_order_transitions(
+    db: AsyncSession,
+    now: datetime,
+    limit: int,
+    messages: Optional[Callable[[Order], Iterable[Dict[str, Any]]]] = None,
+) -> List[Order]:
+    """
+    Claim up to 'limit' due transitions and apply them in one transaction. Claiming
+    deletes the rows, so concurrent schedulers never apply the same transition twice.
+    'messages' may return outbox rows for each updated order, written in that transaction.
+    Returns the orders whose status actually changed.
+    """
+    applied = await _apply_due_order_transitions(db, now, limit, messages)
+    for db_order in applied:
+        await ORDER_CACHE.put(db_order)
+    return applied
+
+@serialized_write
+async def _apply_due_order_transitions(
+    db: AsyncSession,
+    now: datetime,
+    limit: int,
+    messages: Optional[Callable[[Order], Iterable[Dict[str, Any]]]],
+) -> List[Order]:
+    due = (
+        await db.execute(
+            delete(ScheduledTransition)
+                .where(
+                    ScheduledTransition.id.in_(
+                        select(ScheduledTransition.id)
+                            .where(ScheduledTransition.due_at <= now)
+                            .order_by(ScheduledTransition.due_at)
+                            .limit(limit)
+                            # PostgreSQL: concurrent instances claim disjoint rows; ignored on SQLite.
+                            .with_for_update(skip_locked=True)
+                    )
+                )
+                .returning(ScheduledTransition.order_id, ScheduledTransition.status)
+        )
+    ).all()
+    applied: List[Order] = []
+    for order_id, status in due:
+        db_order = await _set_order_status(db, order_id, status, Order.ALLOWED_TRANSITIONS.get(status))
+        if db_order is not None:
+            applied.append(db_order)
+    if messages is not None:
+        await _insert_outbox_messages(db, (row for db_order in applied for row in messages(db_order)))
+    return applied
+
+@serialized_write
+async def add_saga_history_entries(
+    db: AsyncSession,
+    entries: List[Dict[str, Any]],
+) -> None:
+    await db.execute(insert(SagaHistoryEntry), entries)
+
+@serialized_write
+async def add_saga_instance(
+    db: AsyncSession,
+    instance: Dict[str, Any],
+) -> None:
+    await db.execute(insert(SagaInstance).values(**instance))
+
+@serialized_write
+async def update_saga_instance(
+    db: AsyncSession,
+    instance_id: str,
+    owner: str,
+    state: str,
+    context: str,
+    branches: Optional[str] = None,
+) -> bool:
+    """
+    Record the state a saga is in, with the branch outcomes of a parallel state;
+    False if another owner took the saga over.
+    """
+    result = await db.execute(
+        update(SagaInstance)
+            .where(SagaInstance.id == instance_id, SagaInstance.owner == owner)
+            .values(state=state, context=context, branches=branches)
+            .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+@serialized_write
+async def delete_saga_instance(
+    db: AsyncSession,
+    instance_id: str,
+    owner: str,
+) -> None:
+    await db.execute(
+        delete(SagaInstance)
+            .where(SagaInstance.id == instance_id, SagaInstance.owner == owner)
+            .execution_options(synchronize_session=False)
+    )
+
+@serialized_write
+async def claim_saga_instances(
+    db: AsyncSession,
+    owner: str,
+    previous_owners: str,
+    stale_before: float,
+    lease_until: float,
+    limit: int,
+    running: Collection[str] = (),
+) -> List[SagaInstance]:
+    """
+    Take over up to 'limit' sagas nobody runs anymore: those of an earlier incarnation
+    of this instance (owners starting with 'previous_owners') and those whose deadline
+    passed before 'stale_before', including this owner's own sagas that stopped on an
+    error. The ids in 'running' are still executing here and are never claimed. Claimed
+    rows get 'owner' and 'lease_until' as their deadline, so no instance claims them
+    again while they are resumed.
+    """
+    claimed = list(
+        (
+            await db.execute(
+                update(SagaInstance)
+                    .where(
+                        SagaInstance.id.in_(
+                            select(SagaInstance.id)
+                                .where(
+                                    SagaInstance.id.not_in(running),
+                                    or_(
+                                        and_(
+                                            SagaInstance.owner != owner,
+                                            SagaInstance.owner.startswith(previous_owners, autoescape=True),
+                                        ),
+                                        SagaInstance.deadline < stale_before,
+                                    ),
+                                )
+                                .order_by(SagaInstance.deadline)
+                                .limit(limit)
+                                # PostgreSQL: concurrent instances claim disjoint rows; ignored on SQLite.
+                                .with_for_update(skip_locked=True)
+                        )
+                    )
+                    .values(owner=owner, deadline=lease_until)
+                    .returning(SagaInstance)
+                    .execution_options(synchronize_session=False)
+            )
+        ).scalars()
+    )
+    for instance in claimed:
+        db.expunge(instance)
+    return claimed
+
+@serialized_write
+async def claim_outbox_batch(
+    db: AsyncSession,
+    now: datetime,
+    lease_until: datetime,
+    limit: int,
+) -> List[OutboxMessage]:
+    """
+    Claim up to 'limit' of the oldest messages due at 'now', counting the attempt.
+    Claimed rows are not due again before 'lease_until', so no other relay publishes
+    them meanwhile, and they come back if this one stops before settling them.
+    """
+    claimed = list(
+        (
+            await db.execute(
+                update(OutboxMessage)
+                    .where(
+                        OutboxMessage.id.in_(
+                            select(OutboxMessage.id)
+                                .where(OutboxMessage.next_attempt_at <= now)
+                                .order_by(OutboxMessage.id)
+                                .limit(limit)
+                                # PostgreSQL: concurrent relays claim disjoint rows; ignored on SQLite.
+                                .with_for_update(skip_locked=True)
+                        )
+                    )
+                    .values(attempts=OutboxMessage.attempts + 1, next_attempt_at=lease_until)
+                    .returning(OutboxMessage)
+                    .execution_options(synchronize_session=False)
+            )
+        ).scalars()
+    )
+    for row in claimed:
+        db.expunge(row)
+    return sorted(claimed, key=lambda row: row.id)
+
+@serialized_write
+async def retry_outbox_messages(
+    db: AsyncSession,
+    retries: Dict[int, datetime],
+) -> None:
+    """Release claimed messages that were not confirmed, each due again at its own time."""
+    await db.execute(
+        update(OutboxMessage),
+        [{"id": message_id, "next_attempt_at": next_attempt_at} for message_id, next_attempt_at in retries.items()],
+    )
+
+@serialized_write
+async def delete_outbox_messages(
+    db: AsyncSession,
+    ids: Sequence[int],
+) -> None:
+    await db.execute(delete(OutboxMessage).where(OutboxMessage.id.in_(ids)))
+
+async def get_idempotency_record(
+    db: AsyncSession,
+    client_id: int,
+    key: str,
+    not_before: datetime,
+) -> Optional[IdempotencyRecord]:
+    """The record stored for 'key', unless it was created before 'not_before'."""
+    return (
+        await db.execute(
+            select(IdempotencyRecord)
+                .where(
+                    IdempotencyRecord.client_id == client_id,
+                    IdempotencyRecord.key == key,
+                    IdempotencyRecord.created_at >= not_before,
+                )
+        )
+    ).scalar_one_or_none()
+
+@serialized_write
+async def claim_idempotency_key(
+    db: AsyncSession,
+    client_id: int,
+    key: str,
+    request_hash: str,
+    now: datetime,
+    not_before: datetime,
+) -> bool:
+    """
+    Reserve 'key' for a new request in one statement; a record created before
+    'not_before' is expired and taken over. Returns False if another request holds it.
+    """
+    stmt = dialect_insert(IdempotencyRecord).values(
+        client_id=client_id,
+        key=key,
+        request_hash=request_hash,
+        created_at=now,
+    )
+    claimed = (
+        await db.execute(
+            stmt
+                .on_conflict_do_update(
+                    index_elements=[IdempotencyRecord.client_id, IdempotencyRecord.key],
+                    set_={
+                        "request_hash": stmt.excluded.request_hash,
+                        # The order of the expired request is not this request's.
+                        "order_id": None,
+                        "status_code": None,
+                        "response": None,
+                        "created_at": stmt.excluded.created_at,
+                    },
+                    where=IdempotencyRecord.created_at < not_before,
+                )
+                .returning(IdempotencyRecord.client_id)
+        )
+    ).scalar_one_or_none()
+    return claimed is not None
+
+@serialized_write
+async def complete_idempotency_key(
+    db: AsyncSession,
+    client_id: int,
+    key: str,
+    status_code: int,
+    response: str,
+) -> None:
+    await db.execute(
+        update(IdempotencyRecord)
+            .where(IdempotencyRecord.client_id == client_id, IdempotencyRecord.key == key)
+            .values(status_code=status_code, response=response)
+    )
+
+@serialized_write
+async def release_idempotency_key(
+    db: AsyncSession,
+    client_id: int,
+    key: str,
+) -> None:
+    await db.execute(
+        delete(IdempotencyRecord)
+            .where(IdempotencyRecord.client_id == client_id, IdempotencyRecord.key == key)
+    )
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timestamps back without their timezone; they are stored in UTC.
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+async def get_saga_history_transitions(
+    db: AsyncSession,
+    saga_type: str,
+    order_id: int,
+) -> List[Tuple[str, datetime]]:
+    result = await db.execute(
+        select(SagaHistoryEntry.state, SagaHistoryEntry.created_at)
+            .where(
+                SagaHistoryEntry.saga_type == saga_type,
+                SagaHistoryEntry.order_id == order_id,
+            )
+            .order_by(SagaHistoryEntry.id)
+    )
+    return [(state, _as_utc(created_at)) for state, created_at in result]
+
+async def get_saga_history_page(
+    db: AsyncSession,
+    saga_types: Sequence[str],
+    terminal_state: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    after: Optional[Tuple[str, int]],
+    limit: int,
+) -> List[Tuple[str, int, List[Tuple[str, datetime]]]]:
+    """
+    Keyset page of sagas ordered by (saga_type, order_id), the order of the
+    'ix_saga_history_saga' index, so pages are read from it without sorting. Terminal
+    state and time range filter on the last transition of each saga; 'after' is the
+    last key of the previous page.
+    """
+    stmt = (
+        select(SagaHistoryEntry.saga_type, SagaHistoryEntry.order_id)
+            .where(SagaHistoryEntry.saga_type.in_(saga_types))
+            .group_by(SagaHistoryEntry.saga_type, SagaHistoryEntry.order_id)
+            .order_by(SagaHistoryEntry.saga_type, SagaHistoryEntry.order_id)
+            .limit(limit)
+    )
+    if after is not None:
+        after_saga_type, after_order_id = after
+        stmt = stmt.where(
+            or_(
+                SagaHistoryEntry.saga_type > after_saga_type,
+                and_(
+                    SagaHistoryEntry.saga_type == after_saga_type,
+                    SagaHistoryEntry.order_id > after_order_id,
+                ),
+            )
+        )
+
+    # Filters on the last transition seek it in the index once per group, so the groups
+    # are still read in index order and the scan stops once the page is full.
+    latest = aliased(SagaHistoryEntry)
+    last = aliased(SagaHistoryEntry)
+    last_filters = []
+    if terminal_state is not None:
+        last_filters.append(last.state == terminal_state)
+    if since is not None:
+        last_filters.append(last.created_at >= since)
+    if until is not None:
+        last_filters.append(last.created_at < until)
+    if last_filters:
+        last_id = (
+            select(latest.id)
+                .where(
+                    latest.saga_type == SagaHistoryEntry.saga_type,
+                    latest.order_id == SagaHistoryEntry.order_id,
+                )
+                .order_by(latest.id.desc())
+                .limit(1)
+                .correlate(SagaHistoryEntry)
+                .scalar_subquery()
         )
+        stmt = stmt.having(exists().where(last.id == last_id, *last_filters).correlate(SagaHistoryEntry))
+    keys: List[Tuple[str, int]] = [(saga_type, order_id) for saga_type, order_id in await db.execute(stmt)]
+    if not keys:
+        return []
+
+    transitions: Dict[Tuple[str, int], List[Tuple[str, datetime]]] = {key: [] for key in keys}
+    result = await db.execute(
+        select(
+            SagaHistoryEntry.saga_type,
+            SagaHistoryEntry.order_id,
+            SagaHistoryEntry.state,
+            SagaHistoryEntry.created_at,
+        )
+            .where(
+                SagaHistoryEntry.order_id.in_({order_id for _, order_id in keys}),
+                SagaHistoryEntry.saga_type.in_({saga_type for saga_type, _ in keys}),
+            )
+            .order_by(SagaHistoryEntry.id)
     )
-    return await get_order(db, order_id)
\ No newline at end of file
+    for saga_type, order_id, state, created_at in result:
+        if (key := (saga_type, order_id)) in transitions:
+            transitions[key].append((state, _as_utc(created_at)))
+    return [(saga_type, order_id, transitions[(saga_type, order_id)]) for saga_type, order_id in keys]
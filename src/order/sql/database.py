@@ -0,0 +1,57 @@
+from ..global_vars import (
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_CACHE_SIZE,
+)
+from sqlalchemy.dialects import (
+    postgresql,
+    sqlite,
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    async_sessionmaker,
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Union,
+)
+
+def build_engine(url: str) -> AsyncEngine:
+    """
+    Create the async engine for 'url'. PostgreSQL (asyncpg) gets a tuned connection
+    pool and statement cache; SQLite keeps the driver defaults.
+    """
+    options: Dict[str, Any] = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if make_url(url).get_backend_name() == "postgresql":
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            connect_args={"statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+        )
+    return create_async_engine(url, **options)
+
+
+Engine = build_engine(DATABASE_URL)
+# Rows handed out by crud are detached before commit, so nothing relies on expiring them.
+SessionLocal = async_sessionmaker(Engine, class_=AsyncSession, expire_on_commit=False)
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with SessionLocal() as db:
+        yield db
+
+def dialect_insert(model: Any) -> Union[postgresql.Insert, sqlite.Insert]:
+    """INSERT supporting ON CONFLICT clauses on the configured backend."""
+    if Engine.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
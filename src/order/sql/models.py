@@ -1,18 +1,31 @@
 from chassis.sql import Base
+from datetime import datetime
 from sqlalchemy import (
+    DateTime,
     Integer, 
     Float,
     ForeignKey,
+    Index,
     String,
+    Text,
 )
 from sqlalchemy.orm import (
     Mapped,
     mapped_column,
+    relationship,
+)
+from typing import (
+    List,
+    Optional,
 )
 
 class Order(Base):
     __tablename__ = "order"
-    
+    __table_args__ = (
+        Index("ix_order_client_id", "client_id", "id"),
+        Index("ix_order_status", "status", "id"),
+    )
+
     STATUS_CREATED = "Created"
     STATUS_APPROVED = "Approved"
     STATUS_PROCESSED = "Processed"
@@ -21,6 +34,16 @@ class Order(Base):
     STATUS_CANCELLING = "Cancelling"
     STATUS_CANCELLED = "Cancelled"
 
+    # Statuses an order may move to, each with the statuses it may come from.
+    ALLOWED_TRANSITIONS = {
+        STATUS_APPROVED: (STATUS_CREATED, STATUS_CANCELLING),
+        STATUS_PROCESSED: (STATUS_APPROVED,),
+        STATUS_PACKAGED: (STATUS_APPROVED, STATUS_PROCESSED),
+        STATUS_DELIVERED: (STATUS_APPROVED, STATUS_PROCESSED, STATUS_PACKAGED),
+        STATUS_CANCELLING: (STATUS_APPROVED,),
+        STATUS_CANCELLED: (STATUS_CREATED, STATUS_CANCELLING),
+    }
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     client_id: Mapped[int] = mapped_column(Integer, nullable=False)
     city: Mapped[str] = mapped_column(String(50), nullable=False)
@@ -28,11 +51,75 @@ class Order(Base):
     zip: Mapped[str] = mapped_column(String(50), nullable=False)
     status: Mapped[str] = mapped_column(String(20), nullable=False, default=STATUS_CREATED)
     total_amount: Mapped[float] = mapped_column(Float, nullable=False)
+    # Never loaded implicitly: queries that need the pieces eager-load them.
+    pieces: Mapped[List["Piece"]] = relationship(lazy="raise_on_sql")
 
 class Piece(Base):
     __tablename__ = "o_piece"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    order_id: Mapped[int] = mapped_column(ForeignKey("order.id"), nullable=False)
+    order_id: Mapped[int] = mapped_column(ForeignKey("order.id"), nullable=False, index=True)
     piece_type: Mapped[str] = mapped_column(String(1), nullable=False)
-    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
\ No newline at end of file
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+
+class SagaHistoryEntry(Base):
+    __tablename__ = "saga_history"
+    __table_args__ = (
+        Index("ix_saga_history_saga", "saga_type", "order_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    saga_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    order_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    state: Mapped[str] = mapped_column(String(50), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+class SagaInstance(Base):
+    __tablename__ = "saga_instance"
+
+    # Generated by the saga, so it can address its row without reading it back.
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    saga_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    order_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    state: Mapped[str] = mapped_column(String(50), nullable=False)
+    # JSON of the StateContext.
+    context: Mapped[str] = mapped_column(Text, nullable=False)
+    # JSON of the outcome each branch of a parallel state reported so far.
+    branches: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    deadline: Mapped[float] = mapped_column(Float, nullable=False, index=True)
+    owner: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+
+class ScheduledTransition(Base):
+    __tablename__ = "scheduled_transition"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    order_id: Mapped[int] = mapped_column(ForeignKey("order.id"), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    due_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    exchange: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+    exchange_type: Mapped[str] = mapped_column(String(20), nullable=False, default="direct")
+    routing_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    queue: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Publish attempts so far; a claimed or failed row is not picked up before 'next_attempt_at'.
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+class IdempotencyRecord(Base):
+    __tablename__ = "idempotency_key"
+
+    client_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Set in the transaction that persists the order, so a failed request knows it exists.
+    order_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Both stay NULL while the first request is still being processed.
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    response: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
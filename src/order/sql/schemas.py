@@ -1,9 +1,26 @@
-from pydantic import BaseModel
+from ..http_client import check_callback_url
+from datetime import datetime
+from pydantic import (
+    BaseModel,
+    field_validator,
+    HttpUrl,
+)
+from typing import (
+    Dict,
+    Optional,
+)
 
 class Message(BaseModel):
     detail: str
     system_metrics: dict
 
+class HealthStatus(BaseModel):
+    ready: bool
+    checked_at: Optional[datetime]
+    checks: Dict[str, bool]
+    database_pool: Optional[str]
+    system_metrics: dict
+
 class OrderPieceSchema(BaseModel):
     type: str
     quantity: int
@@ -13,6 +30,15 @@ class OrderCreationRequest(BaseModel):
     street: str
     zip: str
     pieces: list[OrderPieceSchema]
+    callback_url: Optional[HttpUrl] = None
+
+    @field_validator("callback_url")
+    @classmethod
+    def _callback_url_allowed(cls, url: Optional[HttpUrl]) -> Optional[HttpUrl]:
+        # Checked again against the resolved addresses right before it is called.
+        if url is not None:
+            check_callback_url(str(url))
+        return url
 
 class OrderCreationResponse(BaseModel):
     id: int
@@ -20,8 +46,36 @@ class OrderCreationResponse(BaseModel):
     status: str
     client_id: int
 
+class OrderDetail(BaseModel):
+    id: int
+    client_id: int
+    city: str
+    street: str
+    zip: str
+    status: str
+    total_amount: float
+    pieces: list[OrderPieceSchema]
+
+class OrderPage(BaseModel):
+    items: list[OrderDetail]
+    next_cursor: Optional[int]
+
+class OrderStatusResponse(BaseModel):
+    order_id: int
+    status: str
+
 class OrderCancellationRequest(BaseModel):
     order_id: int
 
 class OrderCancellationResponse(BaseModel):
-    order_id: int
\ No newline at end of file
+    order_id: int
+
+class SagaHistoryItem(BaseModel):
+    saga_type: str
+    order_id: int
+    states: list[str]
+    updated_at: datetime
+
+class SagaHistoryPage(BaseModel):
+    items: list[SagaHistoryItem]
+    next_cursor: Optional[str]
\ No newline at end of file
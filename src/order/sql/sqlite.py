@@ -0,0 +1,28 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from typing import (
+    Any,
+    Dict,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+def configure_sqlite(engine: AsyncEngine, pragmas: Dict[str, str]) -> None:
+    """
+    Apply 'pragmas' to every new connection of 'engine' if it is a SQLite engine.
+    Must run before the engine opens its first connection.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    logger.info(f"[LOG:DB] - SQLite profile enabled: {pragmas}")
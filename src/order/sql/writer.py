@@ -0,0 +1,117 @@
+from ..global_vars import DB_WRITER_BATCH_SIZE
+from .database import SessionLocal
+from functools import wraps
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteJob = Callable[[AsyncSession], Awaitable[Any]]
+
+class WriteQueue:
+    """
+    Funnels database writes through a single task with group commit.
+
+    Jobs queued while a transaction runs are executed together in the next one and
+    committed once, so concurrent writers never contend for the SQLite lock. If any job
+    of a group fails the group is rolled back and its jobs are retried one by one, so
+    a failure only reaches the caller that caused it.
+    """
+
+    def __init__(self, batch_size: int) -> None:
+        self._batch_size = batch_size
+        self._queue: asyncio.Queue[Optional[Tuple[WriteJob, asyncio.Future]]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._commits = 0
+        self._writes = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None
+
+    async def run(self, job: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((job, future))
+        return await future
+
+    async def _commit(self, jobs: List[Tuple[WriteJob, asyncio.Future]]) -> None:
+        try:
+            async with SessionLocal() as db:
+                results = [await job(db) for job, _ in jobs]
+                await db.commit()
+        except Exception as e:
+            if len(jobs) > 1:
+                for job in jobs:
+                    await self._commit([job])
+            elif not (future := jobs[0][1]).done():
+                future.set_exception(e)
+            return
+        self._commits += 1
+        self._writes += len(jobs)
+        for (_, future), result in zip(jobs, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self) -> None:
+        while True:
+            if (item := await self._queue.get()) is None:
+                return
+            jobs = [item]
+            while len(jobs) < self._batch_size and not self._queue.empty():
+                if (item := self._queue.get_nowait()) is None:
+                    await self._commit(jobs)
+                    return
+                jobs.append(item)
+            await self._commit(jobs)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="db-writer")
+        logger.info(f"[LOG:DB] - Single writer started: batch_size={self._batch_size}")
+
+    async def stop(self) -> None:
+        """Commit the queued writes and stop; later writes run on the caller's session."""
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            await self._task
+            self._task = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "commits": self._commits,
+            "writes": self._writes,
+            "average_group_size": self._writes / self._commits if self._commits else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+
+DB_WRITER = WriteQueue(batch_size=DB_WRITER_BATCH_SIZE)
+
+def serialized_write(function: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """
+    Run a crud write through DB_WRITER when it is running, on the caller's session
+    otherwise. The decorated function takes the session first and must not commit.
+    """
+    @wraps(function)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        if "db" in kwargs:
+            db = kwargs.pop("db")
+        else:
+            db, *args = args
+        if DB_WRITER.is_running:
+            return await DB_WRITER.run(lambda writer_db: function(writer_db, *args, **kwargs))
+        result = await function(db, *args, **kwargs)
+        await db.commit()
+        return result
+    return wrapper
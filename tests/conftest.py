@@ -0,0 +1,174 @@
+"""
+Docker-free test harness.
+
+The service runs against a SQLite file through aiosqlite, the shared 'chassis' library is
+replaced by the stand-in under 'tests/stand_in', and RabbitMQ by StubBroker: publishes
+are recorded, and saga commands are answered through the real reply consumer.
+"""
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+)
+import asyncio
+import json
+import os
+import tempfile
+
+os.environ.setdefault(
+    "SQLALCHEMY_DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='order-test-'), 'order.db')}",
+)
+os.environ.setdefault("DB_SINGLE_WRITER", "false")
+os.environ.setdefault("SAGA_TIMEOUT", "2")
+for step_timeout in ("SAGA_PAYMENT_TIMEOUT", "SAGA_WAREHOUSE_TIMEOUT", "SAGA_DELIVERY_TIMEOUT"):
+    os.environ.setdefault(step_timeout, "0.2")
+
+from chassis.sql import Base
+from order import APP
+from order.messaging import (
+    MessageNotPublished,
+    PUBLISHER,
+    SAGA_REQUESTS,
+)
+from order.saga import SAGA_HISTORY
+from order.security import verify_jwt
+from order.sql import (
+    create_order,
+    Engine,
+    Order,
+    ORDER_CACHE,
+    OrderPieceSchema,
+    SessionLocal,
+    update_order_status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+import httpx
+import pytest
+
+Reply = Optional[Dict[str, Any]]
+Responder = Callable[[Dict[str, Any]], Reply]
+
+
+class StubIncomingMessage:
+    """The parts of an aio-pika incoming message the reply consumer reads."""
+
+    def __init__(self, body: Dict[str, Any], routing_key: str) -> None:
+        self.body = json.dumps(body).encode()
+        self.routing_key = routing_key
+        self.correlation_id = None
+
+    def process(self) -> "StubIncomingMessage":
+        return self
+
+    async def __aenter__(self) -> None:
+        return None
+
+    async def __aexit__(self, *_exc: Any) -> None:
+        return None
+
+
+class StubBroker:
+    """
+    Records every message the service publishes. Saga commands are answered by the
+    responder registered for their routing key; a responder returning None never replies.
+    Publishes to 'fail_routing_keys' are refused; those to 'unconfirmed_routing_keys'
+    are recorded but their confirm is lost, so the publisher cannot tell they were sent.
+    """
+
+    def __init__(self) -> None:
+        self.published: List[Dict[str, Any]] = []
+        self.responders: Dict[str, Responder] = {}
+        self.reply_delay = 0.0
+        self.fail_routing_keys: set[str] = set()
+        self.unconfirmed_routing_keys: set[str] = set()
+
+    def reply(self, routing_key: str, responder: Responder) -> None:
+        self.responders[routing_key] = responder
+
+    def messages(self, routing_key: str) -> List[Dict[str, Any]]:
+        return [entry["message"] for entry in self.published if entry["routing_key"] == routing_key]
+
+    async def publish_body(
+        self,
+        body: bytes,
+        queue: str = "",
+        exchange: str = "",
+        exchange_type: str = "direct",
+        routing_key: Optional[str] = None,
+    ) -> None:
+        routing_key = routing_key if routing_key is not None else queue
+        if routing_key in self.fail_routing_keys:
+            raise MessageNotPublished(f"Broker refused '{routing_key}'.")
+        message = json.loads(body)
+        self.published.append({"exchange": exchange, "routing_key": routing_key, "message": message})
+        if routing_key in self.unconfirmed_routing_keys:
+            raise ConnectionError(f"Confirm of '{routing_key}' lost.")
+        if (responder := self.responders.get(routing_key)) is not None and "correlation_id" in message:
+            if (response := responder(message)) is not None:
+                asyncio.get_running_loop().call_later(
+                    self.reply_delay,
+                    lambda: asyncio.ensure_future(
+                        SAGA_REQUESTS._on_reply(
+                            StubIncomingMessage(response, message["response_routing_key"])
+                        )
+                    ),
+                )
+
+
+@pytest.fixture(autouse=True)
+async def database() -> AsyncIterator[None]:
+    async with Engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    ORDER_CACHE._backend._entries.clear()
+    SAGA_HISTORY._buffer.clear()
+    SAGA_HISTORY._cache.clear()
+    yield
+    # Connections are bound to the event loop of the test.
+    await Engine.dispose()
+
+@pytest.fixture
+async def db() -> AsyncIterator[AsyncSession]:
+    async with SessionLocal() as session:
+        yield session
+
+@pytest.fixture
+def broker(monkeypatch: pytest.MonkeyPatch) -> StubBroker:
+    stub = StubBroker()
+    monkeypatch.setattr(PUBLISHER, "publish_body", stub.publish_body)
+    return stub
+
+@pytest.fixture
+def make_order() -> Callable[..., Awaitable[int]]:
+    """Persist an order directly, in the given status; returns its id."""
+    async def make(status: str = Order.STATUS_APPROVED, client_id: int = 1) -> int:
+        async with SessionLocal() as db:
+            db_order = await create_order(
+                db=db,
+                client_id=client_id,
+                city="Arrasate",
+                street="Loramendi 4",
+                zip="20",
+                total_amount=9.5,
+                pieces=[OrderPieceSchema(type="A", quantity=2)],
+            )
+            if status != Order.STATUS_CREATED:
+                await update_order_status(db, db_order.id, status)
+        return db_order.id
+    return make
+
+@pytest.fixture
+def token() -> Dict[str, Any]:
+    return {"sub": "1", "role": "client"}
+
+@pytest.fixture
+async def client(token: Dict[str, Any]) -> AsyncIterator[httpx.AsyncClient]:
+    APP.dependency_overrides[verify_jwt] = lambda: token
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=APP), base_url="http://order") as http:
+        yield http
+    APP.dependency_overrides.clear()
@@ -0,0 +1,4 @@
+"""
+Stand-in for the shared 'chassis' library, so the service can be imported and tested
+without RabbitMQ, Consul or the library itself.
+"""
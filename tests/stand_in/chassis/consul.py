@@ -0,0 +1,20 @@
+from typing import (
+    Optional,
+    Tuple,
+)
+
+class ConsulClient:
+    def __init__(self) -> None:
+        self.services: dict[str, Tuple[str, int]] = {}
+
+    def discover_service(self, service_name: str) -> Optional[Tuple[str, int]]:
+        return self.services.get(service_name)
+
+    def register_service(self, service_name: str, ec2_address: str, service_port: int) -> None:
+        self.services[service_name] = (ec2_address, service_port)
+
+    def deregister_service(self) -> None:
+        self.services.pop("order", None)
+
+
+CONSUL_CLIENT = ConsulClient()
@@ -0,0 +1,8 @@
+from typing import Any
+import logging
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
+
+def setup_rabbitmq_logging(**_kwargs: Any) -> None:
+    pass
@@ -0,0 +1,20 @@
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    TypedDict,
+)
+
+MessageType = Dict[str, Any]
+
+class RabbitMQConfig(TypedDict):
+    host: str
+    port: int
+    username: str
+    password: str
+    use_tls: bool
+    ca_cert: Optional[Path]
+    client_cert: Optional[Path]
+    client_key: Optional[Path]
+    prefetch_count: int
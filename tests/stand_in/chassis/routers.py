@@ -0,0 +1,14 @@
+from fastapi import HTTPException
+from typing import (
+    Any,
+    Dict,
+    NoReturn,
+)
+import logging
+
+def raise_and_log_error(logger: logging.Logger, status_code: int, message: str) -> NoReturn:
+    logger.error(message)
+    raise HTTPException(status_code=status_code, detail=message)
+
+def get_system_metrics() -> Dict[str, Any]:
+    return {}
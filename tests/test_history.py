@@ -0,0 +1,82 @@
+from order.saga import (
+    SAGA_HISTORY,
+    SagaHistoryStore,
+)
+from order.saga import history as history_module
+import json
+import pytest
+
+ADMIN = {"sub": "1", "role": "admin"}
+
+@pytest.fixture
+async def history():
+    for order_id in (3, 1, 2):
+        SAGA_HISTORY.append("creation", order_id, "CheckDeliveryState", new=True)
+        SAGA_HISTORY.append("creation", order_id, "ProcessApprovedState" if order_id != 2 else "OrderCancelledState")
+    SAGA_HISTORY.append("cancellation", 1, "CheckOrderExistsState")
+    SAGA_HISTORY.append("cancellation", 1, "ApproveCancellation")
+    await SAGA_HISTORY.flush()
+
+async def read_all(client, **params):
+    keys, cursor = [], None
+    while True:
+        page = (
+            await client.get(
+                "/order/saga/history",
+                params={**params, "limit": 2, **({"cursor": cursor} if cursor is not None else {})},
+            )
+        ).json()
+        keys += [(item["saga_type"], item["order_id"]) for item in page["items"]]
+        if (cursor := page["next_cursor"]) is None:
+            return keys
+
+@pytest.mark.parametrize("token", [ADMIN])
+async def test_history_pages_follow_the_index_order(client, history):
+    assert await read_all(client) == [
+        ("cancellation", 1),
+        ("creation", 1),
+        ("creation", 2),
+        ("creation", 3),
+    ]
+
+@pytest.mark.parametrize("token", [ADMIN])
+async def test_history_filters_on_the_last_state(client, history):
+    assert await read_all(client, terminal_state="ProcessApprovedState") == [
+        ("creation", 1),
+        ("creation", 3),
+    ]
+    assert await read_all(client, saga_type="creation", terminal_state="OrderCancelledState") == [
+        ("creation", 2),
+    ]
+
+@pytest.mark.parametrize("token", [ADMIN])
+async def test_history_stream(client, history):
+    response = await client.get("/order/saga/history", params={"stream": True, "limit": 1})
+
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert [(item["saga_type"], item["order_id"]) for item in items] == [
+        ("cancellation", 1),
+        ("creation", 1),
+        ("creation", 2),
+        ("creation", 3),
+    ]
+
+async def test_history_buffer_is_bounded(monkeypatch):
+    async def unavailable(*_):
+        raise ConnectionError("Database unavailable.")
+
+    store = SagaHistoryStore(flush_size=100, flush_interval=1, buffer_size=3, cache_size=10, cache_ttl=60)
+    monkeypatch.setattr(history_module, "add_saga_history_entries", unavailable)
+    for order_id in range(1, 5):
+        store.append("creation", order_id, "CheckDeliveryState", new=True)
+    with pytest.raises(ConnectionError):
+        await store.flush()
+    store.append("creation", 5, "CheckDeliveryState", new=True)
+
+    assert [entry["order_id"] for entry in store._buffer] == [3, 4, 5]
+    assert store.metrics()["dropped"] == 2
+
+    monkeypatch.undo()
+    await store.flush()
+    assert store.metrics()["buffered"] == 0
+    assert [state for state, _ in await SAGA_HISTORY.get("creation", 5)] == ["CheckDeliveryState"]
@@ -0,0 +1,226 @@
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+from order import http_client
+from order.routers import main_router
+from order.saga import SAGA_RUNNER
+from order.sql import (
+    apply_order_status_updates,
+    get_order,
+    IdempotencyRecord,
+    Order,
+    OutboxMessage,
+    update_order_status,
+)
+from sqlalchemy import (
+    func,
+    insert,
+    select,
+)
+import httpx
+import pytest
+
+ORDER = {
+    "city": "Arrasate",
+    "street": "Loramendi 4",
+    "zip": "20",
+    "pieces": [{"type": "A", "quantity": 2}],
+}
+
+async def count_orders(db) -> int:
+    return (await db.execute(select(func.count()).select_from(Order))).scalar_one()
+
+async def test_create_order_approved(client, broker, db):
+    broker.reply("payment.reserve", lambda _: {"status": "OK"})
+
+    response = await client.post("/order/create", json=ORDER)
+
+    assert response.status_code == 201
+    assert response.json()["status"] == Order.STATUS_APPROVED
+    queues = (await db.execute(select(OutboxMessage.queue).order_by(OutboxMessage.id))).scalars().all()
+    assert queues == ["order.piece.request", "delivery.create"]
+
+async def test_create_order_without_balance_is_cancelled(client, broker, db):
+    broker.reply("payment.reserve", lambda _: {"status": "NO_FUNDS"})
+
+    response = await client.post("/order/create", json=ORDER)
+
+    assert response.status_code == 403
+    db_order = await get_order(db, 1, use_cache=False)
+    assert db_order.status == Order.STATUS_CANCELLED
+    assert broker.messages("payment.release") == []
+
+async def test_invalid_zipcode_never_reaches_payment(client, broker):
+    response = await client.post("/order/create", json={**ORDER, "zip": "99"})
+
+    assert response.status_code == 403
+    assert broker.messages("payment.reserve") == []
+
+async def test_idempotent_replay(client, broker, db):
+    broker.reply("payment.reserve", lambda _: {"status": "OK"})
+    headers = {"Idempotency-Key": "retry-1"}
+
+    first = await client.post("/order/create", json=ORDER, headers=headers)
+    second = await client.post("/order/create", json=ORDER, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert await count_orders(db) == 1
+    assert len(broker.messages("payment.reserve")) == 1
+
+async def test_idempotent_replay_of_rejection(client, broker, db):
+    broker.reply("payment.reserve", lambda _: {"status": "NO_FUNDS"})
+    headers = {"Idempotency-Key": "retry-2"}
+
+    first = await client.post("/order/create", json=ORDER, headers=headers)
+    second = await client.post("/order/create", json=ORDER, headers=headers)
+
+    assert first.status_code == second.status_code == 403
+    assert await count_orders(db) == 1
+
+async def test_idempotency_key_reused_with_other_request(client, broker):
+    broker.reply("payment.reserve", lambda _: {"status": "OK"})
+    headers = {"Idempotency-Key": "retry-3"}
+
+    await client.post("/order/create", json=ORDER, headers=headers)
+    response = await client.post("/order/create", json={**ORDER, "zip": "48"}, headers=headers)
+
+    assert response.status_code == 422
+
+async def test_failed_request_before_the_order_releases_the_key(client, broker, db, monkeypatch):
+    broker.reply("payment.reserve", lambda _: {"status": "OK"})
+    headers = {"Idempotency-Key": "retry-4"}
+
+    async def unavailable(**_):
+        raise ConnectionError("Database unavailable.")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(main_router, "create_order", unavailable)
+        with pytest.raises(ConnectionError):
+            await client.post("/order/create", json=ORDER, headers=headers)
+    response = await client.post("/order/create", json=ORDER, headers=headers)
+
+    assert response.status_code == 201
+    assert await count_orders(db) == 1
+
+async def test_failed_request_after_the_order_keeps_the_key(client, broker, db, monkeypatch):
+    headers = {"Idempotency-Key": "retry-5"}
+
+    async def crash(*_):
+        raise RuntimeError("Saga crashed.")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(main_router, "_complete_order_creation", crash)
+        with pytest.raises(RuntimeError):
+            await client.post("/order/create", json=ORDER, headers=headers)
+    response = await client.post("/order/create", json=ORDER, headers=headers)
+
+    # The retry points at the order that exists instead of creating another one.
+    assert response.status_code == 202
+    assert response.headers["Location"] == f"/order/{response.json()['id']}/status"
+    assert await count_orders(db) == 1
+    assert broker.messages("payment.reserve") == []
+
+async def test_failed_request_after_taking_over_an_expired_key(client, broker, db, make_order, monkeypatch):
+    broker.reply("payment.reserve", lambda _: {"status": "OK"})
+    headers = {"Idempotency-Key": "retry-6"}
+    earlier_order_id = await make_order(Order.STATUS_CREATED)
+    # Left by an earlier request that persisted its order, long before the key's TTL.
+    await db.execute(
+        insert(IdempotencyRecord).values(
+            client_id=1,
+            key="retry-6",
+            request_hash="earlier",
+            order_id=earlier_order_id,
+            created_at=datetime.now(timezone.utc) - timedelta(days=30),
+        )
+    )
+    await db.commit()
+
+    async def unavailable(**_):
+        raise ConnectionError("Database unavailable.")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(main_router, "create_order", unavailable)
+        with pytest.raises(ConnectionError):
+            await client.post("/order/create", json=ORDER, headers=headers)
+    response = await client.post("/order/create", json=ORDER, headers=headers)
+
+    # The retry creates its own order instead of pointing at the earlier one.
+    assert response.status_code == 201
+    assert response.json()["id"] != earlier_order_id
+    assert await count_orders(db) == 2
+
+@pytest.mark.parametrize(
+    "callback_url",
+    [
+        "http://hooks.example.com/order",
+        "https://127.0.0.1/order",
+        "https://[::1]/order",
+        "https://10.0.0.7/order",
+        "https://169.254.169.254/latest/meta-data",
+        "file:///etc/passwd",
+    ],
+)
+async def test_callback_url_must_be_public_https(client, broker, db, callback_url):
+    response = await client.post("/order/create", json={**ORDER, "callback_url": callback_url})
+
+    assert response.status_code == 422
+    assert await count_orders(db) == 0
+
+async def callback_posts(client, broker, monkeypatch, callback_url: str):
+    posts = []
+
+    async def post(url, **_):
+        posts.append(url)
+        raise httpx.ConnectError("Not sent in tests.")
+
+    broker.reply("payment.reserve", lambda _: {"status": "OK"})
+    monkeypatch.setattr(http_client.HTTP_CLIENT, "post", post)
+    response = await client.post("/order/create", json={**ORDER, "callback_url": callback_url})
+    await SAGA_RUNNER.shutdown()
+    assert response.status_code == 202
+    return posts
+
+async def test_callback_to_host_resolving_to_loopback_is_not_sent(client, broker, monkeypatch):
+    assert await callback_posts(client, broker, monkeypatch, "https://localhost/order") == []
+
+async def test_callback_to_allowed_host_is_sent(client, broker, monkeypatch):
+    monkeypatch.setattr(http_client, "CALLBACK_ALLOWED_HOSTS", ("hooks.example.com",))
+
+    posts = await callback_posts(client, broker, monkeypatch, "https://hooks.example.com/order")
+
+    assert posts == ["https://hooks.example.com/order"]
+
+@pytest.mark.parametrize(
+    "current, target, from_statuses, applied",
+    [
+        (Order.STATUS_APPROVED, Order.STATUS_CANCELLING, (Order.STATUS_APPROVED,), True),
+        (Order.STATUS_CANCELLING, Order.STATUS_CANCELLING, (Order.STATUS_APPROVED,), False),
+        (Order.STATUS_CANCELLED, Order.STATUS_APPROVED, (Order.STATUS_CREATED,), False),
+    ],
+)
+async def test_guarded_status_update(db, make_order, current, target, from_statuses, applied):
+    order_id = await make_order(current)
+
+    db_order = await update_order_status(db, order_id, target, from_statuses=from_statuses)
+
+    assert (db_order is not None) == applied
+    expected = target if applied else current
+    assert (await get_order(db, order_id)).status == expected
+    assert (await get_order(db, order_id, use_cache=False)).status == expected
+
+async def test_status_events_follow_allowed_transitions(db, make_order):
+    approved = await make_order(Order.STATUS_APPROVED)
+    cancelled = await make_order(Order.STATUS_CANCELLED)
+
+    applied = await apply_order_status_updates(
+        db,
+        {approved: Order.STATUS_PROCESSED, cancelled: Order.STATUS_PROCESSED},
+    )
+
+    assert applied == {approved: Order.STATUS_PROCESSED}
+    assert (await get_order(db, cancelled, use_cache=False)).status == Order.STATUS_CANCELLED
@@ -0,0 +1,85 @@
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+from order.messaging import OUTBOX_RELAY
+from order.scheduler import SCHEDULER
+from order.sql import (
+    claim_outbox_batch,
+    Order,
+    outbox_message,
+    OutboxMessage,
+    ScheduledTransition,
+    update_order_status,
+)
+from sqlalchemy import (
+    insert,
+    select,
+    update,
+)
+
+async def add_messages(db, make_order, *queues: str) -> None:
+    order_id = await make_order(Order.STATUS_CREATED)
+    await update_order_status(
+        db,
+        order_id,
+        Order.STATUS_APPROVED,
+        messages=lambda db_order: [outbox_message({"order_id": db_order.id}, queue=queue) for queue in queues],
+    )
+
+async def pending_queues(db):
+    return (await db.execute(select(OutboxMessage.queue).order_by(OutboxMessage.id))).scalars().all()
+
+async def test_relay_publishes_and_deletes(db, broker, make_order):
+    await add_messages(db, make_order, "order.piece.request", "delivery.create")
+
+    assert await OUTBOX_RELAY.relay() == 2
+
+    assert [entry["routing_key"] for entry in broker.published] == ["order.piece.request", "delivery.create"]
+    assert await pending_queues(db) == []
+
+async def test_relay_keeps_unconfirmed_messages(db, broker, make_order):
+    await add_messages(db, make_order, "order.piece.request", "delivery.create")
+    broker.fail_routing_keys.add("delivery.create")
+
+    assert await OUTBOX_RELAY.relay() == 2
+    assert await pending_queues(db) == ["delivery.create"]
+
+    broker.fail_routing_keys.clear()
+    # Backing off: the failed message is not retried at once.
+    assert await OUTBOX_RELAY.relay() == 0
+    await db.execute(update(OutboxMessage).values(next_attempt_at=datetime.now(timezone.utc)))
+    await db.commit()
+    assert await OUTBOX_RELAY.relay() == 1
+    assert await pending_queues(db) == []
+    assert len(broker.messages("delivery.create")) == 1
+
+async def test_claimed_messages_are_leased(db, broker, make_order):
+    await add_messages(db, make_order, "order.piece.request")
+    now = datetime.now(timezone.utc)
+
+    claimed = await claim_outbox_batch(db, now, now + timedelta(seconds=30), limit=10)
+
+    # Another relay skips the row until the lease of the first one expires.
+    assert [row.attempts for row in claimed] == [1]
+    assert await OUTBOX_RELAY.relay() == 0
+    assert await claim_outbox_batch(db, now + timedelta(seconds=31), now + timedelta(seconds=61), limit=10)
+
+async def test_scheduled_transition_writes_its_message(db, broker, make_order):
+    order_id = await make_order(Order.STATUS_APPROVED)
+    await db.execute(
+        insert(ScheduledTransition).values(
+            order_id=order_id,
+            status=Order.STATUS_PACKAGED,
+            due_at=datetime.now(timezone.utc),
+        )
+    )
+    await db.commit()
+
+    assert await SCHEDULER.run_due() == 1
+
+    assert broker.published == []
+    assert await pending_queues(db) == ["delivery.start"]
+    assert await OUTBOX_RELAY.relay() == 1
+    assert broker.messages("delivery.start") == [{"order_id": order_id}]
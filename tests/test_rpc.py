@@ -0,0 +1,99 @@
+from aio_pika.exceptions import DeliveryError
+from order.messaging import (
+    ConfirmingPublisher,
+    MessageNotPublished,
+    PUBLISHER,
+    SAGA_REQUESTS,
+)
+import asyncio
+import pytest
+import time
+
+async def request(timeout: float):
+    return await SAGA_REQUESTS.request(
+        {"order_id": "1"},
+        routing_key="warehouse.reserve",
+        reply_exchange="warehouse_sagas",
+        timeout=timeout,
+    )
+
+async def test_reply_resolves_request(broker):
+    broker.reply("warehouse.reserve", lambda _: {"status": "OK"})
+
+    assert await request(timeout=1) == {"status": "OK"}
+    assert SAGA_REQUESTS._pending == {}
+
+async def test_timeout_covers_the_publish(monkeypatch):
+    async def unconfirmed(*_, **__):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(PUBLISHER, "publish_body", unconfirmed)
+    started = time.monotonic()
+
+    with pytest.raises(TimeoutError):
+        await request(timeout=0.1)
+
+    assert time.monotonic() - started < 1
+    assert SAGA_REQUESTS._pending == {}
+
+async def test_failed_publish_forgets_the_request(broker):
+    broker.fail_routing_keys.add("warehouse.reserve")
+
+    with pytest.raises(MessageNotPublished):
+        await request(timeout=1)
+
+    assert SAGA_REQUESTS._pending == {}
+
+async def test_publish_that_may_have_been_sent_times_out(broker):
+    broker.unconfirmed_routing_keys.add("warehouse.reserve")
+
+    with pytest.raises(TimeoutError):
+        await request(timeout=1)
+
+    assert SAGA_REQUESTS._pending == {}
+
+class StubExchange:
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+    async def publish(self, *_, **__) -> None:
+        raise self.error
+
+@pytest.mark.parametrize(
+    "declare_error, publish_error, raised",
+    [
+        # The channel could not be opened, so nothing was sent.
+        (ConnectionError("Connection refused."), None, MessageNotPublished),
+        # The broker nacked the message.
+        (None, DeliveryError(None, None), MessageNotPublished),
+        # The connection dropped while waiting for the confirm.
+        (None, ConnectionError("Connection lost."), ConnectionError),
+    ],
+)
+async def test_publisher_tells_whether_a_failed_message_may_have_been_sent(
+    monkeypatch, declare_error, publish_error, raised,
+):
+    publisher = ConfirmingPublisher(connection=None, window=1, max_retries=0)
+
+    async def exchange(*_):
+        if declare_error is not None:
+            raise declare_error
+        return StubExchange(publish_error)
+
+    monkeypatch.setattr(publisher, "_exchange", exchange)
+
+    with pytest.raises(ConnectionError) as error:
+        await publisher.publish({"order_id": 1}, queue="delivery.create")
+
+    assert isinstance(error.value, MessageNotPublished) == (raised is MessageNotPublished)
+
+async def test_cancelled_request_forgets_it(broker):
+    task = asyncio.create_task(request(timeout=10))
+    await asyncio.sleep(0.01)
+    assert len(SAGA_REQUESTS._pending) == 1
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert SAGA_REQUESTS._pending == {}
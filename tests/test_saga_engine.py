@@ -0,0 +1,132 @@
+from order.global_vars import SAGA_REPLY_INSTANCE_ID
+from order.saga import (
+    BaseSaga,
+    Branch,
+    Outcome,
+    Parallel,
+    SAGA_RECOVERY,
+    SAGA_RUNNER,
+    StateContext,
+    Step,
+    TransitionTable,
+)
+from order.saga.base_state import State
+from order.sql import (
+    add_saga_instance,
+    Order,
+)
+from enum import StrEnum
+from typing import (
+    Dict,
+    List,
+)
+import json
+import pytest
+import time
+
+# Outcome each reservation reports, and the compensations run, in the current test.
+OUTCOMES: Dict[str, Outcome] = {}
+UNDONE: List[str] = []
+
+class ReserveA(State):
+    async def run(self) -> Outcome:
+        return OUTCOMES["ReserveA"]
+
+class ReserveB(State):
+    async def run(self) -> Outcome:
+        return OUTCOMES["ReserveB"]
+
+class UndoA(State):
+    async def run(self) -> Outcome:
+        UNDONE.append("ReserveA")
+        return Outcome.OK
+
+class UndoB(State):
+    async def run(self) -> Outcome:
+        UNDONE.append("ReserveB")
+        return Outcome.OK
+
+class Finish(State):
+    async def run(self) -> Outcome:
+        return Outcome.OK
+
+class ReservationState(StrEnum):
+    RESERVE = "Reserve"
+    RESERVED = "Reserved"
+    NOT_RESERVED = "NotReserved"
+
+class ReservationSaga(BaseSaga):
+    SAGA_TYPE = "reservation"
+    TRANSITIONS = TransitionTable(
+        initial=ReservationState.RESERVE,
+        steps={
+            ReservationState.RESERVE: Step(
+                Parallel(
+                    Branch(ReserveA, compensation=UndoA),
+                    Branch(ReserveB, compensation=UndoB),
+                ),
+                next={
+                    Outcome.OK: ReservationState.RESERVED,
+                    Outcome.FAILED: ReservationState.NOT_RESERVED,
+                    Outcome.TIMEOUT: ReservationState.NOT_RESERVED,
+                },
+            ),
+            ReservationState.RESERVED: Step(Finish, result=True),
+            ReservationState.NOT_RESERVED: Step(Finish, result=False),
+        },
+    )
+
+@pytest.fixture(autouse=True)
+def reservations():
+    OUTCOMES.clear()
+    UNDONE.clear()
+
+def context(order_id: int) -> StateContext:
+    return StateContext(
+        order_id=order_id,
+        client_id=1,
+        admin=False,
+        total_amount=9.5,
+        zipcode=None,
+        deadline=time.time() + 60,
+    )
+
+@pytest.mark.parametrize(
+    "a, b, result, undone",
+    [
+        (Outcome.OK, Outcome.OK, True, []),
+        (Outcome.OK, Outcome.FAILED, False, ["ReserveA"]),
+        # A reservation without a reply may still happen, so it is undone too.
+        (Outcome.OK, Outcome.TIMEOUT, False, ["ReserveA", "ReserveB"]),
+        (Outcome.FAILED, Outcome.TIMEOUT, False, ["ReserveB"]),
+    ],
+)
+async def test_parallel_step_compensates_branches_that_did_not_fail(make_order, a, b, result, undone):
+    OUTCOMES.update(ReserveA=a, ReserveB=b)
+
+    saga = ReservationSaga(context(await make_order(Order.STATUS_CREATED)))
+
+    assert await saga.process() == result
+    assert sorted(UNDONE) == undone
+
+@pytest.mark.parametrize(
+    "branches, undone",
+    [
+        ({"ReserveA": "ok", "ReserveB": "ok"}, []),
+        # The reply of ReserveB went to the instance that stopped.
+        ({"ReserveA": "ok"}, ["ReserveA", "ReserveB"]),
+        ({"ReserveA": "failed"}, ["ReserveB"]),
+    ],
+)
+async def test_recovered_parallel_step_keeps_recorded_outcomes(broker, db, make_order, branches, undone):
+    # Left in the parallel step by an earlier incarnation of this instance.
+    await add_saga_instance(db, {
+        **ReservationSaga.instance("crashed", context(await make_order(Order.STATUS_CREATED))),
+        "branches": json.dumps(branches),
+        "owner": f"{SAGA_REPLY_INSTANCE_ID}/previous",
+    })
+
+    assert await SAGA_RECOVERY.recover() == 1
+    await SAGA_RUNNER.shutdown()
+
+    assert sorted(UNDONE) == undone
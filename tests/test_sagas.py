@@ -0,0 +1,304 @@
+from order.global_vars import (
+    SAGA_OWNER,
+    SAGA_REPLY_INSTANCE_ID,
+)
+from order.saga import (
+    OrderCancellationSaga,
+    OrderCreationSaga,
+    Outcome,
+    SAGA_RECOVERY,
+    SAGA_RUNNER,
+    StateContext,
+)
+from order.saga.base_saga import RUNNING
+from order.saga.order_cancellation.aprove_cancellation_state import ApproveCancellation
+from order.saga.order_cancellation.check_order_exists_state import CheckOrderExistsState
+from order.saga.order_creation.approve_order_state import ApproveOrderState
+from order.sql import (
+    add_saga_instance,
+    get_order,
+    Order,
+    OutboxMessage,
+    SagaInstance,
+)
+from sqlalchemy import (
+    func,
+    select,
+    update,
+)
+import asyncio
+import time
+
+ORDER = {"city": "Arrasate", "street": "Loramendi 4", "zip": "20", "pieces": [{"type": "A", "quantity": 1}]}
+
+async def cancel(client, order_id: int):
+    return await client.post("/order/cancel", json={"order_id": order_id})
+
+async def count_instances(db) -> int:
+    return (await db.execute(select(func.count()).select_from(SagaInstance))).scalar_one()
+
+async def test_cancellation_approved(client, broker, db, make_order):
+    order_id = await make_order(Order.STATUS_APPROVED)
+    broker.reply("warehouse.reserve", lambda _: {"status": "OK"})
+    broker.reply("delivery.cancel", lambda _: {"status": "OK"})
+
+    response = await cancel(client, order_id)
+
+    assert response.status_code == 202
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_CANCELLED
+    exchanges = (await db.execute(select(OutboxMessage.exchange))).scalars().all()
+    assert exchanges == ["cancellation-approved"]
+    assert await count_instances(db) == 0
+
+async def test_cancellation_without_warehouse_space_keeps_the_delivery(client, broker, db, make_order):
+    order_id = await make_order(Order.STATUS_APPROVED)
+    broker.reply("warehouse.reserve", lambda _: {"status": "FULL"})
+    broker.reply("delivery.cancel", lambda _: {"status": "OK"})
+
+    response = await cancel(client, order_id)
+
+    # delivery.cancel cannot be undone, so it is only sent once the space is reserved.
+    assert response.status_code == 400
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_APPROVED
+    assert broker.messages("delivery.cancel") == []
+    assert broker.messages("warehouse.release") == []
+
+async def test_cancellation_of_delivery_in_process_releases_the_warehouse(client, broker, db, make_order):
+    order_id = await make_order(Order.STATUS_APPROVED)
+    broker.reply("warehouse.reserve", lambda _: {"status": "OK"})
+    broker.reply("delivery.cancel", lambda _: {"status": "IN_PROCESS"})
+
+    response = await cancel(client, order_id)
+
+    assert response.status_code == 400
+    assert len(broker.messages("warehouse.release")) == 1
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_APPROVED
+
+async def test_warehouse_timeout_releases_the_warehouse(client, broker, db, make_order):
+    order_id = await make_order(Order.STATUS_APPROVED)
+    broker.reply("delivery.cancel", lambda _: {"status": "OK"})
+
+    response = await cancel(client, order_id)
+
+    # No warehouse reply: the reservation may still happen, so it is released.
+    assert response.status_code == 400
+    assert len(broker.messages("warehouse.release")) == 1
+    assert broker.messages("delivery.cancel") == []
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_APPROVED
+
+async def test_delivery_timeout_asks_again(client, broker, db, make_order):
+    order_id = await make_order(Order.STATUS_APPROVED)
+    broker.reply("warehouse.reserve", lambda _: {"status": "OK"})
+    replies = iter([None, {"status": "OK"}])
+    broker.reply("delivery.cancel", lambda _: next(replies))
+
+    response = await cancel(client, order_id)
+
+    # The first cancellation may still land, so it is not given up on.
+    assert response.status_code == 202
+    assert len(broker.messages("delivery.cancel")) == 2
+    assert broker.messages("warehouse.release") == []
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_CANCELLED
+
+async def test_cancellation_of_unknown_order_is_rejected(client, broker):
+    response = await cancel(client, 404)
+
+    assert response.status_code == 400
+    assert broker.published == []
+
+async def test_concurrent_cancellations(client, broker, db, make_order):
+    order_id = await make_order(Order.STATUS_APPROVED)
+    broker.reply("warehouse.reserve", lambda _: {"status": "OK"})
+    broker.reply("delivery.cancel", lambda _: {"status": "OK"})
+    broker.reply_delay = 0.05
+
+    responses = await asyncio.gather(cancel(client, order_id), cancel(client, order_id))
+
+    # The second saga finds the order 'Cancelling' and leaves it to the first one.
+    assert sorted(response.status_code for response in responses) == [202, 400]
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_CANCELLED
+    assert len(broker.messages("warehouse.reserve")) == 1
+    assert len(broker.messages("delivery.cancel")) == 1
+    exchanges = (await db.execute(select(OutboxMessage.exchange))).scalars().all()
+    assert exchanges == ["cancellation-approved"]
+
+async def test_rejection_leaves_orders_it_did_not_lock(broker, db, make_order):
+    order_id = await make_order(Order.STATUS_CANCELLING)
+
+    saga = OrderCancellationSaga(
+        StateContext(order_id=order_id, client_id=1, admin=False, total_amount=None, zipcode=None)
+    )
+
+    assert await saga.process() == False
+    assert saga.get_state() == "OrderNotCancellableState"
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_CANCELLING
+
+async def test_approval_fails_if_order_changed(db, make_order):
+    order_id = await make_order(Order.STATUS_APPROVED)
+    context = StateContext(order_id=order_id, client_id=1, admin=False, total_amount=9.5, zipcode=None)
+
+    assert await ApproveCancellation(context).run() == Outcome.FAILED
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_APPROVED
+    assert (await db.execute(select(OutboxMessage))).first() is None
+
+async def test_creation_timeout_releases_balance(client, broker, db):
+    # No payment reply: the reservation may still happen, so it is released.
+    response = await client.post("/order/create", json=ORDER)
+
+    assert response.status_code == 403
+    assert len(broker.messages("payment.release")) == 1
+    assert (await get_order(db, 1, use_cache=False)).status == Order.STATUS_CANCELLED
+
+async def test_creation_with_payment_not_sent_releases_nothing(client, broker, db):
+    broker.fail_routing_keys.add("payment.reserve")
+
+    response = await client.post("/order/create", json=ORDER)
+
+    assert response.status_code == 403
+    assert broker.messages("payment.release") == []
+    assert (await get_order(db, 1, use_cache=False)).status == Order.STATUS_CANCELLED
+    assert await count_instances(db) == 0
+
+async def test_creation_with_payment_maybe_sent_releases_balance(client, broker, db):
+    broker.unconfirmed_routing_keys.add("payment.reserve")
+
+    response = await client.post("/order/create", json=ORDER)
+
+    assert response.status_code == 403
+    assert len(broker.messages("payment.release")) == 1
+    assert (await get_order(db, 1, use_cache=False)).status == Order.STATUS_CANCELLED
+    assert await count_instances(db) == 0
+
+async def test_cancellation_with_delivery_not_sent_releases_the_warehouse(client, broker, db, make_order):
+    order_id = await make_order(Order.STATUS_APPROVED)
+    broker.reply("warehouse.reserve", lambda _: {"status": "OK"})
+    broker.fail_routing_keys.add("delivery.cancel")
+
+    response = await cancel(client, order_id)
+
+    assert response.status_code == 400
+    assert len(broker.messages("warehouse.release")) == 1
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_APPROVED
+    assert await count_instances(db) == 0
+
+def creation_context(order_id: int) -> StateContext:
+    return StateContext(
+        order_id=order_id,
+        client_id=1,
+        admin=False,
+        total_amount=9.5,
+        zipcode="20",
+        deadline=time.time() + 60,
+        pieces=[{"type": "A", "quantity": 2}],
+    )
+
+async def test_failed_approval_releases_balance(broker, db, make_order):
+    # Cancelled while its creation saga waited for the payment reply.
+    order_id = await make_order(Order.STATUS_CANCELLED)
+    broker.reply("payment.reserve", lambda _: {"status": "OK"})
+
+    assert await OrderCreationSaga(creation_context(order_id)).process() == False
+
+    assert len(broker.messages("payment.release")) == 1
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_CANCELLED
+    assert (await db.execute(select(OutboxMessage))).first() is None
+
+async def test_recovery_after_crash_between_approval_and_save(broker, db, make_order):
+    order_id = await make_order(Order.STATUS_CREATED)
+    context = creation_context(order_id)
+    await add_saga_instance(db, {
+        **OrderCreationSaga.instance("crashed", context),
+        "state": "ApproveOrderState",
+    })
+
+    # The order is approved, then the instance stops before its next state is saved.
+    assert await ApproveOrderState(context).run() == Outcome.OK
+    await db.execute(update(SagaInstance).values(owner=f"{SAGA_REPLY_INSTANCE_ID}/previous"))
+    await db.commit()
+
+    assert await SAGA_RECOVERY.recover() == 1
+    await SAGA_RUNNER.shutdown()
+
+    assert broker.messages("payment.release") == []
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_APPROVED
+    assert await count_instances(db) == 0
+
+async def test_recovery_resumes_unfinished_saga(broker, db, make_order):
+    order_id = await make_order(Order.STATUS_CREATED)
+    context = creation_context(order_id)
+    # Left waiting for the payment reply by an earlier incarnation of this instance.
+    await add_saga_instance(db, {
+        **OrderCreationSaga.instance("crashed", context),
+        "state": "CheckBalanceState",
+        "owner": f"{SAGA_REPLY_INSTANCE_ID}/previous",
+    })
+
+    assert await SAGA_RECOVERY.recover() == 1
+    await SAGA_RUNNER.shutdown()
+
+    assert len(broker.messages("payment.release")) == 1
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_CANCELLED
+    assert await count_instances(db) == 0
+    assert await SAGA_RECOVERY.recover() == 0
+
+async def test_recovery_reclaims_own_stale_saga(broker, db, make_order):
+    stale = {}
+    for instance_id in ("stopped", "running"):
+        order_id = await make_order(Order.STATUS_CREATED)
+        context = StateContext(
+            order_id=order_id,
+            client_id=1,
+            admin=False,
+            total_amount=9.5,
+            zipcode="20",
+            deadline=time.time() - 3600,
+            pieces=[{"type": "A", "quantity": 2}],
+        )
+        # Stopped by an error in this very instance, an hour past its deadline.
+        await add_saga_instance(db, {
+            **OrderCreationSaga.instance(instance_id, context),
+            "state": "CheckBalanceState",
+            "owner": SAGA_OWNER,
+        })
+        stale[instance_id] = order_id
+    # Still executing here: not claimed.
+    RUNNING.add("running")
+
+    try:
+        assert await SAGA_RECOVERY.recover() == 1
+        await SAGA_RUNNER.shutdown()
+    finally:
+        RUNNING.discard("running")
+
+    assert (await get_order(db, stale["stopped"], use_cache=False)).status == Order.STATUS_CANCELLED
+    assert (await get_order(db, stale["running"], use_cache=False)).status == Order.STATUS_CREATED
+    assert await count_instances(db) == 1
+
+async def test_recovery_after_crash_between_lock_and_save(broker, db, make_order):
+    order_id = await make_order(Order.STATUS_APPROVED)
+    broker.reply("warehouse.reserve", lambda _: {"status": "OK"})
+    broker.reply("delivery.cancel", lambda _: {"status": "OK"})
+    context = StateContext(order_id=order_id, client_id=1, admin=False, total_amount=None, zipcode=None)
+    await add_saga_instance(db, OrderCancellationSaga.instance("crashed", context))
+
+    # The order is locked, then the instance stops before its next state is saved.
+    assert await CheckOrderExistsState(context).run() == Outcome.OK
+    await db.execute(update(SagaInstance).values(owner=f"{SAGA_REPLY_INSTANCE_ID}/previous"))
+    await db.commit()
+
+    assert await SAGA_RECOVERY.recover() == 1
+    await SAGA_RUNNER.shutdown()
+
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_CANCELLED
+    assert await count_instances(db) == 0
+
+async def test_lock_needs_the_saga_instance(db, make_order):
+    order_id = await make_order(Order.STATUS_APPROVED)
+    context = StateContext(order_id=order_id, client_id=1, admin=False, total_amount=None, zipcode=None)
+    await add_saga_instance(db, {
+        **OrderCancellationSaga.instance("taken-over", context),
+        "owner": f"{SAGA_REPLY_INSTANCE_ID}/other",
+    })
+
+    assert await CheckOrderExistsState(context).run() == Outcome.FAILED
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_APPROVED
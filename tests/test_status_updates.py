@@ -0,0 +1,65 @@
+from order.messaging.batch_consumer import BatchConsumer
+from order.messaging.events import order_status_update
+from order.sql import (
+    get_order,
+    Order,
+)
+from typing import (
+    Any,
+    List,
+    Optional,
+)
+import json
+
+class StubDelivery:
+    """A delivery of the status queue that records how it was settled."""
+
+    def __init__(self, body: Any) -> None:
+        self.body = json.dumps(body).encode()
+        self.settled: Optional[str] = None
+
+    async def ack(self, multiple: bool = False) -> None:
+        self.settled = "ack-multiple" if multiple else "ack"
+
+    async def nack(self, multiple: bool = False, requeue: bool = True) -> None:
+        self.settled = "requeue-multiple" if multiple else "requeue"
+
+    async def reject(self, requeue: bool = False) -> None:
+        self.settled = "reject"
+
+async def consume(handler, *bodies: Any) -> List[Optional[str]]:
+    consumer = BatchConsumer(connection=None, queue="order.status.update", handler=handler, batch_size=10, max_wait=1)
+    deliveries = [StubDelivery(body) for body in bodies]
+    for delivery in deliveries:
+        await consumer._on_message(delivery)
+    await consumer._flush()
+    return [delivery.settled for delivery in deliveries]
+
+async def test_malformed_order_id_is_skipped(db, make_order):
+    order_id = await make_order(Order.STATUS_APPROVED)
+
+    await order_status_update([
+        {"order_id": "not-a-number", "status": Order.STATUS_PROCESSED},
+        {"order_id": None, "status": Order.STATUS_PROCESSED},
+        {"order_id": str(order_id), "status": Order.STATUS_PROCESSED},
+    ])
+
+    assert (await get_order(db, order_id, use_cache=False)).status == Order.STATUS_PROCESSED
+
+async def test_poison_message_is_rejected_alone():
+    async def handler(messages):
+        if any(message.get("poison") for message in messages):
+            raise ValueError("Cannot handle this message.")
+
+    settled = await consume(handler, {"order_id": 1}, {"poison": True}, {"order_id": 2})
+
+    assert settled == ["ack", "reject", "ack"]
+
+async def test_batch_is_requeued_on_errors_that_may_clear():
+    async def handler(_messages):
+        raise ConnectionError("Database unavailable.")
+
+    settled = await consume(handler, {"order_id": 1}, {"order_id": 2})
+
+    # Only the last delivery is nacked, with 'multiple' covering the batch.
+    assert settled == [None, "requeue-multiple"]